@@ -10,7 +10,7 @@ sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..'
 
 from app.core.database import Base
 from app.core.config import settings
-from app.models import VoiceProfile, GeneratedAudio
+from app.models import VoiceProfile, VoiceSample, GeneratedAudio, SynthesisJob
 
 config = context.config
 
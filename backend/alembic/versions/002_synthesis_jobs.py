@@ -0,0 +1,43 @@
+"""Add synthesis job queue
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('synthesis_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('text_input', sa.Text(), nullable=False),
+        sa.Column('voice_profile_id', sa.Integer(), nullable=True),
+        sa.Column('settings', sa.Text(), nullable=True),
+        sa.Column('generated_audio_id', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('worker_id', sa.String(length=100), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_synthesis_jobs_id'), 'synthesis_jobs', ['id'], unique=False)
+    op.create_index('ix_synthesis_jobs_status_created_at', 'synthesis_jobs', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_synthesis_jobs_status_created_at', table_name='synthesis_jobs')
+    op.drop_index(op.f('ix_synthesis_jobs_id'), table_name='synthesis_jobs')
+    op.drop_table('synthesis_jobs')
@@ -0,0 +1,26 @@
+"""Add canonical sample hash and duration to voice profiles
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('voice_profiles', sa.Column('sample_sha256', sa.String(length=64), nullable=True))
+    op.add_column('voice_profiles', sa.Column('sample_duration_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('voice_profiles', 'sample_duration_seconds')
+    op.drop_column('voice_profiles', 'sample_sha256')
@@ -0,0 +1,52 @@
+"""Add voice samples with aggregated conditioning latents
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('voice_samples',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('voice_profile_id', sa.Integer(), nullable=False),
+        sa.Column('audio_path', sa.String(length=500), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('duration_seconds', sa.Float(), nullable=True),
+        sa.Column('latents_path', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['voice_profile_id'], ['voice_profiles.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voice_samples_id'), 'voice_samples', ['id'], unique=False)
+    op.create_index(op.f('ix_voice_samples_voice_profile_id'), 'voice_samples', ['voice_profile_id'], unique=False)
+
+    op.add_column('voice_profiles', sa.Column('sample_count', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('voice_profiles', sa.Column('aggregate_latents_path', sa.String(length=500), nullable=True))
+
+    # Existing single samples become the first sample of their profile; their
+    # latents are computed lazily at synthesis time as before
+    op.execute(
+        "INSERT INTO voice_samples (voice_profile_id, audio_path, sha256, duration_seconds) "
+        "SELECT id, sample_audio_path, sample_sha256, sample_duration_seconds "
+        "FROM voice_profiles WHERE sample_audio_path IS NOT NULL"
+    )
+    op.execute("UPDATE voice_profiles SET sample_count = 1 WHERE sample_audio_path IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.drop_column('voice_profiles', 'aggregate_latents_path')
+    op.drop_column('voice_profiles', 'sample_count')
+    op.drop_index(op.f('ix_voice_samples_voice_profile_id'), table_name='voice_samples')
+    op.drop_index(op.f('ix_voice_samples_id'), table_name='voice_samples')
+    op.drop_table('voice_samples')
@@ -0,0 +1,30 @@
+"""Add requested output format to generated audio and jobs
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('generated_audio', sa.Column('output_format', sa.String(length=10), nullable=True))
+    op.add_column('generated_audio', sa.Column('bitrate', sa.Integer(), nullable=True))
+    op.add_column('synthesis_jobs', sa.Column('output_format', sa.String(length=10), nullable=True))
+    op.add_column('synthesis_jobs', sa.Column('bitrate', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('synthesis_jobs', 'bitrate')
+    op.drop_column('synthesis_jobs', 'output_format')
+    op.drop_column('generated_audio', 'bitrate')
+    op.drop_column('generated_audio', 'output_format')
@@ -0,0 +1,26 @@
+"""Add exact duration to generated audio
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('generated_audio', sa.Column('duration', sa.Float(), nullable=True))
+    # Older rows only know their length in whole seconds
+    op.execute("UPDATE generated_audio SET duration = duration_seconds WHERE duration_seconds IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.drop_column('generated_audio', 'duration')
@@ -0,0 +1,66 @@
+"""Store blob storage keys instead of local paths and URLs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+# Columns that held paths under UPLOAD_DIR; the relative remainder is the key
+# of the same file in the local blob store
+PATH_COLUMNS = [
+    ('voice_profiles', 'sample_audio_path'),
+    ('voice_profiles', 'aggregate_latents_path'),
+    ('voice_samples', 'audio_path'),
+    ('voice_samples', 'latents_path'),
+]
+
+
+def upgrade() -> None:
+    op.alter_column('generated_audio', 'audio_path', existing_type=sa.String(length=500), nullable=True)
+
+    # "<BASE_URL>/audio/<key>[?format=...]" -> "<key>"
+    op.execute(
+        "UPDATE generated_audio "
+        "SET audio_path = split_part(substring(audio_path from '/audio/(.*)$'), '?', 1) "
+        "WHERE audio_path LIKE '%/audio/%'"
+    )
+
+    prefix = os.path.join(settings.UPLOAD_DIR, '')
+    for table, column in PATH_COLUMNS:
+        op.get_bind().execute(
+            sa.text(
+                f"UPDATE {table} SET {column} = substr({column}, :start) "
+                f"WHERE left({column}, :length) = :prefix"
+            ),
+            {"start": len(prefix) + 1, "length": len(prefix), "prefix": prefix},
+        )
+
+
+def downgrade() -> None:
+    prefix = os.path.join(settings.UPLOAD_DIR, '')
+    for table, column in PATH_COLUMNS:
+        op.get_bind().execute(
+            sa.text(f"UPDATE {table} SET {column} = :prefix || {column} WHERE {column} IS NOT NULL"),
+            {"prefix": prefix},
+        )
+
+    op.execute(
+        sa.text("UPDATE generated_audio SET audio_path = :base || '/audio/' || audio_path WHERE audio_path IS NOT NULL")
+        .bindparams(base=settings.BASE_URL)
+    )
+    op.execute("UPDATE generated_audio SET audio_path = '' WHERE audio_path IS NULL")
+    op.alter_column('generated_audio', 'audio_path', existing_type=sa.String(length=500), nullable=False)
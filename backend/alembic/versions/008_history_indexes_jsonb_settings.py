@@ -0,0 +1,111 @@
+"""Keyset pagination indexes and JSONB generation settings
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+import ast
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _parse_settings(value):
+    """Settings were stored as ``str(dict)``; newer rows may already be JSON"""
+    try:
+        return json.loads(value)
+    except ValueError:
+        pass
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return {"raw": value}
+    return parsed if isinstance(parsed, dict) else {"value": parsed}
+
+
+def _convert_batches(conn) -> None:
+    """Fill settings_json for rows that do not have it yet, in id order, one statement per batch"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, settings FROM generated_audio "
+                "WHERE id > :last_id AND settings IS NOT NULL AND settings_json IS NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        batch = [{"id": row.id, "value": _parse_settings(row.settings)} for row in rows]
+        conn.execute(
+            sa.text(
+                "UPDATE generated_audio AS g SET settings_json = r.value "
+                "FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS r(id integer, value jsonb) "
+                "WHERE g.id = r.id"
+            ),
+            {"rows": json.dumps(batch, default=str)},
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Python reprs are not JSON, so the conversion runs in Python. Each batch
+    # commits on its own, so no lock on generated_audio is held across the
+    # whole table and the application keeps writing meanwhile.
+    with op.get_context().autocommit_block():
+        op.add_column('generated_audio', sa.Column('settings_json', postgresql.JSONB(), nullable=True))
+        _convert_batches(conn)
+
+    # Rows written since the last batch, then the column swap - both short.
+    # The lock comes first so no write slips in between the two.
+    op.execute("LOCK TABLE generated_audio IN ACCESS EXCLUSIVE MODE")
+    _convert_batches(conn)
+    op.drop_column('generated_audio', 'settings')
+    op.alter_column('generated_audio', 'settings_json', new_column_name='settings')
+
+    # Build indexes without locking out writes on a large table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_generated_audio_created_at_id', 'generated_audio', ['created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_generated_audio_voice_created_at_id', 'generated_audio',
+            ['voice_profile_id', 'created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_generated_audio_settings', 'generated_audio', ['settings'],
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_voice_profiles_active_created_at_id', 'voice_profiles', ['created_at', 'id'],
+            postgresql_where=sa.text('is_active'), postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_voice_profiles_active_created_at_id', table_name='voice_profiles')
+    op.drop_index('ix_generated_audio_settings', table_name='generated_audio')
+    op.drop_index('ix_generated_audio_voice_created_at_id', table_name='generated_audio')
+    op.drop_index('ix_generated_audio_created_at_id', table_name='generated_audio')
+
+    op.add_column('generated_audio', sa.Column('settings_text', sa.Text(), nullable=True))
+    op.execute("UPDATE generated_audio SET settings_text = settings::text WHERE settings IS NOT NULL")
+    op.drop_column('generated_audio', 'settings')
+    op.alter_column('generated_audio', 'settings_text', new_column_name='settings')
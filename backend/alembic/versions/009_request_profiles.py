@@ -0,0 +1,44 @@
+"""Add request profiles
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('request_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.String(length=32), nullable=False),
+        sa.Column('label', sa.String(length=50), nullable=False),
+        sa.Column('request_id', sa.String(length=128), nullable=True),
+        sa.Column('generated_audio_id', sa.Integer(), nullable=True),
+        sa.Column('text_chars', sa.Integer(), nullable=True),
+        sa.Column('wall_seconds', sa.Float(), nullable=True),
+        sa.Column('sample_count', sa.Integer(), nullable=True),
+        sa.Column('files', postgresql.JSONB(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('profile_id')
+    )
+    op.create_index(op.f('ix_request_profiles_id'), 'request_profiles', ['id'], unique=False)
+    op.create_index(op.f('ix_request_profiles_request_id'), 'request_profiles', ['request_id'], unique=False)
+    op.create_index('ix_request_profiles_created_at_id', 'request_profiles', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_profiles_created_at_id', table_name='request_profiles')
+    op.drop_index(op.f('ix_request_profiles_request_id'), table_name='request_profiles')
+    op.drop_index(op.f('ix_request_profiles_id'), table_name='request_profiles')
+    op.drop_table('request_profiles')
@@ -0,0 +1,26 @@
+"""Record sentence cache reuse of generated audio
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('generated_audio', sa.Column('segment_count', sa.Integer(), nullable=True))
+    op.add_column('generated_audio', sa.Column('segments_reused', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generated_audio', 'segments_reused')
+    op.drop_column('generated_audio', 'segment_count')
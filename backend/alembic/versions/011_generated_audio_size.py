@@ -0,0 +1,27 @@
+"""Record the stored size of generated audio and index its storage key
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows are backfilled by the maintenance worker
+    op.add_column('generated_audio', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    op.create_index('ix_generated_audio_audio_path', 'generated_audio', ['audio_path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_generated_audio_audio_path', table_name='generated_audio')
+    op.drop_column('generated_audio', 'size_bytes')
@@ -0,0 +1,24 @@
+"""Record a machine-readable error code on failed synthesis jobs
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('synthesis_jobs', sa.Column('error_code', sa.String(50), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('synthesis_jobs', 'error_code')
@@ -0,0 +1,175 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import Iterator, Optional, Tuple
+import os
+import re
+
+from ..services.hashing import file_sha256
+from ..services.storage import StorageError, get_blob_store
+from ..services.transcoding import (
+    FORMATS,
+    get_variant,
+    negotiate_format,
+    TranscodingError,
+    TranscodingUnavailableError,
+)
+
+router = APIRouter(prefix="/audio", tags=["audio"])
+
+_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Served files are content addressed by their ETag, so they can be cached for long
+_CACHE_CONTROL = "public, max-age=86400"
+
+# Namespaces whose URLs are handed out; the rest of the store (result cache
+# metadata, aggregates, profiles, temp files) is internal
+_AUDIO_PREFIXES = ("generated/", "samples/")
+_BATCH_PREFIX = "batches/"
+_AUDIO_EXTENSIONS = {f".{f.extension}" for f in FORMATS.values()}
+
+
+def _servable(file_path: str) -> bool:
+    """Whether a key is audio (or a bulk manifest/archive) that clients may download"""
+    if file_path.startswith(_BATCH_PREFIX):
+        return True
+    # Latents and profile artifacts sit next to the audio they belong to
+    return file_path.startswith(_AUDIO_PREFIXES) and os.path.splitext(file_path)[1] in _AUDIO_EXTENSIONS
+
+
+def _resolve(file_path: str) -> str:
+    """Map a URL path (a storage key) to a local copy of the blob"""
+    hidden = any(part.startswith(".") for part in file_path.split("/"))
+    if hidden or not _servable(file_path):
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    try:
+        return get_blob_store().local_path(file_path)
+    except StorageError:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header
+
+    Returns:
+        Inclusive (start, end), or None to serve the whole file
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: fall back to a full response
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _iter_file(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _describe(path: str) -> Tuple[int, str]:
+    """Size and ETag of a file; blocking"""
+    try:
+        return os.path.getsize(path), f'"{file_sha256(path)}"'
+    except OSError:
+        # Evicted from the local cache since it was resolved
+        raise HTTPException(status_code=404, detail="Audio file not found")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_audio(
+    file_path: str,
+    request: Request,
+    output_format: Optional[str] = Query(None, alias="format", description="Output format: wav, flac, mp3 or opus"),
+    bitrate: Optional[int] = Query(None, ge=8, le=320, description="Bitrate in kbps for lossy formats"),
+):
+    """Serve stored audio, transcoding to the requested format on first use"""
+    # Remote backends download the blob on first access
+    source_path = await run_in_threadpool(_resolve, file_path)
+
+    # An explicit query parameter wins over Accept negotiation
+    format_name = output_format or negotiate_format(request.headers.get("accept"))
+    if format_name is not None and format_name not in FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format. Allowed: {', '.join(FORMATS)}"
+        )
+
+    if format_name and format_name != "wav" and source_path.endswith(".wav"):
+        try:
+            path = await run_in_threadpool(get_variant, source_path, format_name, bitrate)
+        except TranscodingUnavailableError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        except TranscodingError as e:
+            raise HTTPException(status_code=500, detail=f"Error transcoding audio: {str(e)}")
+        media_type = FORMATS[format_name].media_type
+    else:
+        path = source_path
+        extension = os.path.splitext(path)[1].lstrip(".")
+        media_type = next(
+            (f.media_type for f in FORMATS.values() if f.extension == extension),
+            "application/octet-stream",
+        )
+
+    size, etag = await run_in_threadpool(_describe, path)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": _CACHE_CONTROL,
+        "Vary": "Accept",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        _iter_file(path, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+    )
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from typing import Iterator, Literal, Optional
+import json
+
+from ..core import settings
+from ..services.bulk import InvalidBatchError, parse_batch, run_batch
+
+router = APIRouter(prefix="/batches", tags=["batches"])
+
+
+def _ndjson(events: Iterator[dict]) -> Iterator[bytes]:
+    for event in events:
+        yield (json.dumps(event) + "\n").encode()
+
+
+@router.post("/")
+async def create_batch(
+    file: UploadFile = File(..., description="JSONL or CSV of text, voice_profile_id and settings"),
+    archive: Optional[Literal["zip", "tar"]] = Query(None, description="Also pack the outputs into an archive"),
+):
+    """Generate audio for every line of a batch file, streaming progress as NDJSON"""
+    if not settings.ENABLE_VOICE_CLONING:
+        raise HTTPException(status_code=503, detail="Voice cloning is disabled")
+
+    data = await file.read(settings.MAX_UPLOAD_SIZE + 1)
+    if len(data) > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+
+    try:
+        items = parse_batch(data, file.filename or "")
+    except InvalidBatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items. Maximum: {settings.BULK_MAX_ITEMS}"
+        )
+
+    # The generator is iterated in a worker thread; a disconnect stops the batch
+    return StreamingResponse(_ndjson(run_batch(items, archive)), media_type="application/x-ndjson")
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import asyncio
+import time
+
+from ..core import get_async_db, settings
+from ..models import SynthesisJob, GeneratedAudio, VoiceProfile
+from ..schemas import GenerateAudioRequest, GeneratedAudioResponse, SynthesisJobResponse
+from ..services.job_queue import enqueue_job, FINISHED_STATUSES, JOB_ERROR_STATUS, JOB_SUCCEEDED
+from ..services.model_registry import UnknownModelError, resolve_model
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+MAX_WAIT_SECONDS = 300.0
+
+
+async def _wait_for_job(db: AsyncSession, job: SynthesisJob, timeout: float) -> SynthesisJob:
+    """Poll a job until it finishes or the timeout elapses"""
+    deadline = time.monotonic() + min(timeout, MAX_WAIT_SECONDS)
+    while job.status not in FINISHED_STATUSES and time.monotonic() < deadline:
+        # End the read transaction so no connection is held while sleeping
+        await db.commit()
+        await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+        await db.refresh(job)
+    return job
+
+
+async def _get_job_or_404(db: AsyncSession, job_id: int) -> SynthesisJob:
+    job = await db.get(SynthesisJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/", response_model=SynthesisJobResponse, status_code=202)
+async def create_job(
+    request: GenerateAudioRequest,
+    wait: Optional[float] = Query(None, ge=0, description="Seconds to wait for completion"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue a speech generation job"""
+    try:
+        resolve_model(request.settings)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Fail fast instead of queueing a job that can only fail
+    if request.voice_profile_id and not await db.get(VoiceProfile, request.voice_profile_id):
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+    job = await db.run_sync(
+        enqueue_job,
+        text=request.text,
+        voice_profile_id=request.voice_profile_id,
+        generation_settings=request.settings,
+        output_format=request.format,
+        bitrate=request.bitrate,
+    )
+    if wait:
+        job = await _wait_for_job(db, job, wait)
+    return job
+
+
+@router.get("/{job_id}", response_model=SynthesisJobResponse)
+async def get_job(
+    job_id: int,
+    wait: Optional[float] = Query(None, ge=0, description="Seconds to wait for completion"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the status of a job"""
+    job = await _get_job_or_404(db, job_id)
+    if wait:
+        job = await _wait_for_job(db, job, wait)
+    return job
+
+
+@router.get("/{job_id}/result", response_model=GeneratedAudioResponse)
+async def get_job_result(
+    job_id: int,
+    wait: Optional[float] = Query(None, ge=0, description="Seconds to wait for completion"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the generated audio of a finished job"""
+    job = await _get_job_or_404(db, job_id)
+    if wait:
+        job = await _wait_for_job(db, job, wait)
+
+    if job.status not in FINISHED_STATUSES:
+        return JSONResponse(
+            status_code=202,
+            content={"id": job.id, "status": job.status},
+        )
+    if job.status != JOB_SUCCEEDED:
+        status_code = JOB_ERROR_STATUS.get(job.error_code, 500)
+        detail = job.error if status_code < 500 else f"Error generating audio: {job.error}"
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    generated = await db.get(GeneratedAudio, job.generated_audio_id)
+    if not generated:
+        raise HTTPException(status_code=404, detail="Generated audio not found")
+    return generated
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import hmac
+
+from ..core import settings
+from ..services.maintenance import get_maintenance_service
+
+router = APIRouter(prefix="/maintenance", tags=["maintenance"])
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def _require_admin(x_admin_token: Optional[str] = Header(None, alias=ADMIN_TOKEN_HEADER)):
+    """A report scans whole tables; when a token is configured, require it"""
+    token = settings.MAINTENANCE_ADMIN_TOKEN
+    if token and not (x_admin_token and hmac.compare_digest(x_admin_token, token)):
+        raise HTTPException(status_code=403, detail="Maintenance admin token required")
+
+
+@router.get("/status", dependencies=[Depends(_require_admin)])
+async def get_maintenance_status():
+    """Whether background maintenance runs, and the results of its last pass"""
+    return get_maintenance_service().status()
+
+
+@router.get("/report", dependencies=[Depends(_require_admin)])
+async def get_maintenance_report(
+    deduplicate: bool = Query(False, description="Also hash legacy files to find duplicates (reads each of them)"),
+):
+    """Dry run of a maintenance pass: rows, files and bytes each policy would remove, without changing anything"""
+    return (await run_in_threadpool(get_maintenance_service().run_pass, dry_run=True, deduplicate=deduplicate)).to_dict()
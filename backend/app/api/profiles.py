@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import hmac
+
+from ..core import get_async_db, settings
+from ..core.pagination import NEXT_CURSOR_HEADER, keyset_page, next_cursor
+from ..models import RequestProfile
+from ..schemas import RequestProfileResponse
+from ..services.profiling import ARTIFACTS, PROFILE_HEADER
+from ..services.storage import StorageError, get_blob_store
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+
+def _require_admin(x_profile: Optional[str] = Header(None, alias=PROFILE_HEADER)):
+    """Profiles contain request texts; when a token is configured, require it"""
+    token = settings.PROFILING_ADMIN_TOKEN
+    if token and not (x_profile and hmac.compare_digest(x_profile, token)):
+        raise HTTPException(status_code=403, detail="Profiling admin token required")
+
+
+async def _get_profile_or_404(db: AsyncSession, profile_id: str) -> RequestProfile:
+    result = await db.execute(select(RequestProfile).where(RequestProfile.profile_id == profile_id))
+    profile = result.scalars().first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/", response_model=List[RequestProfileResponse], dependencies=[Depends(_require_admin)])
+async def list_profiles(
+    response: Response,
+    label: Optional[str] = Query(None, description="Only profiles of this operation, e.g. generate_audio"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List stored request profiles, newest first"""
+    statement = select(RequestProfile)
+    if label:
+        statement = statement.where(RequestProfile.label == label)
+    try:
+        statement = keyset_page(statement, RequestProfile, cursor, limit, descending=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.execute(statement)
+    rows, following = next_cursor(result.scalars().all(), limit)
+    if following:
+        response.headers[NEXT_CURSOR_HEADER] = following
+    return rows
+
+
+@router.get("/{profile_id}", response_model=RequestProfileResponse, dependencies=[Depends(_require_admin)])
+async def get_profile(profile_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get one request profile"""
+    return await _get_profile_or_404(db, profile_id)
+
+
+@router.get("/{profile_id}/files/{name}", dependencies=[Depends(_require_admin)])
+async def download_profile_file(profile_id: str, name: str, db: AsyncSession = Depends(get_async_db)):
+    """Download a profile artifact: folded stacks, torch trace (chrome://tracing) or operator table"""
+    profile = await _get_profile_or_404(db, profile_id)
+    await db.close()
+
+    key = profile.files.get(name)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Profile file not found")
+    try:
+        path = await run_in_threadpool(get_blob_store().local_path, key)
+    except StorageError:
+        raise HTTPException(status_code=404, detail="Profile file not found")
+
+    suffix, media_type = ARTIFACTS[name]
+    return FileResponse(path, media_type=media_type, filename=f"{profile_id}.{suffix}")
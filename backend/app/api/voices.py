@@ -1,86 +1,150 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
+from typing import Iterator, List, Optional
 import os
-import shutil
-from datetime import datetime
-
-from ..core import get_db, settings
-from ..models import VoiceProfile, GeneratedAudio
+import time
+import uuid
+
+from ..core import get_async_db, settings, with_session
+from ..core.database import pool_status
+from ..core.pagination import NEXT_CURSOR_HEADER, keyset_page, next_cursor
+from ..core.metrics import metrics
+from ..core.observability import current_request_id, timed_stage
+from ..models import VoiceProfile, VoiceSample, GeneratedAudio
 from ..schemas import (
     VoiceProfileCreate,
     VoiceProfileUpdate,
     VoiceProfileResponse,
+    VoiceSampleResponse,
     GenerateAudioRequest,
     GeneratedAudioResponse,
 )
-from ..services import get_voice_service
+from ..services import get_result_cache
+from ..services.admission import (
+    DEADLINE_HEADER,
+    DeadlineExceededError,
+    OverloadedError,
+    Ticket,
+    get_admission_controller,
+)
+from ..services.audio_io import encode_wav
+from ..services.generation import (
+    generate_audio_record,
+    generate_audio_record_profiled,
+    render_speech,
+    resolve_speaker_wav,
+    VoiceProfileNotFoundError,
+    GenerationError,
+)
+from ..services.longform import is_long_form
+from ..services.model_registry import UnknownModelError, get_model_registry, resolve_model
+from ..services.segment_cache import get_segment_cache
+from ..services.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, should_profile
+from ..services.streaming import stream_audio_record
+from ..services.samples import (
+    ALLOWED_SAMPLE_EXTENSIONS,
+    canonicalize_sample,
+    save_upload,
+    InvalidSampleError,
+    UploadTooLargeError,
+)
+from ..services.voice_samples import add_sample, remove_sample, VoiceSampleNotFoundError
 
 router = APIRouter(prefix="/voices", tags=["voices"])
 
+upload_bytes = metrics.counter("voice_sample_upload_bytes_total", "Bytes of voice sample uploads received")
+upload_size = metrics.histogram(
+    "voice_sample_upload_size_bytes",
+    "Size of accepted voice sample uploads",
+    buckets=(64e3, 256e3, 1e6, 4e6, 16e6, 50e6),
+)
+
+
+async def _get_voice_or_404(db: AsyncSession, voice_id: int) -> VoiceProfile:
+    voice = await db.get(VoiceProfile, voice_id)
+    if not voice:
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+    return voice
+
+
+async def _fetch_page(db: AsyncSession, statement, model, response: Response,
+                      cursor: Optional[str], limit: int, skip: int, descending: bool):
+    """Run a keyset-paginated select and put the next cursor in a response header"""
+    try:
+        statement = keyset_page(statement, model, cursor, limit, descending=descending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if skip and not cursor:
+        statement = statement.offset(skip)
+
+    result = await db.execute(statement)
+    rows, following = next_cursor(result.scalars().all(), limit)
+    if following:
+        response.headers[NEXT_CURSOR_HEADER] = following
+    return rows
+
 
 @router.post("/", response_model=VoiceProfileResponse, status_code=201)
-def create_voice_profile(
+async def create_voice_profile(
     voice: VoiceProfileCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new voice profile"""
     db_voice = VoiceProfile(**voice.dict())
     db.add(db_voice)
-    db.commit()
-    db.refresh(db_voice)
+    await db.commit()
+    await db.refresh(db_voice)
     return db_voice
 
 
 @router.get("/", response_model=List[VoiceProfileResponse])
-def list_voice_profiles(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+async def list_voice_profiles(
+    response: Response,
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset paging; use cursor instead"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all voice profiles"""
-    voices = db.query(VoiceProfile).filter(VoiceProfile.is_active == True).offset(skip).limit(limit).all()
-    return voices
+    """List all voice profiles, oldest first"""
+    statement = select(VoiceProfile).where(VoiceProfile.is_active == True)
+    return await _fetch_page(db, statement, VoiceProfile, response, cursor, limit, skip, descending=False)
 
 
 @router.get("/{voice_id}", response_model=VoiceProfileResponse)
-def get_voice_profile(voice_id: int, db: Session = Depends(get_db)):
+async def get_voice_profile(voice_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific voice profile"""
-    voice = db.query(VoiceProfile).filter(VoiceProfile.id == voice_id).first()
-    if not voice:
-        raise HTTPException(status_code=404, detail="Voice profile not found")
-    return voice
+    return await _get_voice_or_404(db, voice_id)
 
 
 @router.put("/{voice_id}", response_model=VoiceProfileResponse)
-def update_voice_profile(
+async def update_voice_profile(
     voice_id: int,
     voice_update: VoiceProfileUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a voice profile"""
-    voice = db.query(VoiceProfile).filter(VoiceProfile.id == voice_id).first()
-    if not voice:
-        raise HTTPException(status_code=404, detail="Voice profile not found")
+    voice = await _get_voice_or_404(db, voice_id)
 
     update_data = voice_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(voice, field, value)
 
-    db.commit()
-    db.refresh(voice)
+    await db.commit()
+    await db.refresh(voice)
     return voice
 
 
 @router.delete("/{voice_id}", status_code=204)
-def delete_voice_profile(voice_id: int, db: Session = Depends(get_db)):
+async def delete_voice_profile(voice_id: int, db: AsyncSession = Depends(get_async_db)):
     """Soft delete a voice profile"""
-    voice = db.query(VoiceProfile).filter(VoiceProfile.id == voice_id).first()
-    if not voice:
-        raise HTTPException(status_code=404, detail="Voice profile not found")
+    voice = await _get_voice_or_404(db, voice_id)
 
     voice.is_active = False
-    db.commit()
+    await db.commit()
     return None
 
 
@@ -88,122 +152,334 @@ def delete_voice_profile(voice_id: int, db: Session = Depends(get_db)):
 async def upload_voice_sample(
     voice_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Upload an audio sample for a voice profile"""
-    voice = db.query(VoiceProfile).filter(VoiceProfile.id == voice_id).first()
-    if not voice:
-        raise HTTPException(status_code=404, detail="Voice profile not found")
+    """Add an audio sample to a voice profile"""
+    await _get_voice_or_404(db, voice_id)
+    # Don't hold a pooled connection while the upload is processed
+    await db.close()
 
     # Validate file type
-    allowed_extensions = {".wav", ".mp3", ".flac", ".m4a", ".ogg"}
     file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in allowed_extensions:
+    if file_ext not in ALLOWED_SAMPLE_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
+            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_SAMPLE_EXTENSIONS)}"
         )
 
-    # Create upload directory if it doesn't exist
-    upload_dir = os.path.join(settings.UPLOAD_DIR, "samples", str(voice_id))
+    # Stream the raw upload to local scratch space, enforcing the size limit
+    upload_dir = os.path.join(settings.UPLOAD_DIR, "tmp")
     os.makedirs(upload_dir, exist_ok=True)
+    raw_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}_raw{file_ext}")
+    try:
+        with timed_stage("upload_receive"):
+            written = await save_upload(file, raw_path, settings.MAX_UPLOAD_SIZE)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE} bytes"
+        )
 
-    # Save file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}{file_ext}"
-    file_path = os.path.join(upload_dir, filename)
+    upload_bytes.inc(written)
+    upload_size.observe(written)
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Transcode once to the canonical reference format and store it
+    try:
+        with timed_stage("transcode"):
+            sample = await run_in_threadpool(canonicalize_sample, raw_path)
+    except InvalidSampleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        os.remove(raw_path)
 
-    # Update voice profile
-    voice.sample_audio_path = file_path
-    db.commit()
-    db.refresh(voice)
+    # Computes the sample's latents and folds them into the profile aggregate
+    with timed_stage("sample_store"):
+        try:
+            voice_sample = await run_in_threadpool(with_session, add_sample, voice_id, sample)
+        except VoiceProfileNotFoundError:
+            # Deleted while the upload was being transcoded
+            raise HTTPException(status_code=404, detail="Voice profile not found")
+
+    return {
+        "message": "Sample uploaded successfully",
+        "file_path": voice_sample.audio_path,
+        "sample_id": voice_sample.id,
+    }
+
+
+@router.get("/{voice_id}/samples", response_model=List[VoiceSampleResponse])
+async def list_voice_samples(voice_id: int, db: AsyncSession = Depends(get_async_db)):
+    """List the audio samples of a voice profile"""
+    await _get_voice_or_404(db, voice_id)
+    result = await db.execute(
+        select(VoiceSample)
+        .where(VoiceSample.voice_profile_id == voice_id)
+        .order_by(VoiceSample.created_at)
+    )
+    return result.scalars().all()
+
+
+@router.delete("/{voice_id}/samples/{sample_id}", status_code=204)
+async def delete_voice_sample(voice_id: int, sample_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Remove an audio sample from a voice profile"""
+    await _get_voice_or_404(db, voice_id)
+    await db.close()
+    # Locks the profile row and deletes blobs - runs in a worker thread
+    try:
+        await run_in_threadpool(with_session, remove_sample, voice_id, sample_id)
+    except VoiceProfileNotFoundError:
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+    except VoiceSampleNotFoundError:
+        raise HTTPException(status_code=404, detail="Voice sample not found")
+    return None
 
-    return {"message": "Sample uploaded successfully", "file_path": file_path}
+
+def _language(request: GenerateAudioRequest) -> str:
+    return request.settings.get("language", "en") if request.settings else "en"
+
+
+async def _admit(request: GenerateAudioRequest, deadline_ms: Optional[float]) -> Optional[Ticket]:
+    """
+    Wait for a synthesis slot when admission control is enabled
+
+    Overload is answered with 429 and ``Retry-After``, a deadline that
+    passes before synthesis starts with 504.
+    """
+    if not settings.ADMISSION_ENABLED:
+        return None
+    try:
+        return await get_admission_controller().admit(
+            request.text,
+            language=_language(request),
+            model=resolve_model(request.settings),
+            deadline_ms=deadline_ms,
+        )
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OverloadedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+@asynccontextmanager
+async def _admission(request: GenerateAudioRequest, deadline_ms: Optional[float]):
+    ticket = await _admit(request, deadline_ms)
+    try:
+        yield
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+
+def _release_after(chunks: Iterator[bytes], ticket: Optional[Ticket]) -> Iterator[bytes]:
+    """Hold a stream's synthesis slot until the stream ends"""
+    try:
+        yield from chunks
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+
+class _TicketStreamingResponse(StreamingResponse):
+    """
+    Streaming response that releases its admission ticket however it ends
+
+    ``_release_after`` frees the slot as soon as synthesis finishes, but a
+    generator that never started never runs its ``finally``: a client that
+    disconnects before the first chunk would leak the slot. Releasing is
+    idempotent, so both may fire.
+    """
+
+    def __init__(self, content: Iterator[bytes], ticket: Optional[Ticket], **kwargs):
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.ticket is not None:
+                self.ticket.release()
 
 
 @router.post("/generate", response_model=GeneratedAudioResponse)
 async def generate_audio(
     request: GenerateAudioRequest,
-    db: Session = Depends(get_db)
+    response: Response,
+    x_profile: Optional[str] = Header(None, alias=PROFILE_HEADER),
+    x_deadline_ms: Optional[float] = Header(None, alias=DEADLINE_HEADER),
 ):
     """Generate audio from text using voice cloning"""
-    # Validate voice profile if provided
-    speaker_wav_path = None
-    if request.voice_profile_id:
-        voice = db.query(VoiceProfile).filter(VoiceProfile.id == request.voice_profile_id).first()
-        if not voice:
-            raise HTTPException(status_code=404, detail="Voice profile not found")
-        speaker_wav_path = voice.sample_audio_path
-
-    # Create output directory
-    output_dir = os.path.join(settings.UPLOAD_DIR, "generated")
-    os.makedirs(output_dir, exist_ok=True)
+    kwargs = dict(
+        text=request.text,
+        voice_profile_id=request.voice_profile_id,
+        generation_settings=request.settings,
+        output_format=request.format,
+        bitrate=request.bitrate,
+    )
+    # Synthesis is blocking - keep it (and its session) off the event loop
+    try:
+        async with _admission(request, x_deadline_ms):
+            if not should_profile(x_profile):
+                return await run_in_threadpool(with_session, generate_audio_record, **kwargs)
+
+            generated, profile = await run_in_threadpool(
+                with_session, generate_audio_record_profiled, request_id=current_request_id(), **kwargs
+            )
+        response.headers[PROFILE_ID_HEADER] = profile.profile_id
+        return generated
+    except VoiceProfileNotFoundError:
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except GenerationError as e:
+        raise HTTPException(status_code=500, detail=f"Error generating audio: {str(e)}")
 
-    # Generate audio file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    audio_filename = f"generated_{timestamp}.wav"
-    audio_path = os.path.join(output_dir, audio_filename)
 
-    duration = None
+@router.post("/generate/audio")
+async def generate_audio_inline(
+    request: GenerateAudioRequest,
+    x_deadline_ms: Optional[float] = Header(None, alias=DEADLINE_HEADER),
+):
+    """Generate audio from text and return the WAV directly, without storing it"""
+    if not settings.ENABLE_VOICE_CLONING:
+        raise HTTPException(status_code=503, detail="Voice cloning is disabled")
+    try:
+        model = resolve_model(request.settings)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        speaker_wav_path = await run_in_threadpool(
+            with_session, resolve_speaker_wav, request.voice_profile_id
+        )
+    except VoiceProfileNotFoundError:
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+    except GenerationError as e:
+        raise HTTPException(status_code=500, detail=f"Error generating audio: {str(e)}")
 
-    if settings.ENABLE_VOICE_CLONING:
+    async with _admission(request, x_deadline_ms):
         try:
-            # Get voice cloning service
-            voice_service = get_voice_service()
-
-            # Generate speech with voice cloning
-            voice_service.generate_speech(
-                text=request.text,
-                output_path=audio_path,
+            samples, sample_rate = await run_in_threadpool(
+                render_speech,
+                request.text,
                 speaker_wav=speaker_wav_path,
-                language=request.settings.get("language", "en") if request.settings else "en"
+                language=_language(request),
+                long_form=is_long_form(request.text, request.settings),
+                model=model,
             )
-
-            # Get audio duration
-            import wave
-            try:
-                with wave.open(audio_path, 'rb') as wav_file:
-                    frames = wav_file.getnframes()
-                    rate = wav_file.getframerate()
-                    duration = int(frames / float(rate))
-            except:
-                duration = None
-
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error generating audio: {str(e)}")
-    else:
-        # Voice cloning disabled - create placeholder file
-        with open(audio_path, "wb") as f:
-            f.write(b"")
 
-    # Generate URL path for the audio file (relative to /audio mount)
-    audio_url_path = f"/audio/generated/{audio_filename}"
-    full_audio_url = f"{settings.BASE_URL}{audio_url_path}"
+    return Response(content=encode_wav(samples, sample_rate), media_type="audio/wav")
 
-    # Save to database (store the full URL)
-    generated = GeneratedAudio(
-        voice_profile_id=request.voice_profile_id,
-        text_input=request.text,
-        audio_path=full_audio_url,
-        duration_seconds=duration,
-        settings=str(request.settings) if request.settings else None
-    )
-    db.add(generated)
-    db.commit()
-    db.refresh(generated)
 
-    return generated
+@router.post("/generate/stream")
+async def generate_audio_stream(
+    request: GenerateAudioRequest,
+    x_deadline_ms: Optional[float] = Header(None, alias=DEADLINE_HEADER),
+):
+    """Generate audio from text, streaming WAV audio as it is synthesized"""
+    started_at = time.perf_counter()
+    if not settings.ENABLE_VOICE_CLONING:
+        raise HTTPException(status_code=503, detail="Voice cloning is disabled")
+    try:
+        model = resolve_model(request.settings)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        speaker_wav_path = await run_in_threadpool(
+            with_session, resolve_speaker_wav, request.voice_profile_id
+        )
+    except VoiceProfileNotFoundError:
+        raise HTTPException(status_code=404, detail="Voice profile not found")
+    except GenerationError as e:
+        raise HTTPException(status_code=500, detail=f"Error generating audio: {str(e)}")
+
+    ticket = await _admit(request, x_deadline_ms)
+    try:
+        # The generator is iterated in a worker thread
+        return _TicketStreamingResponse(
+            _release_after(
+                stream_audio_record(
+                    text=request.text,
+                    speaker_wav=speaker_wav_path,
+                    language=_language(request),
+                    voice_profile_id=request.voice_profile_id,
+                    generation_settings=request.settings,
+                    started_at=started_at,
+                    model=model,
+                ),
+                ticket,
+            ),
+            ticket=ticket,
+            media_type="audio/wav",
+        )
+    except BaseException:
+        if ticket is not None:
+            ticket.release()
+        raise
 
 
 @router.get("/generated/history", response_model=List[GeneratedAudioResponse])
-def get_generated_history(
-    skip: int = 0,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+async def get_generated_history(
+    response: Response,
+    voice_profile_id: Optional[int] = Query(None, description="Only audio generated with this voice"),
+    language: Optional[str] = Query(None, description="Only audio generated in this language"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset paging; use cursor instead"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get history of generated audio"""
-    generated = db.query(GeneratedAudio).order_by(GeneratedAudio.created_at.desc()).offset(skip).limit(limit).all()
-    return generated
+    """Get history of generated audio, newest first"""
+    statement = select(GeneratedAudio)
+    if voice_profile_id is not None:
+        statement = statement.where(GeneratedAudio.voice_profile_id == voice_profile_id)
+    if language:
+        # Containment is answered by the GIN index on settings
+        statement = statement.where(GeneratedAudio.settings.contains({"language": language}))
+    return await _fetch_page(db, statement, GeneratedAudio, response, cursor, limit, skip, descending=True)
+
+
+@router.get("/cache/stats")
+async def get_result_cache_stats():
+    """Get hit/miss counters of the generation result cache"""
+    return get_result_cache().stats()
+
+
+@router.get("/cache/segments/stats")
+async def get_segment_cache_stats():
+    """Get hit/miss counters and occupancy of the sentence cache"""
+    return get_segment_cache().stats()
+
+
+@router.get("/models/stats")
+async def get_model_stats():
+    """Get the loaded models, their measured memory and load/eviction counts"""
+    return get_model_registry().stats()
+
+
+@router.get("/admission/stats")
+async def get_admission_stats():
+    """Get lane occupancy, predicted waits and the measured cost model of admission control"""
+    return get_admission_controller().stats()
+
+
+@router.get("/scheduler/stats")
+async def get_scheduler_stats():
+    """Get batch size and wait time histograms of the batch scheduler"""
+    return {
+        "enabled": settings.BATCHING_ENABLED,
+        "metrics": metrics.snapshot(prefix="tts_batch"),
+    }
+
+
+@router.get("/db/stats")
+async def get_db_pool_stats():
+    """Get occupancy, checkout wait times and timeouts of the database connection pools"""
+    return {
+        "pools": pool_status(),
+        "metrics": {**metrics.snapshot(prefix="db_pool"), **metrics.snapshot(prefix="db_sync_pool")},
+    }
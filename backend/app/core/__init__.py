@@ -1,4 +1,4 @@
 from .config import settings
-from .database import Base, engine, get_db
+from .database import Base, engine, get_db, get_async_db, with_session
 
-__all__ = ["settings", "Base", "engine", "get_db"]
+__all__ = ["settings", "Base", "engine", "get_db", "get_async_db", "with_session"]
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -8,24 +8,144 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
 
     DATABASE_URL: str
+    DATABASE_ASYNC_URL: str = ""  # Defaults to DATABASE_URL with the asyncpg driver
+
+    # Connection pool, applied to both the async and the sync engine
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Replace connections older than this, -1 = never
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout
     SECRET_KEY: str
     DEBUG: bool = False
+    LOG_LEVEL: str = "INFO"  # Includes one JSON timing line per request (logger "app.requests")
 
     ALLOWED_ORIGINS: str = "http://localhost:3000"
 
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 50000000  # 50MB
 
+    # Canonical format of stored voice samples
+    SAMPLE_RATE: int = 22050  # XTTS conditioning rate
+    SAMPLE_TARGET_DBFS: float = -20.0
+
+    # Blob storage for samples and generated audio
+    STORAGE_BACKEND: str = "local"  # "local" (files under UPLOAD_DIR) or "s3"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: str = ""  # Set for S3-compatible services such as MinIO
+    S3_REGION: str = ""
+    S3_ACCESS_KEY_ID: str = ""  # Empty = default boto3 credential chain
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_CACHE_MAX_BYTES: int = 10000000000  # 10GB of local copies of S3 blobs, least recently used evicted; 0 = unbounded
+
     # Base URL for generating full URLs to audio files
     BASE_URL: str = "http://localhost:8000"
 
     # Voice cloning settings
     ENABLE_VOICE_CLONING: bool = True  # Set to False in production if not using GPU server
+    LATENT_CACHE_SIZE: int = 32  # Speaker latent sets kept in memory
+
+    # Generation result cache
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_BYTES: int = 2000000000  # 2GB, 0 = unbounded
+    RESULT_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # 0 = never expire
+
+    # Sentence cache of long-form renders: edited scripts only re-render changed sentences
+    SEGMENT_CACHE_ENABLED: bool = True
+    SEGMENT_CACHE_MAX_BYTES: int = 500000000  # 500MB of float32 samples, about 85 minutes at 24kHz
+
+    # Synthesis job queue
+    JOB_WORKERS: int = 1  # Worker threads per process, 0 = enqueue only
+    JOB_POLL_INTERVAL: float = 0.5  # Seconds between polls of an empty queue
+    JOB_LEASE_SECONDS: int = 900  # Running jobs whose worker stops renewing the lease for this long are reclaimed
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Micro-batching of concurrent synthesis requests; off until the batching benchmark shows a gain
+    BATCHING_ENABLED: bool = False
+    BATCH_MAX_SIZE: int = 8
+    BATCH_MAX_WAIT_MS: float = 0.0  # Extra time a batch waits for company once a worker is free
+    BATCH_WORKERS: int = 8  # Distinct requests rendered at the same time
+
+    # Admission control of /voices/generate, /generate/audio and /generate/stream: requests are
+    # queued in an interactive or a long lane by estimated cost, and rejected with 429 when the
+    # backlog is full or the predicted wait exceeds the lane's limit or the X-Deadline-Ms header
+    ADMISSION_ENABLED: bool = False
+    ADMISSION_DEFAULT_RTF: float = 1.0  # Real-time factor assumed until syntheses are measured
+    ADMISSION_INTERACTIVE_MAX_COST_SECONDS: float = 10.0  # Longer estimated renders use the long lane
+    ADMISSION_INTERACTIVE_SLOTS: int = 2  # Requests synthesized at once
+    ADMISSION_INTERACTIVE_MAX_QUEUE: int = 32
+    ADMISSION_INTERACTIVE_MAX_WAIT_SECONDS: float = 15.0
+    ADMISSION_LONG_SLOTS: int = 1
+    ADMISSION_LONG_MAX_QUEUE: int = 8
+    ADMISSION_LONG_MAX_WAIT_SECONDS: float = 300.0
+
+    # Models: requests pick one with settings["model"], by alias or full name
+    TTS_MODEL: str = "tts_models/multilingual/multi-dataset/xtts_v2"  # Default, also run by the inference pool
+    TTS_MODEL_ALIASES: str = ""  # e.g. "preview=tts_models/en/ljspeech/vits,final=tts_models/multilingual/multi-dataset/xtts_v2"
+    MODEL_REGISTRY_BUDGET_MB: int = 0  # Memory for all loaded models; idle ones are evicted LRU first, 0 = no budget
+
+    # Inference process pool (0 = run the model inside the API process)
+    INFERENCE_POOL_SIZE: int = 0
+    INFERENCE_THREADS_PER_REPLICA: int = 0  # 0 = split available cores evenly
+    TORCH_NUM_THREADS: int = 0  # Intra-op threads for an in-process model, 0 = profile default
+
+    # Inference profile: "baseline" (fp32 eager) or "optimized" (inference_mode,
+    # int8 dynamic quantization of the GPT decoder on CPU, tuned threads)
+    INFERENCE_PROFILE: str = "baseline"
+    INFERENCE_COMPILE: bool = False  # Also torch.compile the vocoder (optimized profile only)
+    INFERENCE_CHECK_MAX_LSD_DB: float = 3.0  # Quality gate of the profile check
+
+    # On-demand request profiling (nothing is sampled while disabled)
+    PROFILING_ENABLED: bool = False
+    PROFILING_ADMIN_TOKEN: str = ""  # Requests with "X-Profile: <token>" are profiled; also guards /profiles
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of generation requests profiled at random
+    PROFILING_INTERVAL_MS: float = 5.0  # Stack sampling interval
+    PROFILING_TORCH: bool = True  # Also record torch operators
+
+    # Model residency
+    MODEL_EAGER_LOAD: bool = False  # Load and warm up at startup instead of on first request
+    MODEL_WARMUP_TEXT: str = "Warming up the voice model."
+    MODEL_IDLE_TIMEOUT_SECONDS: int = 0  # Unload after this long without use, 0 = never
+    MODEL_MEMORY_BUDGET_MB: int = 0  # Unload an idle model when RSS exceeds this, 0 = no budget
+    MODEL_SNAPSHOT_DIR: str = ""  # Memory-mapped weight snapshots (python -m app.services.model_snapshot build)
+
+    # Background storage maintenance (GET /maintenance/report previews a pass)
+    MAINTENANCE_ENABLED: bool = False
+    MAINTENANCE_INTERVAL_SECONDS: int = 3600  # Pause between passes
+    MAINTENANCE_BATCH_SIZE: int = 100  # Rows per transaction
+    MAINTENANCE_IO_BYTES_PER_SECOND: int = 20000000  # Hashing and deletion rate, 0 = unthrottled
+    MAINTENANCE_YIELD_IN_FLIGHT: int = 4  # Pause batches while more HTTP requests are in flight, 0 = never pause
+    MAINTENANCE_DEDUPLICATE: bool = True  # Hardlink identical files stored under legacy keys (local backend)
+    MAINTENANCE_ADMIN_TOKEN: str = ""  # Required in "X-Admin-Token" by /maintenance when set
+    RETENTION_GENERATED_TTL_DAYS: int = 0  # Clear generated audio older than this, 0 = keep forever
+    RETENTION_GENERATED_MAX_BYTES: int = 0  # Clear the oldest generated audio above this total, 0 = unbounded
+    RETENTION_INACTIVE_PROFILE_DAYS: int = 30  # Purge samples of profiles deleted this long ago, -1 = never
+
+    # Bulk batch generation
+    BULK_MAX_ITEMS: int = 10000  # Lines per batch file
+    BULK_CONCURRENCY: int = 2  # Items rendered at once; lets the batch scheduler and pool fill up
+
+    # Long-form synthesis
+    LONGFORM_THRESHOLD_CHARS: int = 400  # Longer texts are segmented and rendered in parallel
+    LONGFORM_SEGMENT_CHARS: int = 240  # Stay under XTTS's per-call text limit
+    LONGFORM_WORKERS: int = 2  # Threads used when there is no inference pool
+    LONGFORM_CROSSFADE_MS: float = 30.0
+    LONGFORM_TARGET_DBFS: float = -20.0
 
     @property
     def cors_origins(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def model_aliases(self) -> Dict[str, str]:
+        aliases = {}
+        for entry in self.TTS_MODEL_ALIASES.split(","):
+            alias, _, model_name = entry.partition("=")
+            if alias.strip() and model_name.strip():
+                aliases[alias.strip()] = model_name.strip()
+        return aliases
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,11 +1,92 @@
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .metrics import metrics
+
+# Connection checkout waits are normally sub-millisecond; long tails mean exhaustion
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _InstrumentedPoolMixin:
+    """Records checkout wait time, timeouts and occupancy of a connection pool"""
+
+    metrics_prefix = "db_pool"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.counter(
+                f"{self.metrics_prefix}_timeouts_total",
+                "Connection checkouts that timed out waiting for a free connection",
+            ).inc()
+            raise
+        finally:
+            metrics.histogram(
+                f"{self.metrics_prefix}_wait_seconds",
+                "Time spent waiting to check out a connection",
+                buckets=POOL_WAIT_BUCKETS,
+            ).observe(time.perf_counter() - started)
+            self._update_gauges()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def _update_gauges(self):
+        metrics.gauge(
+            f"{self.metrics_prefix}_checked_out", "Connections currently checked out"
+        ).set(self.checkedout())
+        metrics.gauge(
+            f"{self.metrics_prefix}_overflow", "Connections open beyond the pool size"
+        ).set(max(0, self.overflow()))
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics_prefix = "db_sync_pool"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_prefix = "db_pool"
+
+
+def async_database_url() -> str:
+    """DATABASE_ASYNC_URL, or DATABASE_URL switched to the asyncpg driver"""
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    url = settings.DATABASE_URL
+    for scheme in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(scheme):
+            return "postgresql+asyncpg://" + url[len(scheme):]
+    return url
+
 
-engine = create_engine(settings.DATABASE_URL)
+_pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+# Sync engine for worker threads (job queue, synthesis handlers) and migrations
+engine = create_engine(settings.DATABASE_URL, poolclass=InstrumentedQueuePool, **_pool_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers, so queries never block the event loop
+async_engine = create_async_engine(
+    async_database_url(), poolclass=InstrumentedAsyncQueuePool, **_pool_options
+)
+# Objects stay usable after commit without an implicit (blocking) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -15,3 +96,35 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def with_session(func, *args, **kwargs):
+    """
+    Call ``func(db, *args, **kwargs)`` with a short-lived sync session
+
+    For blocking service functions that async handlers run in a worker
+    thread. Returned rows are detached but keep their loaded attributes.
+    """
+    db = SessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def pool_status() -> dict:
+    """Current occupancy of both connection pools"""
+    status = {}
+    for name, pool in (("async", async_engine.pool), ("sync", engine.pool)):
+        status[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        }
+    return status
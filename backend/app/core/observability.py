@@ -0,0 +1,123 @@
+"""
+Request context and per-stage timing
+Request ids, stage latency histograms and one structured timing log line per request
+"""
+import json
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger("app.requests")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Stages range from sub-millisecond lookups to minutes of long-form synthesis
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# Shared by reference with worker threads started through run_in_threadpool
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+requests_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests being processed")
+
+
+def current_request_id() -> Optional[str]:
+    """Id of the request being handled in this context, if any"""
+    return _request_id.get()
+
+
+def record_stage(stage: str, seconds: float):
+    """Record a stage duration in the histogram and the current request's timings"""
+    metrics.histogram(
+        "tts_stage_seconds",
+        "Time spent per stage of a generation request",
+        buckets=STAGE_BUCKETS,
+        labels={"stage": stage},
+    ).observe(seconds)
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed_stage(stage: str):
+    """
+    Time a block as one stage of request processing
+
+    Stages that run several times in a request (e.g. inference of each
+    long-form segment) are summed in the request's timing log. Work done
+    on pool threads outside the request context only reaches the histogram.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+class RequestContextMiddleware:
+    """
+    Assigns each HTTP request an id and logs its timing
+
+    The id is taken from the ``X-Request-ID`` header when the client sent
+    one and echoed on the response. When the response has been sent in
+    full (streams included) one JSON log line records the status, total
+    duration and the time of each stage the request went through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(REQUEST_ID_HEADER.lower().encode(), b"").decode("latin-1")[:128] or uuid.uuid4().hex
+        id_token = _request_id.set(request_id)
+        timings: Dict[str, float] = {}
+        timings_token = _stage_timings.set(timings)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            requests_in_flight.dec()
+            duration = time.perf_counter() - started
+            endpoint = scope.get("endpoint")
+            handler = getattr(endpoint, "__name__", "unmatched")
+            metrics.histogram(
+                "http_request_duration_seconds",
+                "HTTP request latency by handler, until the last byte was sent",
+                buckets=STAGE_BUCKETS,
+                labels={"method": scope["method"], "handler": handler, "status": str(status)},
+            ).observe(duration)
+            logger.info(json.dumps({
+                "event": "request",
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "handler": handler,
+                "status": status,
+                "duration_ms": round(duration * 1000, 2),
+                "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+            }))
+            _stage_timings.reset(timings_token)
+            _request_id.reset(id_token)
@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination
+Pages ordered by (created_at, id) that cost the same however deep the client goes
+"""
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just past a row"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parse a cursor produced by ``encode_cursor``
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_page(
+    statement: Select,
+    model,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Select:
+    """
+    Restrict a select to one page after a cursor
+
+    The row comparison on (created_at, id) is answered by a composite index
+    seek, unlike OFFSET which reads and discards every skipped row. One extra
+    row is fetched so ``next_cursor`` can tell whether another page exists.
+
+    Args:
+        statement: Select of ``model`` rows, already filtered
+        model: Mapped class with ``created_at`` and ``id`` columns
+        cursor: Cursor of the previous page, or None for the first page
+        limit: Page size
+        descending: Newest first when True
+
+    Returns:
+        The paged select
+    """
+    key = tuple_(model.created_at, model.id)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        bound = tuple_(created_at, row_id)
+        statement = statement.where(key < bound if descending else key > bound)
+
+    if descending:
+        statement = statement.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        statement = statement.order_by(model.created_at, model.id)
+    return statement.limit(limit + 1)
+
+
+def next_cursor(rows: List, limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Split the extra row fetched by ``keyset_page`` off a result
+
+    Returns:
+        Tuple of (rows of this page, cursor of the next page or None)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
@@ -1,15 +1,58 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
+import logging
 
 from .core import settings
-from .api import voices
+from .core.metrics import PROMETHEUS_CONTENT_TYPE, metrics
+from .core.observability import REQUEST_ID_HEADER, RequestContextMiddleware
+from .core.pagination import NEXT_CURSOR_HEADER
+from .api import voices, jobs, audio, batches, profiles, maintenance
+from .services.job_queue import get_job_worker_pool
+from .services.inference_pool import get_inference_pool
+from .services.maintenance import get_maintenance_service
+from .services.profiling import PROFILE_ID_HEADER
+from .services.residency import get_residency_manager
+
+# Service loggers (and the per-request timing lines) share the root handler
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Model replicas must be up before workers start pulling jobs
+    inference_pool = get_inference_pool()
+    if inference_pool is not None:
+        inference_pool.start()
+
+    # Eager model load, warm-up and idle unloading
+    residency_manager = get_residency_manager()
+    residency_manager.start()
+
+    # Start draining the synthesis job queue
+    worker_pool = get_job_worker_pool()
+    if settings.JOB_WORKERS > 0:
+        worker_pool.start()
+
+    # Retention, purging and deduplication of stored files
+    maintenance_service = get_maintenance_service()
+    if settings.MAINTENANCE_ENABLED:
+        maintenance_service.start()
+    yield
+    maintenance_service.stop()
+    worker_pool.stop()
+    residency_manager.stop()
+    if inference_pool is not None:
+        inference_pool.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="Voice cloning application API"
+    description="Voice cloning application API",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -19,18 +62,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER, PROFILE_ID_HEADER, "Retry-After"],
 )
 
-# Create upload directories
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-os.makedirs(os.path.join(settings.UPLOAD_DIR, "samples"), exist_ok=True)
-os.makedirs(os.path.join(settings.UPLOAD_DIR, "generated"), exist_ok=True)
+# Request ids, in-flight count and per-request timing logs
+app.add_middleware(RequestContextMiddleware)
 
-# Mount static files for serving audio
-app.mount("/audio", StaticFiles(directory=settings.UPLOAD_DIR), name="audio")
+# Create the upload directory (blob store shards are created on write)
+os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
 # Include routers
+app.include_router(audio.router)
 app.include_router(voices.router, prefix=settings.API_V1_STR)
+app.include_router(jobs.router, prefix=settings.API_V1_STR)
+app.include_router(batches.router, prefix=settings.API_V1_STR)
+app.include_router(profiles.router, prefix=settings.API_V1_STR)
+app.include_router(maintenance.router, prefix=settings.API_V1_STR)
 
 
 @app.get("/")
@@ -45,3 +92,15 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    # Plain def: some gauges are read from the database when scraped
+    return Response(metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/ready")
+def readiness_check():
+    status = get_residency_manager().status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
@@ -1,3 +1,5 @@
-from .voice import VoiceProfile, GeneratedAudio
+from .voice import VoiceProfile, VoiceSample, GeneratedAudio
+from .job import SynthesisJob
+from .profile import RequestProfile
 
-__all__ = ["VoiceProfile", "GeneratedAudio"]
+__all__ = ["VoiceProfile", "VoiceSample", "GeneratedAudio", "SynthesisJob", "RequestProfile"]
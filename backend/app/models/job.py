@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class SynthesisJob(Base):
+    __tablename__ = "synthesis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Lifecycle: queued -> running -> succeeded | failed
+    status = Column(String(20), nullable=False, default="queued")
+
+    # Request payload
+    text_input = Column(Text, nullable=False)
+    voice_profile_id = Column(Integer, nullable=True)
+    settings = Column(Text, nullable=True)  # JSON string for generation settings
+    output_format = Column(String(10), nullable=True)
+    bitrate = Column(Integer, nullable=True)
+
+    # Result
+    generated_audio_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    error_code = Column(String(50), nullable=True)  # See job_queue.JOB_ERROR_STATUS
+
+    # Worker bookkeeping
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_synthesis_jobs_status_created_at", "status", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<SynthesisJob(id={self.id}, status={self.status})>"
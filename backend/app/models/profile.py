@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class RequestProfile(Base):
+    __tablename__ = "request_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(String(32), nullable=False, unique=True)
+
+    # What was profiled
+    label = Column(String(50), nullable=False)
+    request_id = Column(String(128), nullable=True, index=True)
+    generated_audio_id = Column(Integer, nullable=True)
+    text_chars = Column(Integer, nullable=True)
+
+    # Measurements
+    wall_seconds = Column(Float, nullable=True)
+    sample_count = Column(Integer, nullable=True)  # Stack samples taken
+
+    # Artifact name -> storage key
+    files = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_request_profiles_created_at_id", "created_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<RequestProfile(id={self.id}, label={self.label})>"
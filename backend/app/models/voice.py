@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from ..core.database import Base
 
@@ -12,6 +13,10 @@ class VoiceProfile(Base):
 
     # Voice model metadata
     sample_audio_path = Column(String(500), nullable=True)
+    sample_sha256 = Column(String(64), nullable=True)
+    sample_duration_seconds = Column(Float, nullable=True)
+    sample_count = Column(Integer, default=0)
+    aggregate_latents_path = Column(String(500), nullable=True)  # Mean latents over all samples
     model_path = Column(String(500), nullable=True)
 
     # Status
@@ -22,10 +27,36 @@ class VoiceProfile(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Keyset pagination of the active profile list
+        Index("ix_voice_profiles_active_created_at_id", "created_at", "id", postgresql_where=text("is_active")),
+    )
+
     def __repr__(self):
         return f"<VoiceProfile(id={self.id}, name={self.name})>"
 
 
+class VoiceSample(Base):
+    __tablename__ = "voice_samples"
+
+    id = Column(Integer, primary_key=True, index=True)
+    voice_profile_id = Column(Integer, ForeignKey("voice_profiles.id"), nullable=False, index=True)
+
+    # Canonical reference audio (storage key)
+    audio_path = Column(String(500), nullable=False)
+    sha256 = Column(String(64), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+
+    # Conditioning latents computed at upload time
+    latents_path = Column(String(500), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<VoiceSample(id={self.id}, voice_profile_id={self.voice_profile_id})>"
+
+
 class GeneratedAudio(Base):
     __tablename__ = "generated_audio"
 
@@ -36,14 +67,31 @@ class GeneratedAudio(Base):
     text_input = Column(Text, nullable=False)
 
     # Output
-    audio_path = Column(String(500), nullable=False)
-    duration_seconds = Column(Integer, nullable=True)
+    audio_path = Column(String(500), nullable=True)  # Storage key, None when nothing was rendered or it expired
+    size_bytes = Column(BigInteger, nullable=True)  # Size of the stored WAV, for the retention budget
+    duration_seconds = Column(Integer, nullable=True)  # Whole seconds, kept for older clients
+    duration = Column(Float, nullable=True)  # Exact length in seconds, from the sample count
+    output_format = Column(String(10), nullable=True)  # Delivery format, the stored master is WAV
+    bitrate = Column(Integer, nullable=True)
+    # Sentence cache use of long-form renders: segments in the text and how many were reused
+    segment_count = Column(Integer, nullable=True)
+    segments_reused = Column(Integer, nullable=True)
 
     # Metadata
-    settings = Column(Text, nullable=True)  # JSON string for generation settings
+    # Generation settings; plain JSON on SQLite (benchmark databases)
+    settings = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=True)
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Keyset pagination of history, overall and per voice
+        Index("ix_generated_audio_created_at_id", "created_at", "id"),
+        Index("ix_generated_audio_voice_created_at_id", "voice_profile_id", "created_at", "id"),
+        Index("ix_generated_audio_settings", "settings", postgresql_using="gin"),
+        # Reference checks before retention deletes a shared blob
+        Index("ix_generated_audio_audio_path", "audio_path"),
+    )
+
     def __repr__(self):
         return f"<GeneratedAudio(id={self.id}, voice_profile_id={self.voice_profile_id})>"
@@ -3,15 +3,21 @@ from .voice import (
     VoiceProfileCreate,
     VoiceProfileUpdate,
     VoiceProfileResponse,
+    VoiceSampleResponse,
     GenerateAudioRequest,
     GeneratedAudioResponse,
 )
+from .job import SynthesisJobResponse
+from .profile import RequestProfileResponse
 
 __all__ = [
     "VoiceProfileBase",
     "VoiceProfileCreate",
     "VoiceProfileUpdate",
     "VoiceProfileResponse",
+    "VoiceSampleResponse",
     "GenerateAudioRequest",
     "GeneratedAudioResponse",
+    "SynthesisJobResponse",
+    "RequestProfileResponse",
 ]
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class SynthesisJobResponse(BaseModel):
+    id: int
+    status: str
+    text_input: str
+    voice_profile_id: Optional[int] = None
+    generated_audio_id: Optional[int] = None
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
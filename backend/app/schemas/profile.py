@@ -0,0 +1,31 @@
+from pydantic import BaseModel, model_validator
+from datetime import datetime
+from typing import Dict, Optional
+
+from ..core.config import settings
+
+
+class RequestProfileResponse(BaseModel):
+    id: int
+    profile_id: str
+    label: str
+    request_id: Optional[str] = None
+    generated_audio_id: Optional[int] = None
+    text_chars: Optional[int] = None
+    wall_seconds: Optional[float] = None
+    sample_count: Optional[int] = None
+    files: Dict[str, str]  # Artifact name -> download URL
+    storage_keys: Optional[Dict[str, str]] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+    @model_validator(mode="after")
+    def resolve_file_urls(self):
+        """Rows store storage keys; clients get URLs to the profile download route"""
+        if self.storage_keys is None:
+            self.storage_keys = self.files
+            base = f"{settings.BASE_URL}{settings.API_V1_STR}/profiles/{self.profile_id}/files"
+            self.files = {name: f"{base}/{name}" for name in self.files}
+        return self
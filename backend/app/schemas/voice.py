@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
+
+from ..services.storage import audio_url
 
 
 class VoiceProfileBase(BaseModel):
@@ -21,6 +23,9 @@ class VoiceProfileUpdate(BaseModel):
 class VoiceProfileResponse(VoiceProfileBase):
     id: int
     sample_audio_path: Optional[str] = None
+    sample_sha256: Optional[str] = None
+    sample_duration_seconds: Optional[float] = None
+    sample_count: Optional[int] = 0
     model_path: Optional[str] = None
     is_trained: bool
     is_active: bool
@@ -32,19 +37,52 @@ class VoiceProfileResponse(VoiceProfileBase):
         protected_namespaces = ()
 
 
+class VoiceSampleResponse(BaseModel):
+    id: int
+    voice_profile_id: int
+    audio_path: str
+    sha256: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class GenerateAudioRequest(BaseModel):
     text: str
     voice_profile_id: Optional[int] = None
     settings: Optional[dict] = None
+    format: Literal["wav", "flac", "mp3", "opus"] = "wav"
+    bitrate: Optional[int] = Field(None, ge=8, le=320, description="Bitrate in kbps for mp3/opus")
 
 
 class GeneratedAudioResponse(BaseModel):
     id: int
     voice_profile_id: Optional[int] = None
     text_input: str
-    audio_path: str
+    audio_path: Optional[str] = None  # Public URL of the audio
+    storage_key: Optional[str] = None
+    size_bytes: Optional[int] = None
     duration_seconds: Optional[int] = None
+    duration: Optional[float] = None
+    output_format: Optional[str] = None
+    bitrate: Optional[int] = None
+    segment_count: Optional[int] = None
+    segments_reused: Optional[int] = None
+    segment_reuse_ratio: Optional[float] = None  # Share of sentences taken from the sentence cache
+    settings: Optional[dict] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+    @model_validator(mode="after")
+    def resolve_audio_url(self):
+        """Rows store a storage key; clients get a URL to the audio route"""
+        if self.storage_key is None:
+            self.storage_key = self.audio_path
+            self.audio_path = audio_url(self.storage_key, self.output_format, self.bitrate)
+        if self.segment_count:
+            self.segment_reuse_ratio = (self.segments_reused or 0) / self.segment_count
+        return self
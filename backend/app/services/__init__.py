@@ -1,3 +1,16 @@
-from .voice_cloning import VoiceCloningService, get_voice_service
+from .voice_cloning import VoiceCloningService
+from .model_registry import ModelRegistry, get_model_registry, get_voice_service
+from .latent_cache import SpeakerLatentCache, get_latent_cache
+from .result_cache import ResultCache, get_result_cache, request_key
 
-__all__ = ["VoiceCloningService", "get_voice_service"]
+__all__ = [
+    "VoiceCloningService",
+    "ModelRegistry",
+    "get_model_registry",
+    "get_voice_service",
+    "SpeakerLatentCache",
+    "get_latent_cache",
+    "ResultCache",
+    "get_result_cache",
+    "request_key",
+]
@@ -0,0 +1,361 @@
+"""
+Admission control of synchronous synthesis
+Estimates each request's cost, queues it in a priority lane and rejects what cannot finish in time
+"""
+import asyncio
+import math
+import time
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..core.observability import record_stage
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "X-Deadline-Ms"  # Milliseconds the client will wait for the response
+
+INTERACTIVE = "interactive"
+LONG = "long"
+
+# Characters of text per second of speech, until measured per language
+SPEAKING_RATES = {
+    "en": 15.0, "es": 15.0, "fr": 15.0, "de": 14.0, "it": 15.0, "pt": 15.0, "pl": 13.0, "tr": 13.0,
+    "ru": 13.0, "nl": 14.0, "cs": 13.0, "ar": 12.0, "hu": 13.0, "hi": 12.0,
+    "zh-cn": 5.0, "ja": 7.0, "ko": 6.0,
+}
+_DEFAULT_SPEAKING_RATE = 14.0
+
+# Weight of each new measurement in the running averages
+_SMOOTHING = 0.2
+
+# Fixed per-request cost: conditioning, encoding and storage
+_OVERHEAD_SECONDS = 0.3
+
+
+class OverloadedError(Exception):
+    """Raised when a request would wait longer than its lane or its deadline allows"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before synthesis starts"""
+
+
+class CostModel:
+    """
+    Predicts the synthesis time of a request
+
+    Seconds of speech are estimated from the text length and the speaking
+    rate of the language, then multiplied by the real-time factor of the
+    model. Both are running averages of completed syntheses, starting from
+    ``SPEAKING_RATES`` and ``default_rtf``.
+    """
+
+    def __init__(self, default_rtf: float):
+        self.default_rtf = default_rtf
+        self._rtf: Dict[str, float] = {}
+        self._speaking_rates: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, chars: int, language: str, model: Optional[str] = None) -> float:
+        """Predicted seconds of synthesis, without queueing"""
+        with self._lock:
+            rate = self._speaking_rates.get(language) or SPEAKING_RATES.get(language, _DEFAULT_SPEAKING_RATE)
+            rtf = self._rtf.get(model or settings.TTS_MODEL, self.default_rtf)
+        return _OVERHEAD_SECONDS + chars / rate * rtf
+
+    def observe(self, chars: int, language: str, model: Optional[str], audio_seconds: float, elapsed: float):
+        """Fold one completed synthesis into the averages"""
+        if audio_seconds <= 0 or elapsed <= 0 or chars <= 0:
+            return
+        model = model or settings.TTS_MODEL
+        with self._lock:
+            self._rtf[model] = _smooth(self._rtf.get(model), elapsed / audio_seconds)
+            self._speaking_rates[language] = _smooth(self._speaking_rates.get(language), chars / audio_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "default_rtf": self.default_rtf,
+                "rtf": {model: round(rtf, 3) for model, rtf in self._rtf.items()},
+                "speaking_rates": {lang: round(rate, 2) for lang, rate in self._speaking_rates.items()},
+            }
+
+
+def _smooth(previous: Optional[float], value: float) -> float:
+    return value if previous is None else previous + _SMOOTHING * (value - previous)
+
+
+@dataclass(eq=False)
+class Ticket:
+    """A request's place in a lane, from admission until its synthesis finishes"""
+    lane: "Lane"
+    cost: float
+    deadline: Optional[float]  # time.monotonic() value, None for no deadline
+    admitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    future: Optional[asyncio.Future] = None
+    released: bool = False
+
+    def release(self):
+        """Free the ticket's slot; safe to call from any thread, and more than once"""
+        self.lane.release(self)
+
+
+class Lane:
+    """
+    Requests of one priority, run ``slots`` at a time in arrival order
+
+    State is confined to the event loop; ``release`` hands over from worker
+    threads with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, name: str, slots: int, max_queue: int, max_wait: float):
+        """
+        Initialize the lane
+
+        Args:
+            name: Lane name, used in metrics
+            slots: Requests synthesized at once
+            max_queue: Requests allowed to wait for a slot
+            max_wait: Longest predicted wait admitted, in seconds
+        """
+        self.name = name
+        self.slots = max(1, slots)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.running: List[Ticket] = []
+        self.queue: Deque[Ticket] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._admitted, self._rejected, self._expired = (
+            metrics.counter(
+                "tts_admission_total", "Admission decisions by lane and outcome",
+                labels={"lane": name, "outcome": outcome},
+            )
+            for outcome in ("admitted", "rejected", "expired")
+        )
+        metrics.gauge(
+            "tts_admission_queue_depth", "Requests waiting for a synthesis slot", labels={"lane": name}
+        ).set_function(lambda: len(self.queue))
+        metrics.gauge(
+            "tts_admission_predicted_wait_seconds", "Predicted wait of a request arriving now", labels={"lane": name}
+        ).set_function(self.predicted_wait)
+
+    def predicted_wait(self) -> float:
+        """Seconds until a request arriving now would get a slot"""
+        if len(self.running) < self.slots and not self.queue:
+            return 0.0
+        now = time.monotonic()
+        remaining = sum(max(t.cost - (now - t.started_at), 0.0) for t in list(self.running))
+        queued = sum(t.cost for t in list(self.queue))
+        return (remaining + queued) / self.slots
+
+    async def acquire(self, cost: float, deadline: Optional[float]) -> Ticket:
+        """
+        Wait for a slot
+
+        Raises:
+            OverloadedError: If the backlog is full or the predicted wait is too long
+            DeadlineExceededError: If the deadline passes while waiting
+        """
+        self._loop = asyncio.get_running_loop()
+        ticket = Ticket(lane=self, cost=cost, deadline=deadline)
+        now = ticket.admitted_at
+        if deadline is not None and deadline <= now:
+            self._expired.inc()
+            raise DeadlineExceededError("Deadline passed before the request was admitted")
+
+        wait = self.predicted_wait()
+        if wait > 0:
+            reason = None
+            if len(self.queue) >= self.max_queue:
+                reason = f"{self.name} backlog is full ({len(self.queue)} requests)"
+            elif wait > self.max_wait:
+                reason = f"Predicted wait of {wait:.1f}s exceeds the {self.name} limit of {self.max_wait:.0f}s"
+            elif deadline is not None and now + wait + cost > deadline:
+                reason = f"Predicted completion in {wait + cost:.1f}s is past the deadline"
+            if reason:
+                self._rejected.inc()
+                raise OverloadedError(reason, retry_after=wait)
+
+        if len(self.running) < self.slots and not self.queue:
+            self._start(ticket)
+        else:
+            ticket.future = self._loop.create_future()
+            self.queue.append(ticket)
+            timeout = deadline - time.monotonic() if deadline is not None else None
+            try:
+                await asyncio.wait({ticket.future}, timeout=timeout)
+            except BaseException:
+                # Client went away while waiting
+                self._abandon(ticket)
+                raise
+            if ticket.future.cancelled():
+                # Dropped by ``_release`` once its deadline had passed
+                raise DeadlineExceededError("Deadline passed while waiting for a synthesis slot")
+            if not ticket.future.done():
+                self._abandon(ticket)
+                self._expired.inc()
+                raise DeadlineExceededError("Deadline passed while waiting for a synthesis slot")
+
+        self._admitted.inc()
+        record_stage("admission_wait", time.monotonic() - ticket.admitted_at)
+        return ticket
+
+    def _start(self, ticket: Ticket):
+        ticket.started_at = time.monotonic()
+        self.running.append(ticket)
+        if ticket.future is not None and not ticket.future.done():
+            ticket.future.set_result(None)
+
+    def _abandon(self, ticket: Ticket):
+        if ticket in self.queue:
+            self.queue.remove(ticket)
+            ticket.future.cancel()
+        else:
+            # Granted as it gave up: hand the slot on
+            self._release(ticket)
+
+    def release(self, ticket: Ticket):
+        loop = self._loop
+        try:
+            in_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop or loop is None:
+            self._release(ticket)
+        else:
+            loop.call_soon_threadsafe(self._release, ticket)
+
+    def _release(self, ticket: Ticket):
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket in self.running:
+            self.running.remove(ticket)
+
+        now = time.monotonic()
+        while self.queue and len(self.running) < self.slots:
+            waiter = self.queue.popleft()
+            if waiter.deadline is not None and waiter.deadline <= now:
+                # Drop work nobody is waiting for any more
+                waiter.future.cancel()
+                self._expired.inc()
+                continue
+            self._start(waiter)
+
+    def stats(self) -> dict:
+        return {
+            "slots": self.slots,
+            "running": len(self.running),
+            "queued": len(self.queue),
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "predicted_wait_seconds": round(self.predicted_wait(), 3),
+        }
+
+
+class AdmissionController:
+    """
+    Admission control in front of synchronous synthesis
+
+    Each request's synthesis time is estimated by a ``CostModel``. Requests
+    estimated under ``interactive_max_cost`` seconds go to the interactive
+    lane, longer renders to the long lane, so short requests never queue
+    behind long-form work. A lane rejects a request with ``OverloadedError``
+    (HTTP 429 with ``Retry-After``) when its backlog is full or the predicted
+    wait exceeds the lane's limit or the client's deadline, and drops queued
+    requests whose deadline has passed.
+    """
+
+    def __init__(self, cost_model: CostModel, lanes: Dict[str, Lane], interactive_max_cost: float):
+        """
+        Initialize the controller
+
+        Args:
+            cost_model: Synthesis time estimator
+            lanes: The ``INTERACTIVE`` and ``LONG`` lanes
+            interactive_max_cost: Estimated seconds above which a request is routed to the long lane
+        """
+        self.cost_model = cost_model
+        self.lanes = lanes
+        self.interactive_max_cost = interactive_max_cost
+
+    def lane_for(self, cost: float) -> Lane:
+        return self.lanes[INTERACTIVE if cost <= self.interactive_max_cost else LONG]
+
+    async def admit(
+        self,
+        text: str,
+        language: str,
+        model: Optional[str] = None,
+        deadline_ms: Optional[float] = None,
+    ) -> Ticket:
+        """
+        Wait until a request may be synthesized
+
+        Args:
+            text: Text to synthesize
+            language: Language code
+            model: Model from ``resolve_model``, None for the default model
+            deadline_ms: Milliseconds the client will wait, from now
+
+        Returns:
+            Ticket to release once synthesis is done
+
+        Raises:
+            OverloadedError: If the request should be retried later
+            DeadlineExceededError: If it cannot start before its deadline
+        """
+        cost = self.cost_model.estimate(len(text), language, model)
+        deadline = time.monotonic() + deadline_ms / 1000.0 if deadline_ms is not None else None
+        return await self.lane_for(cost).acquire(cost, deadline)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.ADMISSION_ENABLED,
+            "interactive_max_cost_seconds": self.interactive_max_cost,
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+            "cost_model": self.cost_model.stats(),
+        }
+
+
+# Global instance (singleton pattern)
+_admission_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the global admission controller instance"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            CostModel(default_rtf=settings.ADMISSION_DEFAULT_RTF),
+            lanes={
+                INTERACTIVE: Lane(
+                    INTERACTIVE,
+                    slots=settings.ADMISSION_INTERACTIVE_SLOTS,
+                    max_queue=settings.ADMISSION_INTERACTIVE_MAX_QUEUE,
+                    max_wait=settings.ADMISSION_INTERACTIVE_MAX_WAIT_SECONDS,
+                ),
+                LONG: Lane(
+                    LONG,
+                    slots=settings.ADMISSION_LONG_SLOTS,
+                    max_queue=settings.ADMISSION_LONG_MAX_QUEUE,
+                    max_wait=settings.ADMISSION_LONG_MAX_WAIT_SECONDS,
+                ),
+            },
+            interactive_max_cost=settings.ADMISSION_INTERACTIVE_MAX_COST_SECONDS,
+        )
+    return _admission_controller
@@ -0,0 +1,65 @@
+"""
+Raw audio helpers: PCM conversion and WAV framing
+"""
+import struct
+
+import numpy as np
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+CHANNELS = 1
+
+# Placeholder size used in headers of streams whose length is not known yet
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def to_pcm16(samples) -> bytes:
+    """Convert float samples in [-1, 1] to little-endian 16-bit PCM bytes"""
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+def wav_header(sample_rate: int, data_size: int = None) -> bytes:
+    """
+    Build a 44 byte canonical WAV header for mono 16-bit PCM
+
+    Args:
+        sample_rate: Sample rate in Hz
+        data_size: Size of the PCM payload in bytes, or None when streaming
+
+    Returns:
+        Header bytes
+    """
+    if data_size is None:
+        riff_size = data_size = _UNKNOWN_SIZE
+    else:
+        riff_size = 36 + data_size
+    byte_rate = sample_rate * CHANNELS * SAMPLE_WIDTH
+    return b"".join([
+        b"RIFF", struct.pack("<I", riff_size), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, CHANNELS, sample_rate, byte_rate,
+                              CHANNELS * SAMPLE_WIDTH, SAMPLE_WIDTH * 8),
+        b"data", struct.pack("<I", data_size),
+    ])
+
+
+def samples_duration(samples, sample_rate: int) -> float:
+    """Length of a mono buffer in seconds"""
+    return len(samples) / float(sample_rate) if sample_rate else 0.0
+
+
+def encode_wav(samples, sample_rate: int) -> bytes:
+    """Encode float samples as a complete mono 16-bit WAV file in memory"""
+    pcm = to_pcm16(samples)
+    return wav_header(sample_rate, len(pcm)) + pcm
+
+
+def write_wav(path: str, samples, sample_rate: int):
+    """
+    Write float samples to a mono 16-bit WAV file
+
+    The file is encoded in memory first so it reaches disk in a single
+    write, without the header patching ``wave`` does on close.
+    """
+    data = encode_wav(samples, sample_rate)
+    with open(path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,104 @@
+"""
+Signal processing helpers for assembling and cleaning up audio
+"""
+from typing import List
+
+import numpy as np
+
+
+def rms_dbfs(samples: np.ndarray) -> float:
+    """Root mean square level in dBFS (-inf for silence)"""
+    if samples.size == 0:
+        return float("-inf")
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    return 20 * np.log10(rms) if rms > 0 else float("-inf")
+
+
+def normalize_loudness(samples: np.ndarray, target_dbfs: float = -20.0, peak_limit: float = 0.98) -> np.ndarray:
+    """
+    Scale audio to a target RMS level without clipping
+
+    Args:
+        samples: Float samples in [-1, 1]
+        target_dbfs: Desired RMS level
+        peak_limit: Maximum absolute sample value after scaling
+
+    Returns:
+        Scaled float32 samples
+    """
+    level = rms_dbfs(samples)
+    if not np.isfinite(level):
+        return samples.astype(np.float32)
+
+    gain = 10 ** ((target_dbfs - level) / 20)
+    peak = float(np.max(np.abs(samples))) * gain
+    if peak > peak_limit:
+        gain *= peak_limit / peak
+    return (samples * gain).astype(np.float32)
+
+
+def crossfade_concat(segments: List[np.ndarray], sample_rate: int, crossfade_ms: float = 30.0) -> np.ndarray:
+    """
+    Join segments with equal-power crossfades
+
+    Args:
+        segments: Float sample arrays in playback order
+        sample_rate: Sample rate in Hz
+        crossfade_ms: Overlap between neighbouring segments
+
+    Returns:
+        Concatenated float32 samples
+    """
+    segments = [np.asarray(s, dtype=np.float32).reshape(-1) for s in segments if len(s)]
+    if not segments:
+        return np.zeros(0, dtype=np.float32)
+
+    fade_len = int(sample_rate * crossfade_ms / 1000)
+    output = segments[0]
+    for segment in segments[1:]:
+        overlap = min(fade_len, len(output), len(segment))
+        if overlap == 0:
+            output = np.concatenate([output, segment])
+            continue
+
+        t = np.linspace(0, np.pi / 2, overlap, dtype=np.float32)
+        mixed = output[-overlap:] * np.cos(t) + segment[:overlap] * np.sin(t)
+        output = np.concatenate([output[:-overlap], mixed, segment[overlap:]])
+    return output
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_dbfs: float = -45.0,
+    frame_ms: float = 20.0,
+    padding_ms: float = 100.0,
+) -> np.ndarray:
+    """
+    Remove leading and trailing silence
+
+    Args:
+        samples: Float samples
+        sample_rate: Sample rate in Hz
+        threshold_dbfs: Frames quieter than this count as silence
+        frame_ms: Analysis frame length
+        padding_ms: Silence kept on each side of the speech
+
+    Returns:
+        Trimmed samples (unchanged if everything is below the threshold)
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return samples
+
+    frames = samples[:n_frames * frame].reshape(n_frames, frame).astype(np.float64)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    voiced = np.nonzero(rms > 10 ** (threshold_dbfs / 20))[0]
+    if voiced.size == 0:
+        return samples
+
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, voiced[0] * frame - padding)
+    end = min(len(samples), (voiced[-1] + 1) * frame + padding)
+    return samples[start:end]
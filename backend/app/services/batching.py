@@ -0,0 +1,181 @@
+"""
+Dynamic micro-batching scheduler
+Collects synthesis requests that arrive while the model workers are busy,
+renders identical ones once and spreads the rest over the workers
+"""
+import time
+import queue
+import threading
+import logging
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .model_registry import get_voice_service
+from .voice_cloning import VoiceCloningService
+
+logger = logging.getLogger(__name__)
+
+batch_size_histogram = metrics.histogram(
+    "tts_batch_size",
+    "Number of requests executed per scheduler batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+batch_wait_histogram = metrics.histogram(
+    "tts_batch_wait_seconds",
+    "Time a request waited in the scheduler before its batch started",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+@dataclass
+class _PendingRequest:
+    text: str
+    speaker_wav: Optional[str]
+    language: str
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    # Resolved with (samples, seconds the model spent rendering them)
+    future: Future = field(default_factory=Future)
+
+    @property
+    def group_key(self) -> Tuple[str, Optional[str], str]:
+        # Requests that produce the same audio
+        return self.text, self.speaker_wav, self.language
+
+
+class BatchScheduler:
+    """
+    Coalesces concurrent requests for one model instance
+
+    A dispatcher thread collects a batch once one of ``workers`` threads is
+    free, so requests arriving while all workers are busy queue up and form
+    the next batch, and a request on an idle server is dispatched at once.
+    Identical requests in a batch are rendered once; every distinct request
+    runs on its own worker as soon as one is free. XTTS decodes a single
+    sequence per forward pass, so spreading requests over workers is what
+    keeps throughput at least at the unbatched level. ``max_wait_ms``
+    optionally holds a batch open a little longer to gather duplicates.
+    """
+
+    def __init__(
+        self,
+        service: VoiceCloningService,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 0.0,
+        workers: int = 8,
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            service: Model used to render requests
+            max_batch_size: Maximum number of requests per batch
+            max_wait_ms: Extra time a batch waits for company once a worker is free
+            workers: Distinct requests rendered at the same time
+        """
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.workers = max(1, workers)
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        metrics.gauge("tts_batch_queue_depth", "Requests waiting in the batch scheduler").set_function(
+            self._queue.qsize
+        )
+        # One slot per worker; the dispatcher takes one before handing over a render
+        self._slots = threading.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tts-batch-worker")
+        self._thread = threading.Thread(target=self._run, name="tts-batch-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str, speaker_wav: Optional[str] = None, language: str = "en") -> Tuple[np.ndarray, float]:
+        """
+        Synthesize speech through the scheduler, blocking until done
+
+        Args:
+            text: Text to convert to speech
+            speaker_wav: Path to reference audio file for voice cloning (optional)
+            language: Language code
+
+        Returns:
+            Float32 samples at the model's sample rate, and the seconds the
+            model spent on them (without the time queued in the scheduler)
+        """
+        request = _PendingRequest(text=text, speaker_wav=speaker_wav, language=language)
+        self._queue.put(request)
+        return request.future.result()
+
+    def _collect(self) -> List[_PendingRequest]:
+        batch = [self._queue.get()]
+        # Everything that queued up while the workers were busy joins at once
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Wait for a free worker first, so requests pile up into a batch meanwhile
+            self._slots.acquire()
+            batch = self._collect()
+            batch_size_histogram.observe(len(batch))
+
+            groups: Dict[Tuple[str, Optional[str], str], List[_PendingRequest]] = defaultdict(list)
+            for request in batch:
+                groups[request.group_key].append(request)
+
+            for index, group in enumerate(groups.values()):
+                if index > 0:
+                    self._slots.acquire()
+                self._executor.submit(self._execute, group)
+
+    def _execute(self, group: List[_PendingRequest]):
+        """Render one distinct request and hand the samples to every caller that asked for it"""
+        try:
+            started_at = time.perf_counter()
+            for request in group:
+                batch_wait_histogram.observe(started_at - request.enqueued_at)
+
+            first = group[0]
+            try:
+                result = self.service.synthesize_timed(first.text, speaker_wav=first.speaker_wav, language=first.language)
+            except Exception as e:
+                logger.error(f"Synthesis for {len(group)} coalesced requests failed: {str(e)}")
+                for request in group:
+                    request.future.set_exception(e)
+                return
+
+            for request in group:
+                request.future.set_result(result)
+        finally:
+            self._slots.release()
+
+
+# Global instance (singleton pattern)
+_batch_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_batch_scheduler() -> BatchScheduler:
+    """Get the global batch scheduler instance"""
+    global _batch_scheduler
+    with _scheduler_lock:
+        if _batch_scheduler is None:
+            _batch_scheduler = BatchScheduler(
+                get_voice_service(),
+                max_batch_size=settings.BATCH_MAX_SIZE,
+                max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+                workers=settings.BATCH_WORKERS,
+            )
+    return _batch_scheduler
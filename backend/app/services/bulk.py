@@ -0,0 +1,386 @@
+"""
+Bulk generation of large scripts
+Parses JSONL/CSV batches, renders each distinct line once and records the rows in bulk
+"""
+import csv
+import io
+import json
+import os
+import tarfile
+import time
+import uuid
+import zipfile
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from .generation import (
+    GenerationError,
+    VoiceProfileNotFoundError,
+    build_generated_audio,
+    resolve_speaker_wav,
+    synthesize_to_store,
+)
+from .model_registry import UnknownModelError, resolve_model
+from .result_cache import request_key
+from .segment_cache import SegmentReuse
+from .storage import audio_url, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ("zip", "tar")
+
+# Rows are inserted once this many results are ready, or after the interval
+_INSERT_CHUNK = 50
+_INSERT_INTERVAL_SECONDS = 2.0
+
+
+class InvalidBatchError(Exception):
+    """Raised when a batch file cannot be parsed"""
+
+
+@dataclass
+class BatchItem:
+    line: int
+    text: str
+    voice_profile_id: Optional[int] = None
+    settings: Optional[dict] = None
+
+    @property
+    def language(self) -> str:
+        return (self.settings or {}).get("language", "en")
+
+
+@dataclass
+class _Task:
+    """One distinct item and the input lines that asked for it"""
+    item: BatchItem
+    lines: List[int] = field(default_factory=list)
+    speaker_wav: Optional[str] = None
+    status: str = "pending"
+    generated_audio_id: Optional[int] = None
+    storage_key: Optional[str] = None
+    duration: Optional[float] = None
+    segment_reuse: Optional[SegmentReuse] = None
+    error: Optional[str] = None
+
+    @property
+    def archive_member(self) -> str:
+        return f"{self.item.line:06d}.wav"
+
+
+def _parse_item(fields: dict, line: int) -> BatchItem:
+    text = fields.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise InvalidBatchError(f"Line {line}: 'text' is required")
+
+    voice_profile_id = fields.get("voice_profile_id")
+    if voice_profile_id in ("", None):
+        voice_profile_id = None
+    else:
+        try:
+            voice_profile_id = int(voice_profile_id)
+        except (TypeError, ValueError):
+            raise InvalidBatchError(f"Line {line}: 'voice_profile_id' must be an integer")
+
+    item_settings = fields.get("settings")
+    if isinstance(item_settings, str):
+        try:
+            item_settings = json.loads(item_settings) if item_settings.strip() else None
+        except ValueError:
+            raise InvalidBatchError(f"Line {line}: 'settings' is not valid JSON")
+    if item_settings is not None and not isinstance(item_settings, dict):
+        raise InvalidBatchError(f"Line {line}: 'settings' must be an object")
+
+    # CSV files may carry the language as its own column
+    if fields.get("language"):
+        item_settings = {**(item_settings or {}), "language": fields["language"]}
+
+    try:
+        resolve_model(item_settings)
+    except UnknownModelError as e:
+        raise InvalidBatchError(f"Line {line}: {str(e)}")
+
+    return BatchItem(line=line, text=text, voice_profile_id=voice_profile_id, settings=item_settings or None)
+
+
+def parse_batch(data: bytes, filename: str) -> List[BatchItem]:
+    """
+    Parse a batch file
+
+    JSONL files hold one object per line; CSV files have a header row with
+    ``text``, ``voice_profile_id`` and ``settings`` (JSON) or ``language``
+    columns.
+
+    Args:
+        data: File contents
+        filename: Original filename; a ``.csv`` suffix selects CSV
+
+    Returns:
+        Items in file order, numbered by their line in the file
+    """
+    try:
+        content = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise InvalidBatchError("Batch file must be UTF-8 encoded")
+
+    items = []
+    if filename.lower().endswith(".csv"):
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames or "text" not in reader.fieldnames:
+            raise InvalidBatchError("CSV batch needs a header row with a 'text' column")
+        for row in reader:
+            items.append(_parse_item(row, reader.line_num))
+    else:
+        for line, raw in enumerate(content.splitlines(), start=1):
+            if not raw.strip():
+                continue
+            try:
+                fields = json.loads(raw)
+            except ValueError:
+                raise InvalidBatchError(f"Line {line}: not valid JSON")
+            if not isinstance(fields, dict):
+                raise InvalidBatchError(f"Line {line}: expected a JSON object")
+            items.append(_parse_item(fields, line))
+    return items
+
+
+def plan_batch(items: List[BatchItem]) -> List[_Task]:
+    """
+    Deduplicate items and order them for rendering
+
+    Identical requests (same normalized text, voice and settings) become one
+    task. Tasks are grouped by voice and language so consecutive renders
+    reuse the same speaker latents, and sorted by length within a group.
+    """
+    tasks: Dict[str, _Task] = {}
+    for item in items:
+        key = request_key(
+            text=item.text,
+            voice_profile_id=item.voice_profile_id,
+            speaker_wav=None,
+            language=item.language,
+            generation_settings=item.settings,
+        )
+        task = tasks.setdefault(key, _Task(item=item))
+        task.lines.append(item.line)
+
+    return sorted(
+        tasks.values(),
+        key=lambda t: (t.item.voice_profile_id or 0, t.item.language, len(t.item.text)),
+    )
+
+
+def _resolve_speakers(db: Session, tasks: List[_Task]):
+    """Look up each voice once; tasks of a missing voice fail up front"""
+    speakers: Dict[Optional[int], object] = {}
+    for task in tasks:
+        voice_profile_id = task.item.voice_profile_id
+        if voice_profile_id not in speakers:
+            try:
+                speakers[voice_profile_id] = resolve_speaker_wav(db, voice_profile_id)
+            except VoiceProfileNotFoundError:
+                speakers[voice_profile_id] = VoiceProfileNotFoundError("Voice profile not found")
+            except GenerationError as e:
+                speakers[voice_profile_id] = e
+
+        speaker = speakers[voice_profile_id]
+        if isinstance(speaker, Exception):
+            task.status = "failed"
+            task.error = str(speaker)
+        else:
+            task.speaker_wav = speaker
+    db.commit()
+
+
+def _render(task: _Task):
+    item = task.item
+    return synthesize_to_store(
+        item.text,
+        speaker_wav=task.speaker_wav,
+        language=item.language,
+        voice_profile_id=item.voice_profile_id,
+        generation_settings=item.settings,
+    )
+
+
+def _insert_rows(db: Session, tasks: List[_Task]):
+    """Insert the rows of rendered tasks in one flush and commit"""
+    rows = [
+        build_generated_audio(
+            t.item.text,
+            t.storage_key,
+            t.duration,
+            voice_profile_id=t.item.voice_profile_id,
+            generation_settings=t.item.settings,
+            segment_reuse=t.segment_reuse,
+        )
+        for t in tasks
+    ]
+    db.add_all(rows)
+    db.flush()
+    for task, row in zip(tasks, rows):
+        task.generated_audio_id = row.id
+        task.status = "succeeded"
+    db.commit()
+
+
+def _item_event(task: _Task, completed: int, total: int) -> dict:
+    return {
+        "event": "item",
+        "lines": task.lines,
+        "status": task.status,
+        "generated_audio_id": task.generated_audio_id,
+        "audio_url": audio_url(task.storage_key),
+        "duration": task.duration,
+        "segment_reuse_ratio": task.segment_reuse.ratio if task.segment_reuse else None,
+        "error": task.error,
+        "completed": completed,
+        "total": total,
+    }
+
+
+def _manifest(batch_id: str, items: List[BatchItem], tasks: List[_Task], archive_format: Optional[str]) -> dict:
+    by_line = {line: task for task in tasks for line in task.lines}
+    entries = []
+    for item in items:
+        task = by_line[item.line]
+        entries.append({
+            "line": item.line,
+            "text": item.text,
+            "voice_profile_id": item.voice_profile_id,
+            "settings": item.settings,
+            "status": task.status,
+            "generated_audio_id": task.generated_audio_id,
+            "storage_key": task.storage_key,
+            "audio_url": audio_url(task.storage_key),
+            "duration": task.duration,
+            "error": task.error,
+            "archive_member": task.archive_member if archive_format and task.storage_key else None,
+        })
+    return {
+        "batch_id": batch_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "items": entries,
+    }
+
+
+def _build_archive(batch_id: str, tasks: List[_Task], manifest_bytes: bytes, archive_format: str) -> str:
+    """Pack the manifest and every distinct output into an archive blob"""
+    blob_store = get_blob_store()
+    tmp_dir = os.path.join(settings.UPLOAD_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, f"batch_{batch_id}.{archive_format}")
+    outputs = [t for t in tasks if t.storage_key]
+
+    try:
+        if archive_format == "zip":
+            # WAV barely compresses; storing keeps packing I/O bound
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+                archive.writestr("manifest.json", manifest_bytes)
+                for task in outputs:
+                    archive.write(blob_store.local_path(task.storage_key), task.archive_member)
+        else:
+            with tarfile.open(tmp_path, "w") as archive:
+                info = tarfile.TarInfo("manifest.json")
+                info.size = len(manifest_bytes)
+                info.mtime = int(time.time())
+                archive.addfile(info, io.BytesIO(manifest_bytes))
+                for task in outputs:
+                    archive.add(blob_store.local_path(task.storage_key), task.archive_member)
+
+        key = f"batches/{batch_id}/outputs.{archive_format}"
+        blob_store.put_file(key, tmp_path)
+        return key
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def run_batch(items: List[BatchItem], archive_format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Render a batch, yielding progress events
+
+    Distinct items are rendered by ``BULK_CONCURRENCY`` threads in planned
+    order; their rows are inserted in chunks rather than one commit per
+    item. Stopping the iteration (e.g. the client disconnected) cancels the
+    items that have not started.
+
+    Args:
+        items: Parsed batch items
+        archive_format: ``zip`` or ``tar`` to also pack the outputs
+
+    Yields:
+        ``started``, one ``item`` per distinct item, then ``finished`` with
+        the manifest and archive URLs
+    """
+    batch_id = uuid.uuid4().hex
+    tasks = plan_batch(items)
+    total = len(tasks)
+    completed = 0
+    yield {"event": "started", "batch_id": batch_id, "items": len(items), "unique": total}
+    logger.info(f"Batch {batch_id}: {len(items)} items, {total} distinct")
+
+    db = SessionLocal()
+    executor = ThreadPoolExecutor(max_workers=max(1, settings.BULK_CONCURRENCY), thread_name_prefix="bulk")
+    try:
+        _resolve_speakers(db, tasks)
+        for task in tasks:
+            if task.status == "failed":
+                completed += 1
+                yield _item_event(task, completed, total)
+
+        futures = {executor.submit(_render, t): t for t in tasks if t.status == "pending"}
+        ready: List[_Task] = []
+        last_insert = time.monotonic()
+        while futures:
+            done, _ = wait(futures, timeout=_INSERT_INTERVAL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = futures.pop(future)
+                try:
+                    task.storage_key, task.duration, task.segment_reuse = future.result()
+                except Exception as e:
+                    task.status = "failed"
+                    task.error = str(e) or e.__class__.__name__
+                    completed += 1
+                    yield _item_event(task, completed, total)
+                else:
+                    ready.append(task)
+
+            due = time.monotonic() - last_insert >= _INSERT_INTERVAL_SECONDS
+            if ready and (len(ready) >= _INSERT_CHUNK or due or not futures):
+                _insert_rows(db, ready)
+                for task in ready:
+                    completed += 1
+                    yield _item_event(task, completed, total)
+                ready = []
+                last_insert = time.monotonic()
+
+        manifest = _manifest(batch_id, items, tasks, archive_format)
+        manifest_bytes = json.dumps(manifest, indent=2).encode()
+        manifest_key = f"batches/{batch_id}/manifest.json"
+        get_blob_store().put_bytes(manifest_key, manifest_bytes)
+
+        archive_key = None
+        if archive_format:
+            archive_key = _build_archive(batch_id, tasks, manifest_bytes, archive_format)
+
+        succeeded = sum(1 for t in tasks if t.status == "succeeded")
+        logger.info(f"Batch {batch_id} finished: {succeeded}/{total} succeeded")
+        yield {
+            "event": "finished",
+            "batch_id": batch_id,
+            "succeeded": succeeded,
+            "failed": total - succeeded,
+            "manifest_url": audio_url(manifest_key),
+            "archive_url": audio_url(archive_key),
+        }
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        db.close()
@@ -0,0 +1,468 @@
+"""
+Speech generation workflow
+Turns a generation request into a stored audio blob and a GeneratedAudio row
+"""
+import time
+from typing import Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..core.observability import record_stage, timed_stage
+from ..models import VoiceProfile, GeneratedAudio, RequestProfile
+from .admission import get_admission_controller
+from .audio_io import encode_wav, samples_duration
+from .batching import get_batch_scheduler
+from .inference_pool import get_inference_pool
+from .longform import is_long_form, synthesize_incremental, synthesize_long_text
+from .model_registry import get_voice_service, resolve_model
+from .profiling import ProfileSession, save_profile
+from .voice_samples import VoiceProfileNotFoundError, speaker_reference
+from .result_cache import get_result_cache, request_key
+from .segment_cache import SegmentReuse, segment_scope
+from .hashing import file_sha256
+from .storage import StorageError, bytes_sha256, content_key, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+real_time_factor = metrics.histogram(
+    "tts_real_time_factor",
+    "Synthesis seconds per second of audio produced",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+chars_per_second = metrics.histogram(
+    "tts_chars_per_second",
+    "Characters of input text synthesized per second",
+    buckets=(5, 10, 20, 40, 80, 160, 320, 640, 1280),
+)
+time_to_first_audio = metrics.histogram(
+    "tts_time_to_first_audio_seconds",
+    "Seconds from a streaming request's arrival to its first audio chunk",
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+synthesis_in_flight = metrics.gauge("tts_synthesis_in_flight", "Syntheses currently being rendered")
+
+
+class GenerationError(Exception):
+    """Raised when speech synthesis fails"""
+
+
+def resolve_speaker_wav(db: Session, voice_profile_id: Optional[int]) -> Optional[str]:
+    """
+    Look up the speaker reference of a voice profile
+
+    Args:
+        db: Database session
+        voice_profile_id: Voice profile to clone (optional)
+
+    Returns:
+        The profile's aggregate latents or sample path, or None when no
+        profile was requested
+    """
+    if not voice_profile_id:
+        return None
+    voice = db.query(VoiceProfile).filter(VoiceProfile.id == voice_profile_id).first()
+    if not voice:
+        raise VoiceProfileNotFoundError(voice_profile_id)
+    try:
+        return speaker_reference(voice)
+    except StorageError as e:
+        raise GenerationError(f"Voice sample unavailable: {str(e)}") from e
+
+
+def store_audio(samples: np.ndarray, sample_rate: int) -> str:
+    """
+    Encode synthesized audio and write it to the blob store
+
+    The WAV is encoded in memory and written once. Keys are content
+    addressed, so concurrent requests never overwrite each other and
+    identical outputs share one blob.
+
+    Returns:
+        Storage key of the WAV
+    """
+    with timed_stage("encode"):
+        data = encode_wav(samples, sample_rate)
+        key = content_key("generated", bytes_sha256(data), "wav")
+    with timed_stage("storage_write"):
+        get_blob_store().put_bytes(key, data)
+    return key
+
+
+def _stored_size(audio_key: Optional[str]) -> Optional[int]:
+    """Size of stored audio; left unknown (and backfilled by maintenance) if the store cannot tell"""
+    if not audio_key:
+        return None
+    try:
+        return get_blob_store().size(audio_key)
+    except StorageError:
+        return None
+
+
+def build_generated_audio(
+    text: str,
+    audio_key: Optional[str],
+    duration: Optional[float],
+    voice_profile_id: Optional[int] = None,
+    generation_settings: Optional[dict] = None,
+    output_format: str = "wav",
+    bitrate: Optional[int] = None,
+    segment_reuse: Optional[SegmentReuse] = None,
+) -> GeneratedAudio:
+    """
+    Build (without adding) the GeneratedAudio row for stored audio
+
+    The row keeps the storage key; the public URL is built when the row is
+    serialized, so BASE_URL and the storage backend can change freely.
+    """
+    return GeneratedAudio(
+        voice_profile_id=voice_profile_id,
+        text_input=text,
+        audio_path=audio_key,
+        size_bytes=_stored_size(audio_key),
+        duration=duration,
+        duration_seconds=int(duration) if duration is not None else None,
+        output_format=output_format,
+        bitrate=bitrate,
+        segment_count=segment_reuse.total if segment_reuse else None,
+        segments_reused=segment_reuse.reused if segment_reuse else None,
+        settings=generation_settings or None
+    )
+
+
+def record_generated_audio(
+    db: Session,
+    text: str,
+    audio_key: Optional[str],
+    duration: Optional[float],
+    voice_profile_id: Optional[int] = None,
+    generation_settings: Optional[dict] = None,
+    output_format: str = "wav",
+    bitrate: Optional[int] = None,
+    segment_reuse: Optional[SegmentReuse] = None,
+    commit: bool = True,
+) -> GeneratedAudio:
+    """
+    Insert and commit the GeneratedAudio row for stored audio
+
+    With ``commit=False`` the row is only flushed (so it has an id) and the
+    caller commits it together with its own changes.
+    """
+    generated = build_generated_audio(
+        text,
+        audio_key,
+        duration,
+        voice_profile_id=voice_profile_id,
+        generation_settings=generation_settings,
+        output_format=output_format,
+        bitrate=bitrate,
+        segment_reuse=segment_reuse,
+    )
+    with timed_stage("db_commit"):
+        db.add(generated)
+        if not commit:
+            db.flush()
+            return generated
+        db.commit()
+        db.refresh(generated)
+
+    return generated
+
+
+def render_speech(
+    text: str,
+    speaker_wav: Optional[str] = None,
+    language: str = "en",
+    long_form: bool = False,
+    model: Optional[str] = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    Synthesize speech into memory using the configured execution path
+
+    Long-form text is segmented and rendered in parallel; otherwise the
+    request goes to the inference pool, the batch scheduler or the
+    in-process model, in that order of preference. Models other than the
+    default always run in-process, through the model registry.
+
+    Args:
+        text: Text to convert to speech
+        speaker_wav: Path to reference audio file for voice cloning (optional)
+        language: Language code
+        long_form: Use segmented parallel synthesis
+        model: Model from ``resolve_model``, None for the default model
+
+    Returns:
+        Tuple of (float samples, sample rate)
+    """
+    synthesis_in_flight.inc()
+    started = time.perf_counter()
+    try:
+        samples, sample_rate, model_seconds = _render(text, speaker_wav, language, long_form, model)
+    finally:
+        synthesis_in_flight.dec()
+    _observe_synthesis(text, language, model, samples, sample_rate, time.perf_counter() - started, model_seconds)
+    return samples, sample_rate
+
+
+def render_speech_incremental(
+    text: str,
+    scope: str,
+    speaker_wav: Optional[str] = None,
+    language: str = "en",
+    model: Optional[str] = None,
+) -> Tuple[np.ndarray, int, SegmentReuse]:
+    """
+    Synthesize long-form speech reusing cached sentences
+
+    Args:
+        text: Text to convert to speech
+        scope: ``segment_scope`` of the request
+        speaker_wav: Path to reference audio file for voice cloning (optional)
+        language: Language code
+        model: Model from ``resolve_model``, None for the default model
+
+    Returns:
+        Tuple of (float samples, sample rate, segment reuse)
+    """
+    synthesis_in_flight.inc()
+    started = time.perf_counter()
+    try:
+        samples, sample_rate, reuse = synthesize_incremental(text, scope, speaker_wav, language, model=model)
+    finally:
+        synthesis_in_flight.dec()
+    # Reused sentences would make the speed histograms look better than the model is
+    elapsed = time.perf_counter() - started
+    _observe_synthesis(text, language, model, samples, sample_rate, elapsed, elapsed, speed=reuse.reused == 0)
+    return samples, sample_rate, reuse
+
+
+def _observe_synthesis(
+    text: str,
+    language: str,
+    model: Optional[str],
+    samples: np.ndarray,
+    sample_rate: int,
+    elapsed: float,
+    model_seconds: float,
+    speed: bool = True,
+):
+    # Includes queueing in the scheduler or pool, as seen by the caller
+    record_stage("synthesis", elapsed)
+    audio_seconds = samples_duration(samples, sample_rate)
+    # Speed is the model's alone: queueing under load would inflate the RTF,
+    # and through it admission's predicted waits and Retry-After
+    if speed and audio_seconds > 0 and model_seconds > 0:
+        real_time_factor.observe(model_seconds / audio_seconds)
+        chars_per_second.observe(len(text) / model_seconds)
+        # Calibrates the cost estimates of admission control
+        get_admission_controller().cost_model.observe(len(text), language, model, audio_seconds, model_seconds)
+
+
+def _render(
+    text: str,
+    speaker_wav: Optional[str],
+    language: str,
+    long_form: bool,
+    model: Optional[str],
+) -> Tuple[np.ndarray, int, float]:
+    """Samples, sample rate and the seconds the model spent rendering"""
+    if long_form:
+        # Segments render in parallel, so wall time is what the request costs
+        started = time.perf_counter()
+        samples, sample_rate = synthesize_long_text(text, speaker_wav, language, model=model)
+        return samples, sample_rate, time.perf_counter() - started
+
+    inference_pool = get_inference_pool()
+    if inference_pool is not None and model is None:
+        samples, model_seconds = inference_pool.synthesize_timed(text, speaker_wav, language)
+        return samples, inference_pool.sample_rate, model_seconds
+
+    voice_service = get_voice_service(model)
+    if settings.BATCHING_ENABLED and model is None:
+        samples, model_seconds = get_batch_scheduler().submit(text, speaker_wav, language)
+    else:
+        samples, model_seconds = voice_service.synthesize_timed(text, speaker_wav=speaker_wav, language=language)
+    return samples, voice_service.sample_rate, model_seconds
+
+
+def synthesize_to_store(
+    text: str,
+    speaker_wav: Optional[str] = None,
+    language: str = "en",
+    voice_profile_id: Optional[int] = None,
+    generation_settings: Optional[dict] = None,
+) -> Tuple[str, float, Optional[SegmentReuse]]:
+    """
+    Render speech (or reuse a cached identical result) into the blob store
+
+    Long-form text goes through the sentence cache when it is enabled, so
+    only new or edited sentences are rendered.
+
+    Args:
+        text: Text to convert to speech
+        speaker_wav: Speaker reference from ``resolve_speaker_wav``
+        language: Language code
+        voice_profile_id: Voice profile, part of the result cache key
+        generation_settings: Request settings, part of the result cache key
+
+    Returns:
+        Tuple of (storage key, duration in seconds, segment reuse of a
+        sentence-cached render or None)
+    """
+    model = resolve_model(generation_settings)
+    cache_key = None
+    cached = None
+    if settings.RESULT_CACHE_ENABLED:
+        with timed_stage("cache_lookup"):
+            result_cache = get_result_cache()
+            cache_key = request_key(
+                text=text,
+                voice_profile_id=voice_profile_id,
+                speaker_wav=speaker_wav,
+                language=language,
+                generation_settings=generation_settings,
+            )
+            cached = result_cache.get(cache_key)
+
+    if cached is not None:
+        # Identical request already rendered - the blob is keyed by content,
+        # so it is usually still stored and nothing is written at all. Retention
+        # re-checks for rows using a blob right before deleting it, so one
+        # recorded for this hit keeps it.
+        try:
+            audio_key = content_key("generated", file_sha256(cached.path), "wav")
+            blob_store = get_blob_store()
+            if not blob_store.exists(audio_key):
+                blob_store.put_file(audio_key, cached.path)
+            return audio_key, cached.duration_seconds, None
+        except OSError as e:
+            # Evicted between the lookup and here; render as on a miss
+            logger.info(f"Result cache entry vanished, rendering instead: {str(e)}")
+
+    long_form = is_long_form(text, generation_settings)
+    reuse = None
+    try:
+        # Generate speech with voice cloning
+        if long_form and settings.SEGMENT_CACHE_ENABLED:
+            scope = segment_scope(voice_profile_id, speaker_wav, language, generation_settings)
+            samples, sample_rate, reuse = render_speech_incremental(
+                text, scope, speaker_wav=speaker_wav, language=language, model=model
+            )
+        else:
+            samples, sample_rate = render_speech(
+                text,
+                speaker_wav=speaker_wav,
+                language=language,
+                long_form=long_form,
+                model=model,
+            )
+    except Exception as e:
+        raise GenerationError(str(e)) from e
+
+    audio_key = store_audio(samples, sample_rate)
+    duration = samples_duration(samples, sample_rate)
+
+    if cache_key is not None:
+        result_cache.put(cache_key, get_blob_store().local_path(audio_key), duration)
+    return audio_key, duration, reuse
+
+
+def generate_audio_record(
+    db: Session,
+    text: str,
+    voice_profile_id: Optional[int] = None,
+    generation_settings: Optional[dict] = None,
+    output_format: str = "wav",
+    bitrate: Optional[int] = None,
+    commit: bool = True,
+) -> GeneratedAudio:
+    """
+    Synthesize speech for a request and record the result
+
+    The audio is rendered in memory and written once, to the blob store.
+    This is blocking: callers on the event loop must run it in a thread.
+
+    Args:
+        db: Database session
+        text: Text to convert to speech
+        voice_profile_id: Voice profile to clone (optional)
+        generation_settings: Request settings such as ``language``
+        output_format: Delivery format recorded on the row
+        bitrate: Delivery bitrate in kbps for lossy formats
+        commit: False to leave the flushed row for the caller to commit
+
+    Returns:
+        The GeneratedAudio row
+    """
+    with timed_stage("db_lookup"):
+        speaker_wav_path = resolve_speaker_wav(db, voice_profile_id)
+    # End the lookup's read transaction, so no connection idles in it while the model runs
+    db.commit()
+
+    language = generation_settings.get("language", "en") if generation_settings else "en"
+
+    audio_key = None
+    duration = None
+    reuse = None
+
+    if settings.ENABLE_VOICE_CLONING:
+        audio_key, duration, reuse = synthesize_to_store(
+            text,
+            speaker_wav=speaker_wav_path,
+            language=language,
+            voice_profile_id=voice_profile_id,
+            generation_settings=generation_settings,
+        )
+    # With voice cloning disabled nothing is rendered or stored; the row is
+    # still recorded (without audio) so the request shows up in history
+
+    return record_generated_audio(
+        db,
+        text=text,
+        audio_key=audio_key,
+        duration=duration,
+        voice_profile_id=voice_profile_id,
+        generation_settings=generation_settings,
+        output_format=output_format,
+        bitrate=bitrate,
+        segment_reuse=reuse,
+        commit=commit,
+    )
+
+
+def generate_audio_record_profiled(
+    db: Session,
+    text: str,
+    request_id: Optional[str] = None,
+    **kwargs,
+) -> Tuple[GeneratedAudio, RequestProfile]:
+    """
+    ``generate_audio_record`` under a profile session
+
+    The stack samples and torch traces are stored next to the generated
+    audio and recorded as a RequestProfile row.
+
+    Args:
+        db: Database session
+        text: Text to convert to speech
+        request_id: Id of the HTTP request, kept with the profile
+        **kwargs: Other arguments of ``generate_audio_record``
+
+    Returns:
+        Tuple of (GeneratedAudio row, RequestProfile row)
+    """
+    with ProfileSession() as session:
+        generated = generate_audio_record(db, text, **kwargs)
+    profile = save_profile(
+        db,
+        session,
+        label="generate_audio",
+        text=text,
+        output_key=generated.audio_path,
+        generated_audio_id=generated.id,
+        request_id=request_id,
+    )
+    return generated, profile
@@ -0,0 +1,63 @@
+"""
+Content hashing helpers for audio files
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Every generated file passes through here, so the memo is an LRU, not a dict that grows forever
+_MEMO_MAX_ENTRIES = 4096
+
+# (path, size, mtime_ns) -> sha256 hex digest, so an unchanged file is hashed once
+_digest_memo: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def file_sha256(path: str) -> str:
+    """
+    Return the SHA-256 hex digest of a file's contents
+
+    The digest is memoized on (path, size, mtime), so repeated calls for a
+    file that has not changed do not re-read it from disk. The memo keeps the
+    most recently used entries only.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _memo_lock:
+        digest = _digest_memo.get(memo_key)
+        if digest is not None:
+            _digest_memo.move_to_end(memo_key)
+    if digest is not None:
+        return digest
+
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+
+    with _memo_lock:
+        _digest_memo[memo_key] = digest
+        _digest_memo.move_to_end(memo_key)
+        while len(_digest_memo) > _MEMO_MAX_ENTRIES:
+            _digest_memo.popitem(last=False)
+    return digest
+
+
+def forget_file(path: str):
+    """Drop memoized digests for a path (e.g. after it was replaced)"""
+    abs_path = os.path.abspath(path)
+    with _memo_lock:
+        for key in [k for k in _digest_memo if k[0] == abs_path]:
+            del _digest_memo[key]
@@ -0,0 +1,161 @@
+"""
+Quality and speed check of the inference profiles
+Renders the same texts with the baseline and optimized profiles and compares them
+
+Usage:
+    python -m app.services.inference_check [--speaker-wav PATH] [--language en] [TEXT ...]
+"""
+import argparse
+import json
+import time
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+
+from ..core.config import settings
+from .audio_io import samples_duration
+from .inference_profiles import BASELINE, OPTIMIZED
+from .voice_cloning import VoiceCloningService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Please confirm your appointment for Tuesday at half past three in the afternoon.",
+    "Voice cloning turns a few seconds of reference audio into a reusable speaker profile, "
+    "so long passages can be narrated in the same voice.",
+]
+
+_FFT_SIZE = 1024
+_HOP = 256
+_BANDS = 64
+
+
+def _band_spectrum(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Long-term power spectrum in dB over log-spaced bands"""
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    if len(samples) < _FFT_SIZE:
+        samples = np.pad(samples, (0, _FFT_SIZE - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, _FFT_SIZE)[::_HOP]
+    power = np.mean(np.abs(np.fft.rfft(frames * np.hanning(_FFT_SIZE), axis=1)) ** 2, axis=0)
+
+    freqs = np.fft.rfftfreq(_FFT_SIZE, 1.0 / sample_rate)
+    edges = np.geomspace(50.0, sample_rate / 2, _BANDS + 1)
+    bands = np.array([
+        power[(freqs >= lo) & (freqs < hi)].mean() if np.any((freqs >= lo) & (freqs < hi)) else 0.0
+        for lo, hi in zip(edges[:-1], edges[1:])
+    ])
+    return 10.0 * np.log10(bands + 1e-10)
+
+
+def spectral_distance(reference: np.ndarray, candidate: np.ndarray, sample_rate: int) -> float:
+    """
+    Log-spectral distance in dB between two renders of the same text
+
+    Sampling makes the two profiles diverge in timing, so frames cannot be
+    aligned one to one; the long-term band spectra are compared instead,
+    which still catches a changed timbre, noise or a broken vocoder.
+    """
+    diff = _band_spectrum(reference, sample_rate) - _band_spectrum(candidate, sample_rate)
+    return float(np.sqrt(np.mean(diff ** 2)))
+
+
+def _render_all(service: VoiceCloningService, texts: List[str], speaker_wav: Optional[str],
+                language: str, seed: int) -> Dict:
+    service.load_model()
+    # Warm-up render so one-time costs (allocator, compilation) are not timed
+    service.synthesize(texts[0], speaker_wav=speaker_wav, language=language)
+
+    outputs, seconds, audio_seconds = [], 0.0, 0.0
+    for text in texts:
+        torch.manual_seed(seed)
+        start = time.perf_counter()
+        samples = service.synthesize(text, speaker_wav=speaker_wav, language=language)
+        seconds += time.perf_counter() - start
+        audio_seconds += samples_duration(samples, service.sample_rate)
+        outputs.append(samples)
+
+    return {
+        "outputs": outputs,
+        "sample_rate": service.sample_rate,
+        "optimizations": service.optimizations,
+        "synthesis_seconds": round(seconds, 3),
+        "audio_seconds": round(audio_seconds, 3),
+        "rtf": round(seconds / audio_seconds, 4) if audio_seconds else None,
+    }
+
+
+def compare_profiles(
+    texts: Optional[List[str]] = None,
+    speaker_wav: Optional[str] = None,
+    language: str = "en",
+    seed: int = 0,
+) -> dict:
+    """
+    Compare the optimized profile against the baseline
+
+    The profiles are loaded one after the other so only one model is in
+    memory at a time.
+
+    Args:
+        texts: Texts to render, defaults to a short mixed set
+        speaker_wav: Reference audio for voice cloning (optional)
+        language: Language code
+        seed: Torch seed set before every render
+
+    Returns:
+        Report with the RTF of each profile, the speedup and the spectral
+        distance per text, and whether it is within ``INFERENCE_CHECK_MAX_LSD_DB``
+    """
+    texts = texts or DEFAULT_TEXTS
+    results = {}
+    for profile in (BASELINE, OPTIMIZED):
+        logger.info(f"Rendering {len(texts)} texts with the {profile} profile")
+        service = VoiceCloningService(profile=profile)
+        try:
+            results[profile] = _render_all(service, texts, speaker_wav, language, seed)
+        finally:
+            service.unload_model()
+
+    baseline, optimized = results[BASELINE], results[OPTIMIZED]
+    distances = [
+        round(spectral_distance(ref, out, baseline["sample_rate"]), 3)
+        for ref, out in zip(baseline["outputs"], optimized["outputs"])
+    ]
+    max_distance = max(distances)
+    speedup = None
+    if baseline["rtf"] and optimized["rtf"]:
+        speedup = round(baseline["rtf"] / optimized["rtf"], 3)
+
+    return {
+        "texts": len(texts),
+        "profiles": {
+            profile: {k: v for k, v in result.items() if k != "outputs"}
+            for profile, result in results.items()
+        },
+        "speedup": speedup,
+        "spectral_distance_db": distances,
+        "max_spectral_distance_db": max_distance,
+        "threshold_db": settings.INFERENCE_CHECK_MAX_LSD_DB,
+        "passed": max_distance <= settings.INFERENCE_CHECK_MAX_LSD_DB,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the optimized inference profile with the baseline")
+    parser.add_argument("texts", nargs="*", help="Texts to render")
+    parser.add_argument("--speaker-wav", help="Reference audio for voice cloning")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    report = compare_profiles(args.texts, args.speaker_wav, args.language, args.seed)
+    print(json.dumps(report, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
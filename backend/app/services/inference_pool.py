@@ -0,0 +1,317 @@
+"""
+Multi-process inference pool
+Runs one VoiceCloningService replica per process, each pinned to its own cores
+"""
+import os
+import queue
+import itertools
+import threading
+import multiprocessing
+import logging
+from concurrent.futures import Future
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_SHUTDOWN = None
+_END = None
+
+# Service methods returning an iterator; replicas send their items back as they come
+_STREAMED_METHODS = {"stream_speech"}
+
+
+def _replica_main(index: int, cores: List[int], threads: int, requests, results):
+    """Entry point of a replica process"""
+    # Pin before torch spins up its thread pools
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    from .voice_cloning import VoiceCloningService
+
+    from ..core.config import settings as replica_settings
+
+    service = VoiceCloningService(manage_threads=False)
+    service.load_model()
+    if replica_settings.MODEL_WARMUP_TEXT:
+        service.synthesize(replica_settings.MODEL_WARMUP_TEXT)
+    results.put(("ready", index, None, service.sample_rate))
+
+    while True:
+        message = requests.get()
+        if message is _SHUTDOWN:
+            break
+        request_id, method, kwargs = message
+        try:
+            if method in _STREAMED_METHODS:
+                for item in getattr(service, method)(**kwargs):
+                    results.put(("chunk", index, request_id, item))
+                result = None
+            else:
+                result = getattr(service, method)(**kwargs)
+            results.put(("ok", index, request_id, result))
+        except Exception as e:
+            results.put(("error", index, request_id, f"{e.__class__.__name__}: {str(e)}"))
+
+
+class _Replica:
+    def __init__(self, index: int, cores: List[int]):
+        self.index = index
+        self.cores = cores
+        self.process: Optional[multiprocessing.Process] = None
+        self.requests = None
+        self.in_flight: Dict[int, Future] = {}
+        # Chunk queues of in-flight streamed requests still being read
+        self.streams: Dict[int, queue.Queue] = {}
+        self.ready = False
+
+
+class InferenceProcessPool:
+    """
+    Pool of inference processes with least-loaded dispatch
+
+    Each replica loads its own model, is pinned to a disjoint slice of cores
+    and runs ``threads_per_replica`` torch threads, so replicas do not
+    oversubscribe the CPU. Requests and results travel over multiprocessing
+    queues; a collector thread resolves the caller's future and a monitor
+    thread restarts replicas that die, failing their in-flight requests.
+    """
+
+    def __init__(self, size: int, threads_per_replica: int):
+        """
+        Initialize the pool
+
+        Args:
+            size: Number of replica processes
+            threads_per_replica: Torch intra-op threads per replica
+        """
+        self.size = size
+        self.threads_per_replica = threads_per_replica
+        self.sample_rate: Optional[int] = None
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._replicas: List[_Replica] = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._accepting = False
+        self._stopping = threading.Event()
+        self._idle = threading.Condition(self._lock)
+
+    def start(self):
+        """Spawn the replicas and the collector/monitor threads"""
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        for index in range(self.size):
+            start = index * self.threads_per_replica
+            cores = available[start:start + self.threads_per_replica] if available else []
+            replica = _Replica(index, cores)
+            self._replicas.append(replica)
+            self._spawn(replica)
+
+        metrics.gauge("inference_pool_in_flight", "Requests dispatched to inference replicas").set_function(
+            lambda: sum(self.load().values())
+        )
+        metrics.gauge("inference_pool_replicas_ready", "Inference replicas with a loaded model").set_function(
+            lambda: sum(1 for r in self._replicas if r.ready)
+        )
+
+        self._accepting = True
+        threading.Thread(target=self._collect, name="inference-pool-collector", daemon=True).start()
+        threading.Thread(target=self._monitor, name="inference-pool-monitor", daemon=True).start()
+        logger.info(
+            f"Started inference pool: {self.size} replicas x {self.threads_per_replica} threads"
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Whether every replica has loaded its model"""
+        return bool(self._replicas) and all(r.ready for r in self._replicas)
+
+    def submit(self, method: str, **kwargs) -> Future:
+        """
+        Dispatch a service call to the least loaded replica
+
+        Args:
+            method: Name of the VoiceCloningService method to call
+            **kwargs: Keyword arguments for the method
+
+        Returns:
+            Future resolved with the method's return value
+        """
+        future, _, _ = self._dispatch(method, kwargs)
+        return future
+
+    def _dispatch(
+        self, method: str, kwargs: dict, chunks: Optional[queue.Queue] = None
+    ) -> Tuple[Future, _Replica, int]:
+        future: Future = Future()
+        with self._lock:
+            if not self._accepting:
+                raise RuntimeError("Inference pool is not accepting requests")
+            replica = min(self._replicas, key=lambda r: (not r.ready, len(r.in_flight)))
+            request_id = next(self._ids)
+            replica.in_flight[request_id] = future
+            if chunks is not None:
+                replica.streams[request_id] = chunks
+            replica.requests.put((request_id, method, kwargs))
+        return future, replica, request_id
+
+    def synthesize(self, text: str, speaker_wav: Optional[str] = None, language: str = "en") -> np.ndarray:
+        """Synthesize speech on a replica, blocking until done"""
+        return self.submit("synthesize", text=text, speaker_wav=speaker_wav, language=language).result()
+
+    def synthesize_timed(
+        self, text: str, speaker_wav: Optional[str] = None, language: str = "en"
+    ) -> Tuple[np.ndarray, float]:
+        """Synthesize speech on a replica; also returns the replica's rendering time, without queueing"""
+        return self.submit("synthesize_timed", text=text, speaker_wav=speaker_wav, language=language).result()
+
+    def stream_speech(
+        self, text: str, speaker_wav: Optional[str] = None, language: str = "en"
+    ) -> Iterator[np.ndarray]:
+        """
+        Stream speech from a replica, chunk by chunk as it renders
+
+        A caller that stops reading early only drops the remaining chunks;
+        the replica still finishes rendering the text.
+
+        Yields:
+            Float32 sample chunks at ``sample_rate``
+        """
+        chunks: queue.Queue = queue.Queue()
+        future, replica, request_id = self._dispatch(
+            "stream_speech", dict(text=text, speaker_wav=speaker_wav, language=language), chunks
+        )
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is _END:
+                    # Raises the replica's error, if any
+                    future.result()
+                    return
+                yield chunk
+        finally:
+            with self._lock:
+                replica.streams.pop(request_id, None)
+
+    def load(self) -> Dict[int, int]:
+        """In-flight request count per replica"""
+        with self._lock:
+            return {r.index: len(r.in_flight) for r in self._replicas}
+
+    def shutdown(self, timeout: float = 30.0):
+        """
+        Drain in-flight work and stop the replicas
+
+        Args:
+            timeout: Seconds to wait for in-flight requests before terminating
+        """
+        with self._lock:
+            self._accepting = False
+            self._idle.wait_for(
+                lambda: all(not r.in_flight for r in self._replicas),
+                timeout=timeout,
+            )
+            self._stopping.set()
+            for replica in self._replicas:
+                replica.requests.put(_SHUTDOWN)
+
+        for replica in self._replicas:
+            replica.process.join(timeout=5)
+            if replica.process.is_alive():
+                replica.process.terminate()
+        logger.info("Inference pool stopped")
+
+    def _spawn(self, replica: _Replica):
+        replica.ready = False
+        replica.requests = self._ctx.Queue()
+        replica.process = self._ctx.Process(
+            target=_replica_main,
+            args=(replica.index, replica.cores, self.threads_per_replica, replica.requests, self._results),
+            name=f"inference-replica-{replica.index}",
+            daemon=True,
+        )
+        replica.process.start()
+
+    def _collect(self):
+        while not (self._stopping.is_set() and all(not r.in_flight for r in self._replicas)):
+            try:
+                status, index, request_id, payload = self._results.get(timeout=1.0)
+            except Exception:
+                continue
+
+            with self._lock:
+                replica = self._replicas[index]
+                if status == "ready":
+                    replica.ready = True
+                    self.sample_rate = payload
+                    logger.info(f"Inference replica {index} ready (pid {replica.process.pid})")
+                    continue
+                if status == "chunk":
+                    stream = replica.streams.get(request_id)
+                    if stream is not None:
+                        stream.put(payload)
+                    continue
+                future = replica.in_flight.pop(request_id, None)
+                stream = replica.streams.pop(request_id, None)
+                self._idle.notify_all()
+
+            if future is None:
+                continue
+            if status == "ok":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+            if stream is not None:
+                stream.put(_END)
+
+    def _monitor(self):
+        while not self._stopping.wait(1.0):
+            for replica in self._replicas:
+                if replica.process.is_alive():
+                    continue
+                with self._lock:
+                    if self._stopping.is_set():
+                        return
+                    lost = list(replica.in_flight.values())
+                    lost_streams = list(replica.streams.values())
+                    replica.in_flight.clear()
+                    replica.streams.clear()
+                    self._idle.notify_all()
+                    logger.error(
+                        f"Inference replica {replica.index} exited with code "
+                        f"{replica.process.exitcode}; restarting"
+                    )
+                    self._spawn(replica)
+                for future in lost:
+                    future.set_exception(RuntimeError("Inference replica crashed"))
+                for stream in lost_streams:
+                    stream.put(_END)
+
+
+# Global instance (singleton pattern)
+_inference_pool = None
+
+
+def get_inference_pool() -> Optional[InferenceProcessPool]:
+    """Get the global inference pool, or None when running in-process"""
+    global _inference_pool
+    if _inference_pool is None and settings.INFERENCE_POOL_SIZE > 0:
+        # Default to an even split of this process's cores
+        threads = settings.INFERENCE_THREADS_PER_REPLICA or max(
+            1, len(os.sched_getaffinity(0)) // settings.INFERENCE_POOL_SIZE
+        )
+        _inference_pool = InferenceProcessPool(
+            size=settings.INFERENCE_POOL_SIZE,
+            threads_per_replica=threads,
+        )
+    return _inference_pool
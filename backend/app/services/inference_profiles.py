@@ -0,0 +1,154 @@
+"""
+Inference profiles for the TTS model
+"baseline" runs the model as loaded; "optimized" trades a little fidelity for CPU speed
+"""
+import os
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, List
+import logging
+
+from ..core.config import settings
+
+if TYPE_CHECKING:
+    import torch
+
+logger = logging.getLogger(__name__)
+
+BASELINE = "baseline"
+OPTIMIZED = "optimized"
+PROFILES = (BASELINE, OPTIMIZED)
+
+
+def inference_context(profile: str):
+    """
+    Context for a synthesis call
+
+    The optimized profile disables autograd tracking (and version counters)
+    for the whole call, not only the XTTS inference step.
+    """
+    if profile != OPTIMIZED:
+        return nullcontext()
+    import torch
+    return torch.inference_mode()
+
+
+def configure_threads(profile: str):
+    """
+    Set torch thread pools for an in-process model
+
+    ``TORCH_NUM_THREADS`` wins when set. Otherwise the optimized profile uses
+    one intra-op thread per CPU the process may run on and a single inter-op
+    thread, since autoregressive decoding has no independent ops to overlap.
+    """
+    import torch
+
+    if settings.TORCH_NUM_THREADS > 0:
+        torch.set_num_threads(settings.TORCH_NUM_THREADS)
+    elif profile == OPTIMIZED:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+        torch.set_num_threads(max(1, cpus or 1))
+
+    if profile == OPTIMIZED:
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only allowed before the first parallel op in the process
+            pass
+
+
+def _conv1d_to_linear(module: "torch.nn.Module") -> int:
+    """
+    Replace Hugging Face ``Conv1D`` layers with equivalent ``nn.Linear``
+
+    The GPT-2 blocks inside XTTS use ``Conv1D`` (a transposed linear), which
+    dynamic quantization does not recognize. Swapping them in place makes the
+    attention and MLP projections quantizable.
+
+    Returns:
+        Number of layers replaced
+    """
+    import torch
+
+    replaced = 0
+    for name, child in module.named_children():
+        if child.__class__.__name__ == "Conv1D" and hasattr(child, "nf"):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features, bias=child.bias is not None)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                if child.bias is not None:
+                    linear.bias.copy_(child.bias)
+            setattr(module, name, linear)
+            replaced += 1
+        else:
+            replaced += _conv1d_to_linear(child)
+    return replaced
+
+
+def _warm_up_decoder(decoder, device: str):
+    """
+    Run a compiled XTTS vocoder once on silent latents
+
+    ``torch.compile`` only traces on the first call, so without this a
+    backend failure would surface in the first user request instead of here.
+    Input shapes come from the HiFi-GAN generator's first conv and speaker
+    conditioning layer.
+    """
+    import torch
+
+    generator = decoder.waveform_decoder
+    latents = torch.zeros(1, 16, generator.conv_pre.in_channels, device=device)
+    cond_layer = getattr(generator, "cond_layer", None)
+    speaker = torch.zeros(1, cond_layer.in_channels, 1, device=device) if cond_layer is not None else None
+    with torch.inference_mode():
+        decoder(latents, g=speaker)
+
+
+def apply_inference_profile(tts, profile: str, device: str) -> List[str]:
+    """
+    Apply a profile's model transformations after loading
+
+    Args:
+        tts: Loaded ``TTS`` instance
+        profile: ``baseline`` or ``optimized``
+        device: Device the model runs on
+
+    Returns:
+        Names of the optimizations that were applied
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown inference profile: {profile}")
+    if profile == BASELINE:
+        return []
+
+    import torch
+
+    applied = []
+    model = tts.synthesizer.tts_model
+    model.eval()
+
+    gpt = getattr(model, "gpt", None)
+    if device == "cpu" and gpt is not None:
+        # int8 weights with fp32 activations; the GPT decoder dominates CPU time
+        replaced = _conv1d_to_linear(gpt)
+        model.gpt = torch.ao.quantization.quantize_dynamic(gpt, {torch.nn.Linear}, dtype=torch.qint8)
+        applied.append(f"int8_dynamic_quantization(conv1d_converted={replaced})")
+    elif gpt is not None:
+        logger.info("Skipping int8 quantization: dynamic quantization is CPU only")
+
+    if settings.INFERENCE_COMPILE:
+        decoder = getattr(model, "hifigan_decoder", None)
+        if decoder is not None:
+            try:
+                # The vocoder is a fixed conv stack; lengths vary, so compile dynamic
+                compiled = torch.compile(decoder, dynamic=True)
+                _warm_up_decoder(compiled, device)
+                model.hifigan_decoder = compiled
+                applied.append("torch_compile(hifigan_decoder)")
+            except Exception as e:
+                model.hifigan_decoder = decoder
+                logger.warning(f"torch.compile unavailable, running the vocoder eagerly: {str(e)}")
+
+    applied.append("inference_mode")
+    logger.info(f"Inference profile {profile}: {', '.join(applied)}")
+    return applied
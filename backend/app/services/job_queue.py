@@ -0,0 +1,349 @@
+"""
+Database-backed synthesis job queue
+Jobs live in Postgres so they survive restarts and are shared across replicas
+"""
+import json
+import os
+import socket
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.metrics import metrics
+from ..models import SynthesisJob
+from .generation import VoiceProfileNotFoundError, generate_audio_record
+from .model_registry import UnknownModelError
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+# Error codes of failed jobs, with the HTTP status their result is reported with
+ERROR_VOICE_PROFILE_NOT_FOUND = "voice_profile_not_found"
+ERROR_UNKNOWN_MODEL = "unknown_model"
+ERROR_GENERATION_FAILED = "generation_failed"
+ERROR_ABANDONED = "abandoned"
+
+JOB_ERROR_STATUS = {
+    ERROR_VOICE_PROFILE_NOT_FOUND: 404,
+    ERROR_UNKNOWN_MODEL: 400,
+    ERROR_GENERATION_FAILED: 500,
+    ERROR_ABANDONED: 500,
+}
+
+
+def describe_error(error: Exception) -> Tuple[str, str]:
+    """
+    Error code and message recorded on a job that failed with ``error``
+
+    Returns:
+        (code, message); the code is a key of JOB_ERROR_STATUS
+    """
+    if isinstance(error, VoiceProfileNotFoundError):
+        # Raised with the profile id as its only argument
+        return ERROR_VOICE_PROFILE_NOT_FOUND, f"Voice profile {error} not found"
+    if isinstance(error, UnknownModelError):
+        return ERROR_UNKNOWN_MODEL, str(error)
+    return ERROR_GENERATION_FAILED, str(error) or error.__class__.__name__
+
+
+def enqueue_job(
+    db: Session,
+    text: str,
+    voice_profile_id: Optional[int] = None,
+    generation_settings: Optional[dict] = None,
+    output_format: str = "wav",
+    bitrate: Optional[int] = None,
+) -> SynthesisJob:
+    """
+    Add a generation request to the queue
+
+    Args:
+        db: Database session
+        text: Text to convert to speech
+        voice_profile_id: Voice profile to clone (optional)
+        generation_settings: Request settings
+        output_format: Delivery format of the result
+        bitrate: Delivery bitrate in kbps for lossy formats
+
+    Returns:
+        The committed job row
+    """
+    job = SynthesisJob(
+        status=JOB_QUEUED,
+        text_input=text,
+        voice_profile_id=voice_profile_id,
+        settings=json.dumps(generation_settings) if generation_settings else None,
+        output_format=output_format,
+        bitrate=bitrate,
+        attempts=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[SynthesisJob]:
+    """
+    Atomically take the oldest runnable job
+
+    Queued jobs and running jobs whose lease expired (their worker died) are
+    eligible. ``FOR UPDATE SKIP LOCKED`` lets several workers and replicas
+    poll the same table without handing out a job twice.
+
+    Args:
+        db: Database session
+        worker_id: Identifier recorded on the claimed job
+
+    Returns:
+        The claimed job, or None if the queue is empty
+    """
+    while True:
+        now = datetime.now(timezone.utc)
+        job = (
+            db.query(SynthesisJob)
+            .filter(or_(
+                SynthesisJob.status == JOB_QUEUED,
+                and_(SynthesisJob.status == JOB_RUNNING, SynthesisJob.lease_expires_at < now),
+            ))
+            .order_by(SynthesisJob.created_at, SynthesisJob.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            db.commit()
+            return None
+
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            job.status = JOB_FAILED
+            job.error = job.error or "Job abandoned after too many attempts"
+            job.error_code = job.error_code or ERROR_ABANDONED
+            job.finished_at = now
+            db.commit()
+            continue
+
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        job.worker_id = worker_id
+        job.started_at = now
+        job.lease_expires_at = now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        db.commit()
+        db.refresh(job)
+        # Detached with its columns loaded, so the refresh's read transaction
+        # can end here instead of staying open for the whole synthesis
+        db.expunge(job)
+        db.commit()
+        return job
+
+
+def _owned(job_id: int, worker_id: str, attempt: int):
+    """Filter matching a job only while the given worker still holds the attempt it claimed"""
+    return and_(
+        SynthesisJob.id == job_id,
+        SynthesisJob.status == JOB_RUNNING,
+        SynthesisJob.worker_id == worker_id,
+        SynthesisJob.attempts == attempt,
+    )
+
+
+def extend_lease(job_id: int, worker_id: str, attempt: int) -> bool:
+    """
+    Push back the lease of a running job
+
+    Returns:
+        False when the job was reclaimed (or finished) by another worker
+    """
+    db = SessionLocal()
+    try:
+        updated = (
+            db.query(SynthesisJob)
+            .filter(_owned(job_id, worker_id, attempt))
+            .update(
+                {SynthesisJob.lease_expires_at: datetime.now(timezone.utc) + timedelta(seconds=settings.JOB_LEASE_SECONDS)},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return updated > 0
+    finally:
+        db.close()
+
+
+class LeaseHeartbeat:
+    """Background thread that renews a job's lease while the job runs"""
+
+    def __init__(self, job_id: int, worker_id: str, attempt: int, interval: float):
+        """
+        Initialize the heartbeat
+
+        Args:
+            job_id: Claimed job
+            worker_id: Worker that claimed it
+            attempt: Attempt number recorded by the claim
+            interval: Seconds between renewals, well below the lease
+        """
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.attempt = attempt
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread = threading.Thread(target=self._run, name=f"job-lease-{self.job_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not extend_lease(self.job_id, self.worker_id, self.attempt):
+                    self.lost.set()
+                    logger.warning(f"Synthesis job {self.job_id} lost its lease (attempt {self.attempt})")
+                    return
+            except Exception as e:
+                # A missed renewal is retried; the lease leaves room for a few
+                logger.warning(f"Could not renew lease of synthesis job {self.job_id}: {str(e)}")
+
+
+def run_job(db: Session, job: SynthesisJob):
+    """
+    Execute a claimed job and record its outcome
+
+    The lease is renewed while the job runs. The outcome is written only if
+    this worker still holds the attempt it claimed; when another worker
+    reclaimed the job in the meantime, this attempt's result is dropped.
+    """
+    job_id, worker_id, attempt = job.id, job.worker_id, job.attempts
+    logger.info(f"Running synthesis job {job_id} (attempt {attempt})")
+    with LeaseHeartbeat(job_id, worker_id, attempt, interval=max(1.0, settings.JOB_LEASE_SECONDS / 3)):
+        try:
+            # Committed below together with the job, so a dropped attempt leaves no history row
+            generated = generate_audio_record(
+                db,
+                text=job.text_input,
+                voice_profile_id=job.voice_profile_id,
+                generation_settings=json.loads(job.settings) if job.settings else None,
+                output_format=job.output_format or "wav",
+                bitrate=job.bitrate,
+                commit=False,
+            )
+        except Exception as e:
+            db.rollback()
+            code, message = describe_error(e)
+            logger.error(f"Synthesis job {job_id} failed ({code}): {message}")
+            outcome = {SynthesisJob.status: JOB_FAILED, SynthesisJob.error: message, SynthesisJob.error_code: code}
+        else:
+            outcome = {
+                SynthesisJob.status: JOB_SUCCEEDED,
+                SynthesisJob.generated_audio_id: generated.id,
+                SynthesisJob.error: None,
+                SynthesisJob.error_code: None,
+            }
+
+    outcome.update({SynthesisJob.finished_at: datetime.now(timezone.utc), SynthesisJob.lease_expires_at: None})
+    updated = db.query(SynthesisJob).filter(_owned(job_id, worker_id, attempt)).update(outcome, synchronize_session=False)
+    if not updated:
+        db.rollback()
+        logger.warning(f"Dropping the result of synthesis job {job_id} attempt {attempt}: reclaimed by another worker")
+        return
+    db.commit()
+
+
+def queued_job_count() -> int:
+    """Number of jobs waiting for a worker, across all replicas"""
+    db = SessionLocal()
+    try:
+        return db.query(func.count(SynthesisJob.id)).filter(SynthesisJob.status == JOB_QUEUED).scalar()
+    finally:
+        db.close()
+
+
+class JobWorkerPool:
+    """Pool of threads that drain the synthesis job queue"""
+
+    def __init__(self, size: int, poll_interval: float):
+        """
+        Initialize the pool
+
+        Args:
+            size: Number of worker threads
+            poll_interval: Seconds to sleep when the queue is empty
+        """
+        self.size = size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+        # Read at scrape time; the status index makes this a cheap count
+        metrics.gauge("tts_job_queue_depth", "Synthesis jobs waiting for a worker").set_function(queued_job_count)
+
+    def start(self):
+        """Start the worker threads"""
+        for index in range(self.size):
+            thread = threading.Thread(
+                target=self._run,
+                args=(f"{self._prefix}:{index}",),
+                name=f"synthesis-worker-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.size} synthesis job workers")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Signal the workers to exit after their current job and wait for them"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info("Synthesis job workers stopped")
+
+    def _run(self, worker_id: str):
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                job = claim_next_job(db, worker_id)
+                if job is not None:
+                    run_job(db, job)
+            except Exception as e:
+                db.rollback()
+                job = None
+                logger.error(f"Synthesis worker {worker_id} error: {str(e)}")
+            finally:
+                db.close()
+
+            if job is None:
+                self._stop.wait(self.poll_interval)
+
+
+# Global instance (singleton pattern)
+_worker_pool = None
+
+
+def get_job_worker_pool() -> JobWorkerPool:
+    """Get the global job worker pool instance"""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = JobWorkerPool(
+            size=settings.JOB_WORKERS,
+            poll_interval=settings.JOB_POLL_INTERVAL,
+        )
+    return _worker_pool
@@ -0,0 +1,223 @@
+"""
+Speaker conditioning latent cache
+Keeps XTTS conditioning latents per reference sample so they are computed once
+"""
+import os
+import threading
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .hashing import file_sha256, forget_file
+
+logger = logging.getLogger(__name__)
+
+Latents = Dict[str, np.ndarray]
+
+LATENT_NAMES = ("gpt_cond_latent", "speaker_embedding")
+
+# Lookups answered from memory, from an .npz file, or by running conditioning
+_lookups = {
+    level: metrics.counter(
+        "tts_latent_cache_lookups_total", "Speaker latent lookups by the level that answered", labels={"level": level}
+    )
+    for level in ("memory", "disk", "miss")
+}
+
+
+def is_latents_file(path: Optional[str]) -> bool:
+    """Whether a speaker reference is a precomputed latents file rather than audio"""
+    return bool(path) and path.endswith(".npz")
+
+
+def load_latents_file(path: str) -> Latents:
+    """Read the conditioning latents stored in an ``.npz`` file"""
+    with np.load(path) as data:
+        return {name: data[name] for name in LATENT_NAMES}
+
+
+def save_latents_file(path: str, arrays: Dict[str, np.ndarray]):
+    """Atomically write arrays to an ``.npz`` file"""
+    # Unique per writer, so concurrent saves of the same path never share a temp file
+    tmp_path = f"{path}.tmp.{uuid.uuid4().hex}"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SpeakerLatentCache:
+    """
+    Two level cache of speaker conditioning latents
+
+    Entries are keyed by the SHA-256 of the reference sample's contents. The
+    first level is an in-memory LRU bounded by ``max_entries``; the second is
+    an ``.npz`` file stored next to the sample, so a restarted process can
+    skip the conditioning pass as well.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of latent sets kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Latents]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per digest so concurrent misses for a sample compute once
+        self._compute_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def disk_path(sample_path: str, digest: str) -> str:
+        """Location of the on-disk latents for a sample"""
+        return os.path.join(os.path.dirname(sample_path), f".latents_{digest}.npz")
+
+    def get_or_compute(
+        self,
+        sample_path: str,
+        compute: Callable[[str], Latents],
+    ) -> Latents:
+        """
+        Return cached latents for a sample, computing them on a miss
+
+        Args:
+            sample_path: Path to the reference audio sample
+            compute: Callable producing latents from the sample path
+
+        Returns:
+            Mapping of latent name to array
+        """
+        digest = file_sha256(sample_path)
+
+        latents = self._get_memory(digest)
+        if latents is not None:
+            _lookups["memory"].inc()
+            return latents
+
+        with self._lock:
+            compute_lock = self._compute_locks.setdefault(digest, threading.Lock())
+
+        try:
+            with compute_lock:
+                # Another thread may have filled the entry while we waited
+                latents = self._get_memory(digest)
+                if latents is not None:
+                    _lookups["memory"].inc()
+                    return latents
+
+                latents = self._load_disk(sample_path, digest)
+                if latents is None:
+                    _lookups["miss"].inc()
+                    logger.info(f"Computing speaker latents for: {sample_path}")
+                    latents = compute(sample_path)
+                    self._store_disk(sample_path, digest, latents)
+                else:
+                    _lookups["disk"].inc()
+
+                self._put_memory(digest, latents)
+        finally:
+            # Also on a failed compute, or the lock would outlive the entry forever
+            with self._lock:
+                self._compute_locks.pop(digest, None)
+        return latents
+
+    def get_precomputed(self, latents_path: str) -> Latents:
+        """
+        Return latents from a precomputed ``.npz`` file (e.g. a profile aggregate)
+
+        Only the in-memory level applies; the file itself is the disk level.
+        Entries are keyed by content hash, so a rewritten file is picked up.
+        """
+        digest = file_sha256(latents_path)
+        latents = self._get_memory(digest)
+        if latents is None:
+            _lookups["disk"].inc()
+            latents = load_latents_file(latents_path)
+            self._put_memory(digest, latents)
+        else:
+            _lookups["memory"].inc()
+        return latents
+
+    def invalidate(self, sample_path: Optional[str]):
+        """
+        Drop cached latents for a sample that is being replaced
+
+        Args:
+            sample_path: Path of the previous reference sample
+        """
+        if not sample_path or not os.path.exists(sample_path):
+            return
+
+        digest = file_sha256(sample_path)
+        with self._lock:
+            self._entries.pop(digest, None)
+
+        disk_path = self.disk_path(sample_path, digest)
+        try:
+            os.remove(disk_path)
+        except FileNotFoundError:
+            pass
+        forget_file(sample_path)
+        logger.info(f"Invalidated speaker latents for: {sample_path}")
+
+    def clear(self):
+        """Empty the in-memory level"""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_memory(self, digest: str) -> Optional[Latents]:
+        with self._lock:
+            latents = self._entries.get(digest)
+            if latents is not None:
+                self._entries.move_to_end(digest)
+            return latents
+
+    def _put_memory(self, digest: str, latents: Latents):
+        with self._lock:
+            self._entries[digest] = latents
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load_disk(self, sample_path: str, digest: str) -> Optional[Latents]:
+        disk_path = self.disk_path(sample_path, digest)
+        if not os.path.exists(disk_path):
+            return None
+        try:
+            with np.load(disk_path) as data:
+                return {name: data[name] for name in data.files}
+        except Exception as e:
+            logger.warning(f"Discarding unreadable latents {disk_path}: {str(e)}")
+            return None
+
+    def _store_disk(self, sample_path: str, digest: str, latents: Latents):
+        disk_path = self.disk_path(sample_path, digest)
+        try:
+            save_latents_file(disk_path, latents)
+        except OSError as e:
+            logger.warning(f"Could not persist latents {disk_path}: {str(e)}")
+
+
+# Global instance (singleton pattern)
+_latent_cache = None
+
+
+def get_latent_cache() -> SpeakerLatentCache:
+    """Get the global speaker latent cache instance"""
+    global _latent_cache
+    if _latent_cache is None:
+        _latent_cache = SpeakerLatentCache(max_entries=settings.LATENT_CACHE_SIZE)
+    return _latent_cache
@@ -0,0 +1,171 @@
+"""
+Long-form synthesis
+Segments long text, renders segments in parallel and stitches them together
+"""
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .audio_processing import crossfade_concat, normalize_loudness, trim_silence
+from .inference_pool import get_inference_pool
+from .model_registry import get_voice_service
+from .segment_cache import SegmentReuse, get_segment_cache, segment_key
+from .text_segmentation import segment_text, sentence_segments
+
+logger = logging.getLogger(__name__)
+
+# Pause kept around each segment before crossfading
+_SEGMENT_PADDING_MS = 120.0
+
+
+def is_long_form(text: str, generation_settings: Optional[dict] = None) -> bool:
+    """Whether a request should use the long-form path"""
+    if generation_settings and "long_form" in generation_settings:
+        return bool(generation_settings["long_form"])
+    return len(text) > settings.LONGFORM_THRESHOLD_CHARS
+
+
+def _render_segments(
+    segments: List[str],
+    speaker_wav: Optional[str],
+    language: str,
+    model: Optional[str],
+) -> Tuple[List[np.ndarray], int]:
+    """
+    Render segments in parallel
+
+    Segments are dispatched to the inference pool when one is running
+    (one replica per segment in flight), otherwise to a thread pool sharing
+    the in-process model.
+
+    Returns:
+        Tuple of (float32 samples per segment, sample rate)
+    """
+    inference_pool = get_inference_pool()
+    if inference_pool is not None and model is None:
+        futures = [
+            inference_pool.submit("synthesize", text=segment, speaker_wav=speaker_wav, language=language)
+            for segment in segments
+        ]
+        return [f.result() for f in futures], inference_pool.sample_rate
+
+    voice_service = get_voice_service(model)
+    with ThreadPoolExecutor(max_workers=settings.LONGFORM_WORKERS) as executor:
+        rendered = list(executor.map(
+            lambda segment: voice_service.synthesize(segment, speaker_wav=speaker_wav, language=language),
+            segments,
+        ))
+    return rendered, voice_service.sample_rate
+
+
+def _assemble(rendered: List[np.ndarray], sample_rate: int) -> np.ndarray:
+    """Trim and loudness normalize each segment, then crossfade them into one track"""
+    prepared = [
+        normalize_loudness(
+            trim_silence(samples, sample_rate, padding_ms=_SEGMENT_PADDING_MS),
+            target_dbfs=settings.LONGFORM_TARGET_DBFS,
+        )
+        for samples in rendered
+    ]
+    return crossfade_concat(prepared, sample_rate, settings.LONGFORM_CROSSFADE_MS)
+
+
+def synthesize_long_text(
+    text: str,
+    speaker_wav: Optional[str] = None,
+    language: str = "en",
+    model: Optional[str] = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    Synthesize a long text as parallel segments joined into one track
+
+    Each segment is trimmed and loudness normalized before crossfading, so
+    joins are smooth and levels stay consistent.
+
+    Args:
+        text: Text to convert to speech
+        speaker_wav: Path to reference audio file for voice cloning (optional)
+        language: Language code
+        model: Model from ``resolve_model``, None for the default model
+
+    Returns:
+        Tuple of (float32 samples, sample rate)
+    """
+    segments = segment_text(text, language, settings.LONGFORM_SEGMENT_CHARS)
+    started_at = time.perf_counter()
+
+    rendered, sample_rate = _render_segments(segments, speaker_wav, language, model)
+    output = _assemble(rendered, sample_rate)
+
+    logger.info(
+        f"Long-form synthesis of {len(text)} characters in {len(segments)} segments "
+        f"took {time.perf_counter() - started_at:.2f}s"
+    )
+    return output, sample_rate
+
+
+def synthesize_incremental(
+    text: str,
+    scope: str,
+    speaker_wav: Optional[str] = None,
+    language: str = "en",
+    model: Optional[str] = None,
+) -> Tuple[np.ndarray, int, SegmentReuse]:
+    """
+    Synthesize a long text sentence by sentence, reusing cached sentences
+
+    Each sentence is looked up in the segment cache under the request's
+    scope; only new or edited sentences (each distinct one once) are
+    rendered, in parallel, and cached. The track is then assembled like
+    ``synthesize_long_text``, so regenerating an edited script costs only
+    the edited sentences, and boilerplate shared by templated scripts is
+    rendered once.
+
+    Args:
+        text: Text to convert to speech
+        scope: ``segment_scope`` of the request's voice, language and settings
+        speaker_wav: Path to reference audio file for voice cloning (optional)
+        language: Language code
+        model: Model from ``resolve_model``, None for the default model
+
+    Returns:
+        Tuple of (float32 samples, sample rate, segment reuse)
+    """
+    segments = sentence_segments(text, language, settings.LONGFORM_SEGMENT_CHARS)
+    started_at = time.perf_counter()
+    segment_cache = get_segment_cache()
+
+    keys = [segment_key(scope, segment) for segment in segments]
+    found = {}
+    missing = {}
+    for key, segment in zip(keys, segments):
+        if key in found or key in missing:
+            continue
+        samples = segment_cache.get(key)
+        if samples is None:
+            missing[key] = segment
+        else:
+            found[key] = samples
+
+    if missing:
+        rendered, sample_rate = _render_segments(list(missing.values()), speaker_wav, language, model)
+        for key, samples in zip(missing, rendered):
+            segment_cache.put(key, samples)
+            found[key] = samples
+    elif model is None and get_inference_pool() is not None:
+        sample_rate = get_inference_pool().sample_rate
+    else:
+        sample_rate = get_voice_service(model).sample_rate
+
+    output = _assemble([found[key] for key in keys], sample_rate)
+    reuse = SegmentReuse(total=len(keys), reused=sum(1 for key in keys if key not in missing))
+
+    logger.info(
+        f"Incremental synthesis of {len(text)} characters: {reuse.reused}/{reuse.total} sentences reused, "
+        f"{len(missing)} rendered in {time.perf_counter() - started_at:.2f}s"
+    )
+    return output, sample_rate, reuse
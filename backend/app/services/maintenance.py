@@ -0,0 +1,750 @@
+"""
+Background maintenance of stored files
+Retention of generated audio, purging of deleted profiles' samples, deduplication of legacy files and trimming of the S3 blob cache
+"""
+import os
+import glob
+import time
+import uuid
+import hashlib
+import threading
+import logging
+from contextlib import nullcontext
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal, engine
+from ..core.metrics import metrics
+from ..core.observability import requests_in_flight
+from ..models import GeneratedAudio, RequestProfile, VoiceProfile, VoiceSample
+from .hashing import forget_file
+from .latent_cache import get_latent_cache
+from .storage import BlobNotFoundError, LocalBlobStore, S3BlobStore, StorageError, content_key, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("generated_ttl", "generated_budget", "inactive_profiles", "deduplicate", "scratch", "blob_cache")
+
+# Content keys are "<namespace>/<ab>/<cd>/<sha256>.<ext>"; anything else predates content addressing
+_CONTENT_KEY_PATTERN = "{namespace}/__/__/%"
+
+# Upload scratch files older than this were left behind by a crashed request
+_SCRATCH_MAX_AGE_SECONDS = 24 * 3600
+
+# Key of the PostgreSQL advisory lock that lets one replica at a time run a pass
+_ADVISORY_LOCK_ID = 0x766F6963
+
+# Longest a batch waits for request traffic to calm down before running anyway
+_MAX_YIELD_SECONDS = 60.0
+
+_CHUNK_SIZE = 1024 * 1024
+
+pass_seconds = metrics.histogram(
+    "maintenance_pass_seconds",
+    "Duration of a storage maintenance pass",
+    buckets=(1, 5, 15, 60, 300, 900, 3600),
+)
+
+
+@dataclass
+class PolicyReport:
+    rows: int = 0  # Database rows cleared or deleted
+    files: int = 0  # Blobs and cache files removed (or replaced by a hardlink)
+    bytes: int = 0  # Size of those files
+
+
+@dataclass
+class MaintenanceReport:
+    dry_run: bool
+    started_at: str
+    finished_at: Optional[str] = None
+    completed: bool = False  # False when the pass was stopped early or failed
+    error: Optional[str] = None
+    generated_bytes: int = 0  # Stored generated audio before the pass
+    policies: Dict[str, PolicyReport] = field(default_factory=lambda: {name: PolicyReport() for name in POLICIES})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class IoThrottle:
+    """
+    Caps the rate of bytes read or deleted by maintenance
+
+    Callers report the bytes of each operation; when the running total gets
+    ahead of ``bytes_per_second``, ``consume`` sleeps until it is back on
+    schedule.
+    """
+
+    def __init__(self, bytes_per_second: int, stop: threading.Event):
+        """
+        Initialize the throttle
+
+        Args:
+            bytes_per_second: Allowed rate (0 = unthrottled)
+            stop: Cut sleeps short when set
+        """
+        self.bytes_per_second = bytes_per_second
+        self._stop = stop
+        self._started = time.monotonic()
+        self._consumed = 0
+
+    def consume(self, nbytes: int):
+        if self.bytes_per_second <= 0:
+            return
+        self._consumed += nbytes
+        ahead = self._consumed / self.bytes_per_second - (time.monotonic() - self._started)
+        if ahead > 0:
+            self._stop.wait(ahead)
+
+
+class MaintenanceService:
+    """
+    Keeps the blob store from growing without bound
+
+    A pass applies, in small batches with a short transaction each:
+
+    - retention of generated audio: rows older than ``RETENTION_GENERATED_TTL_DAYS``
+      and, oldest first, as many rows as needed to bring the stored outputs
+      under ``RETENTION_GENERATED_MAX_BYTES``. Rows stay in the history with
+      their audio cleared; their request profiles and transcoded variants go
+      with them, and so do batch manifests and archives past the TTL.
+    - purging of the samples, latents and aggregates of profiles deleted more
+      than ``RETENTION_INACTIVE_PROFILE_DAYS`` ago.
+    - deduplication of files stored before keys were content addressed
+      (``generated/generated_*.wav``, ``samples/<voice_id>/...``): duplicates
+      are replaced by hardlinks to one copy, keeping their keys and URLs.
+    - removal of abandoned upload scratch files.
+
+    Blobs are content addressed and may be shared, so a blob is only deleted
+    once no remaining row refers to it, and only after the rows that released
+    it are committed. Reads and deletions go through an ``IoThrottle``, and a
+    background pass pauses between batches while more than
+    ``MAINTENANCE_YIELD_IN_FLIGHT`` requests are being served.
+
+    A dry run walks the same batches without writing anything and reports
+    what a pass would remove.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        batch_size: int,
+        io_bytes_per_second: int = 0,
+        yield_in_flight: int = 0,
+    ):
+        """
+        Initialize the service
+
+        Args:
+            interval: Seconds between background passes
+            batch_size: Rows handled per transaction
+            io_bytes_per_second: Read/delete rate limit (0 = unthrottled)
+            yield_in_flight: Pause batches while more requests than this are in flight (0 = never pause)
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+        self.io_bytes_per_second = io_bytes_per_second
+        self.yield_in_flight = yield_in_flight
+        self.last_report: Optional[MaintenanceReport] = None
+        self._running = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pass_lock = threading.Lock()
+
+    def start(self):
+        """Start the background passes"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="storage-maintenance", daemon=True)
+        self._thread.start()
+        logger.info(f"Storage maintenance runs every {self.interval:.0f}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def status(self) -> dict:
+        return {
+            "enabled": settings.MAINTENANCE_ENABLED,
+            "running": self._running,
+            "interval_seconds": self.interval,
+            "last_pass": self.last_report.to_dict() if self.last_report else None,
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_pass()
+            except Exception as e:
+                logger.error(f"Storage maintenance pass failed: {str(e)}")
+
+    def run_pass(self, dry_run: bool = False, deduplicate: bool = True) -> MaintenanceReport:
+        """
+        Apply every retention policy once
+
+        Args:
+            dry_run: Only report what would be removed
+            deduplicate: Also hash legacy files (reads every one of them)
+
+        Returns:
+            Rows, files and bytes per policy
+        """
+        report = MaintenanceReport(dry_run=dry_run, started_at=datetime.now(timezone.utc).isoformat())
+        throttle = IoThrottle(self.io_bytes_per_second, self._stop)
+        started_at = time.perf_counter()
+
+        with self._pass_lock if not dry_run else nullcontext():
+            # Dry runs write nothing and may overlap with a pass
+            lock_connection = None if dry_run else engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            locked = False
+            try:
+                # Every replica has its own cache directory, so this runs without the shared lock
+                self._trim_blob_cache(report, dry_run)
+                if lock_connection is not None:
+                    locked = _try_advisory_lock(lock_connection)
+                    if not locked:
+                        logger.info("Skipping storage maintenance: another replica is running a pass")
+                        report.error = "Another replica is running a pass"
+                        return report
+                self._running = not dry_run
+                if not dry_run:
+                    self._backfill_sizes()
+                self._expire_generated(report, throttle, dry_run)
+                self._expire_batches(report, throttle, dry_run)
+                self._purge_inactive_profiles(report, throttle, dry_run)
+                if deduplicate and settings.MAINTENANCE_DEDUPLICATE:
+                    self._deduplicate(report, throttle, dry_run)
+                self._sweep_scratch(report, throttle, dry_run)
+                report.completed = not self._stop.is_set()
+            except Exception as e:
+                report.error = str(e)
+                raise
+            finally:
+                self._running = False
+                if lock_connection is not None:
+                    if locked:
+                        _release_advisory_lock(lock_connection)
+                    lock_connection.close()
+                report.finished_at = datetime.now(timezone.utc).isoformat()
+
+        if not dry_run:
+            elapsed = time.perf_counter() - started_at
+            pass_seconds.observe(elapsed)
+            self.last_report = report
+            freed = sum(p.bytes for p in report.policies.values())
+            logger.info(f"Storage maintenance pass took {elapsed:.1f}s and reclaimed {freed / 1e6:.1f} MB")
+        return report
+
+    def _batches(self, dry_run: bool) -> Iterable[Session]:
+        """One session per batch until stopped; background passes yield to request traffic first"""
+        while not self._stop.is_set():
+            if not dry_run:
+                self._yield_to_traffic()
+            db = SessionLocal()
+            try:
+                yield db
+            except BaseException:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def _yield_to_traffic(self):
+        if self.yield_in_flight <= 0:
+            return
+        deadline = time.monotonic() + _MAX_YIELD_SECONDS
+        while requests_in_flight.value > self.yield_in_flight and time.monotonic() < deadline:
+            if self._stop.wait(1.0):
+                return
+
+    def _backfill_sizes(self):
+        """Record the size of outputs stored before sizes were tracked"""
+        blob_store = get_blob_store()
+        after_id = 0
+        for db in self._batches(dry_run=False):
+            rows = db.execute(
+                select(GeneratedAudio)
+                .where(GeneratedAudio.audio_path.isnot(None), GeneratedAudio.size_bytes.is_(None), GeneratedAudio.id > after_id)
+                .order_by(GeneratedAudio.id)
+                .limit(self.batch_size)
+            ).scalars().all()
+            if not rows:
+                return
+            for row in rows:
+                after_id = row.id
+                row.size_bytes = _blob_size(blob_store, row.audio_path)
+            db.commit()
+
+    def _expire_generated(self, report: MaintenanceReport, throttle: IoThrottle, dry_run: bool):
+        """Clear the audio of rows past the TTL, then of the oldest rows while over the byte budget"""
+        ttl_days = settings.RETENTION_GENERATED_TTL_DAYS
+        max_bytes = settings.RETENTION_GENERATED_MAX_BYTES
+        if ttl_days <= 0 and max_bytes <= 0:
+            return
+        cutoff = datetime.now(timezone.utc) - timedelta(days=ttl_days) if ttl_days > 0 else None
+
+        db = SessionLocal()
+        try:
+            stored = generated_bytes(db)
+        finally:
+            db.close()
+        report.generated_bytes = stored
+
+        blob_store = get_blob_store()
+        cursor: Optional[Tuple[datetime, int]] = None
+        for db in self._batches(dry_run):
+            statement = (
+                select(GeneratedAudio)
+                .where(GeneratedAudio.audio_path.isnot(None))
+                .order_by(GeneratedAudio.created_at, GeneratedAudio.id)
+                .limit(self.batch_size)
+            )
+            if cursor is not None:
+                statement = statement.where(tuple_(GeneratedAudio.created_at, GeneratedAudio.id) > tuple_(*cursor))
+            rows = db.execute(statement).scalars().all()
+
+            cleared: Dict[int, str] = {}  # Row id -> policy
+            released: List[Tuple[str, str, int]] = []  # (policy, key, size)
+            audio_keys: Set[str] = set()
+            within_policy = True
+            for row in rows:
+                expired = cutoff is not None and row.created_at < cutoff
+                if not expired and (max_bytes <= 0 or stored <= max_bytes):
+                    within_policy = False
+                    break
+                cursor = (row.created_at, row.id)
+                policy = "generated_ttl" if expired else "generated_budget"
+                cleared[row.id] = policy
+                report.policies[policy].rows += 1
+                # Newer rows sharing the blob keep it; the newest of them releases it
+                if not _referenced_after(db, row):
+                    size = row.size_bytes if row.size_bytes is not None else _blob_size(blob_store, row.audio_path)
+                    stored -= size
+                    released.append((policy, row.audio_path, size))
+                    audio_keys.add(row.audio_path)
+
+            if cleared:
+                profiles = db.query(RequestProfile).filter(RequestProfile.generated_audio_id.in_(list(cleared))).all()
+                for profile in profiles:
+                    policy = cleared[profile.generated_audio_id]
+                    released.extend((policy, key, _blob_size(blob_store, key)) for key in profile.files.values())
+                if not dry_run:
+                    for row in rows:
+                        if row.id in cleared:
+                            row.audio_path = None
+                            row.size_bytes = None
+                    for profile in profiles:
+                        db.delete(profile)
+                    db.commit()
+
+            for policy, key, size in released:
+                # A result cache hit may have stored a new row for the blob since the batch was read
+                referenced = (lambda key=key: _generated_key_referenced(db, key)) if key in audio_keys else None
+                if not self._remove_blob(report, policy, key, size, throttle, dry_run, referenced):
+                    stored += size
+                    continue
+                self._remove_variants(report, policy, key, throttle, dry_run)
+
+            if not rows or not within_policy:
+                return
+
+    def _expire_batches(self, report: MaintenanceReport, throttle: IoThrottle, dry_run: bool):
+        """Remove batch manifests and archives past the generated audio TTL (local backend; use lifecycle rules on S3)"""
+        ttl_days = settings.RETENTION_GENERATED_TTL_DAYS
+        blob_store = get_blob_store()
+        if ttl_days <= 0 or not isinstance(blob_store, LocalBlobStore):
+            return
+        cutoff = time.time() - ttl_days * 86400
+        try:
+            batch_dirs = list(os.scandir(os.path.join(blob_store.root, "batches")))
+        except FileNotFoundError:
+            return
+
+        for batch_dir in batch_dirs:
+            if self._stop.is_set():
+                return
+            if not batch_dir.is_dir():
+                continue
+            files = [entry for entry in os.scandir(batch_dir.path) if entry.is_file()]
+            if any(entry.stat().st_mtime >= cutoff for entry in files):
+                continue
+            for entry in files:
+                key = f"batches/{batch_dir.name}/{entry.name}"
+                self._remove_blob(report, "generated_ttl", key, entry.stat().st_size, throttle, dry_run)
+            if not dry_run:
+                try:
+                    os.rmdir(batch_dir.path)
+                except OSError:
+                    pass
+
+    def _purge_inactive_profiles(self, report: MaintenanceReport, throttle: IoThrottle, dry_run: bool):
+        """Delete the samples, latents and aggregates of profiles deleted long enough ago"""
+        days = settings.RETENTION_INACTIVE_PROFILE_DAYS
+        if days < 0:
+            return
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        policy = report.policies["inactive_profiles"]
+
+        blob_store = get_blob_store()
+        purged: Set[int] = set()
+        after_id = 0
+        for db in self._batches(dry_run):
+            profiles = db.execute(
+                select(VoiceProfile)
+                .where(
+                    VoiceProfile.is_active == False,  # noqa: E712
+                    VoiceProfile.id > after_id,
+                    func.coalesce(VoiceProfile.updated_at, VoiceProfile.created_at) < cutoff,
+                )
+                .order_by(VoiceProfile.id)
+                .limit(self.batch_size)
+            ).scalars().all()
+            if not profiles:
+                return
+
+            candidates: Set[str] = set()
+            sample_keys: Set[str] = set()
+            for voice in profiles:
+                after_id = voice.id
+                samples = db.query(VoiceSample).filter(VoiceSample.voice_profile_id == voice.id).all()
+                keys = {voice.sample_audio_path, voice.aggregate_latents_path}
+                for sample in samples:
+                    keys.update((sample.audio_path, sample.latents_path))
+                    sample_keys.add(sample.audio_path)
+                keys.discard(None)
+                if not keys and not samples:
+                    continue
+
+                purged.add(voice.id)
+                candidates.update(keys)
+                policy.rows += len(samples) + 1
+                if not dry_run:
+                    for sample in samples:
+                        db.delete(sample)
+                    voice.sample_audio_path = None
+                    voice.sample_sha256 = None
+                    voice.sample_duration_seconds = None
+                    voice.aggregate_latents_path = None
+                    voice.sample_count = 0
+
+            # Samples are content addressed: active profiles may share them
+            released = [key for key in sorted(candidates) if not _sample_key_referenced(db, key, purged)]
+            sizes = {key: _blob_size(blob_store, key) for key in released}
+            if not dry_run:
+                for key in released:
+                    if key in sample_keys:
+                        try:
+                            get_latent_cache().invalidate(blob_store.local_path(key))
+                        except BlobNotFoundError:
+                            pass
+                db.commit()
+
+            for key in released:
+                self._remove_blob(report, "inactive_profiles", key, sizes[key], throttle, dry_run)
+
+    def _deduplicate(self, report: MaintenanceReport, throttle: IoThrottle, dry_run: bool):
+        """
+        Hardlink identical files stored under legacy (not content addressed) keys
+
+        Content-addressed blobs are unique by construction; files written before
+        are compared by hash with each other and with the content-addressed copy
+        of the same data. Keys stay unchanged, so rows and URLs keep working.
+        Only the local backend can link files.
+        """
+        blob_store = get_blob_store()
+        if not isinstance(blob_store, LocalBlobStore):
+            return
+        policy = report.policies["deduplicate"]
+
+        columns = (
+            (GeneratedAudio.audio_path, "generated"),
+            (VoiceSample.audio_path, "samples"),
+            (VoiceProfile.sample_audio_path, "samples"),
+            (VoiceSample.latents_path, "samples"),
+        )
+        first_copies: Dict[str, str] = {}  # Digest -> path of the copy the others link to
+        seen_keys: Set[str] = set()
+        for column, namespace in columns:
+            after = ""
+            for db in self._batches(dry_run):
+                keys = db.execute(
+                    select(column)
+                    .where(
+                        column.isnot(None),
+                        ~column.like(_CONTENT_KEY_PATTERN.format(namespace=namespace)),
+                        column > after,
+                    )
+                    .distinct()
+                    .order_by(column)
+                    .limit(self.batch_size)
+                ).scalars().all()
+                db.close()
+                if not keys:
+                    break
+
+                for key in keys:
+                    after = key
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                    try:
+                        path = blob_store.local_path(key)
+                    except BlobNotFoundError:
+                        continue
+                    digest = _hash_file(path, throttle)
+                    extension = os.path.splitext(path)[1].lstrip(".")
+                    target = first_copies.get(digest)
+                    if target is None and extension:
+                        canonical_key = content_key(namespace, digest, extension)
+                        if blob_store.exists(canonical_key):
+                            target = blob_store.local_path(canonical_key)
+                    if target is None:
+                        first_copies[digest] = path
+                        continue
+                    if os.path.samefile(path, target):
+                        continue
+
+                    size = os.path.getsize(path)
+                    if not dry_run:
+                        if not _replace_with_link(target, path):
+                            continue
+                        _count_reclaimed("deduplicate", 1, size)
+                    policy.files += 1
+                    policy.bytes += size
+
+    def _sweep_scratch(self, report: MaintenanceReport, throttle: IoThrottle, dry_run: bool):
+        """Remove abandoned upload and archive scratch files"""
+        policy = report.policies["scratch"]
+        scratch_dir = os.path.join(settings.UPLOAD_DIR, "tmp")
+        cutoff = time.time() - _SCRATCH_MAX_AGE_SECONDS
+        try:
+            entries = list(os.scandir(scratch_dir))
+        except FileNotFoundError:
+            return
+
+        for entry in entries:
+            if self._stop.is_set():
+                return
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if not entry.is_file() or stat.st_mtime >= cutoff:
+                continue
+            policy.files += 1
+            policy.bytes += stat.st_size
+            if not dry_run:
+                throttle.consume(stat.st_size)
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+                _count_reclaimed("scratch", 1, stat.st_size)
+
+    def _trim_blob_cache(self, report: MaintenanceReport, dry_run: bool):
+        """Evict least recently used local copies of S3 blobs above S3_CACHE_MAX_BYTES"""
+        blob_store = get_blob_store()
+        if not isinstance(blob_store, S3BlobStore):
+            return
+        files, nbytes = blob_store.trim_cache(dry_run=dry_run)
+        report.policies["blob_cache"].files += files
+        report.policies["blob_cache"].bytes += nbytes
+        if not dry_run:
+            _count_reclaimed("blob_cache", files, nbytes)
+
+    def _remove_blob(
+        self,
+        report: MaintenanceReport,
+        policy: str,
+        key: str,
+        size: int,
+        throttle: IoThrottle,
+        dry_run: bool,
+        referenced: Optional[Callable[[], bool]] = None,
+    ) -> bool:
+        """
+        Delete a blob, unless ``referenced`` reports a row using it
+
+        The check runs after throttling, immediately before the delete, so a
+        row recorded while this pass was waiting keeps its blob.
+
+        Returns:
+            False when the blob was kept because it is referenced again
+        """
+        if dry_run:
+            report.policies[policy].files += 1
+            report.policies[policy].bytes += size
+            return True
+        throttle.consume(size)
+        if referenced is not None and referenced():
+            return False
+        report.policies[policy].files += 1
+        report.policies[policy].bytes += size
+        try:
+            get_blob_store().delete(key)
+        except StorageError as e:
+            logger.warning(f"Could not delete blob {key}: {str(e)}")
+            return True
+        _count_reclaimed(policy, 1, size)
+        return True
+
+    def _remove_variants(self, report: MaintenanceReport, policy: str, key: str, throttle: IoThrottle, dry_run: bool):
+        """Transcoded variants are cached by the content hash, which content keys carry in their name"""
+        digest = os.path.splitext(key.rsplit("/", 1)[-1])[0]
+        if len(digest) != 64:
+            return
+        pattern = os.path.join(settings.UPLOAD_DIR, "cache", "variants", digest[:2], f"{digest}*")
+        for path in glob.glob(pattern):
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            report.policies[policy].files += 1
+            report.policies[policy].bytes += size
+            if dry_run:
+                continue
+            throttle.consume(size)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            _count_reclaimed(policy, 1, size)
+
+
+def generated_bytes(db: Session) -> int:
+    """Size of the stored generated audio, counting blobs shared by several rows once"""
+    per_blob = (
+        select(func.max(func.coalesce(GeneratedAudio.size_bytes, 0)).label("size"))
+        .where(GeneratedAudio.audio_path.isnot(None))
+        .group_by(GeneratedAudio.audio_path)
+        .subquery()
+    )
+    return int(db.execute(select(func.coalesce(func.sum(per_blob.c.size), 0))).scalar() or 0)
+
+
+def _referenced_after(db: Session, row: GeneratedAudio) -> bool:
+    """Whether a newer row than ``row`` stores its audio under the same key"""
+    return db.execute(
+        select(GeneratedAudio.id)
+        .where(
+            GeneratedAudio.audio_path == row.audio_path,
+            tuple_(GeneratedAudio.created_at, GeneratedAudio.id) > tuple_(row.created_at, row.id),
+        )
+        .limit(1)
+    ).first() is not None
+
+
+def _generated_key_referenced(db: Session, key: str) -> bool:
+    """Whether any row still stores its audio under ``key`` (expired rows have theirs cleared)"""
+    return db.execute(
+        select(GeneratedAudio.id).where(GeneratedAudio.audio_path == key).limit(1)
+    ).first() is not None
+
+
+def _sample_key_referenced(db: Session, key: str, excluded_profiles: Set[int]) -> bool:
+    """Whether a sample, latents or aggregate key is used by a profile that is not being purged"""
+    excluded = list(excluded_profiles) or [-1]
+    sample = db.execute(
+        select(VoiceSample.id)
+        .where(
+            or_(VoiceSample.audio_path == key, VoiceSample.latents_path == key),
+            VoiceSample.voice_profile_id.notin_(excluded),
+        )
+        .limit(1)
+    ).first()
+    if sample is not None:
+        return True
+    voice = db.execute(
+        select(VoiceProfile.id)
+        .where(
+            or_(VoiceProfile.sample_audio_path == key, VoiceProfile.aggregate_latents_path == key),
+            VoiceProfile.id.notin_(excluded),
+        )
+        .limit(1)
+    ).first()
+    return voice is not None
+
+
+def _blob_size(blob_store, key: str) -> int:
+    """Size of a blob, 0 when it is already gone"""
+    try:
+        return blob_store.size(key)
+    except BlobNotFoundError:
+        return 0
+
+
+def _hash_file(path: str, throttle: IoThrottle) -> str:
+    """SHA-256 of a file, read at the throttled rate (not memoized: each file is hashed once per pass)"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            throttle.consume(len(chunk))
+    return hasher.hexdigest()
+
+
+def _replace_with_link(target: str, path: str) -> bool:
+    """Atomically replace ``path`` with a hardlink to ``target``; False if they cannot be linked"""
+    tmp_path = f"{path}.tmp.{uuid.uuid4().hex}"
+    try:
+        os.link(target, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        logger.warning(f"Could not link {path} to {target}: {str(e)}")
+        return False
+    forget_file(path)
+    return True
+
+
+def _count_reclaimed(policy: str, files: int, nbytes: int):
+    labels = {"policy": policy}
+    metrics.counter("maintenance_files_removed_total", "Files removed or deduplicated by maintenance", labels=labels).inc(files)
+    metrics.counter("maintenance_bytes_reclaimed_total", "Bytes reclaimed by maintenance", labels=labels).inc(nbytes)
+
+
+def _try_advisory_lock(connection) -> bool:
+    """
+    Take the cluster-wide maintenance lock on an autocommit connection
+
+    Session-level advisory locks (PostgreSQL) hold no transaction open for
+    the length of the pass. Other databases serve a single process.
+    """
+    if connection.dialect.name != "postgresql":
+        return True
+    return bool(connection.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": _ADVISORY_LOCK_ID}).scalar())
+
+
+def _release_advisory_lock(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    try:
+        connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _ADVISORY_LOCK_ID})
+    except Exception as e:
+        logger.warning(f"Could not release the maintenance lock: {str(e)}")
+
+
+# Global instance (singleton pattern)
+_maintenance_service = None
+
+
+def get_maintenance_service() -> MaintenanceService:
+    """Get the global maintenance service instance"""
+    global _maintenance_service
+    if _maintenance_service is None:
+        _maintenance_service = MaintenanceService(
+            interval=settings.MAINTENANCE_INTERVAL_SECONDS,
+            batch_size=settings.MAINTENANCE_BATCH_SIZE,
+            io_bytes_per_second=settings.MAINTENANCE_IO_BYTES_PER_SECOND,
+            yield_in_flight=settings.MAINTENANCE_YIELD_IN_FLIGHT,
+        )
+    return _maintenance_service
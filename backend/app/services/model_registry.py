@@ -0,0 +1,212 @@
+"""
+Model registry
+Keeps several TTS models side by side within a memory budget, evicting the least recently used
+"""
+import time
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.memory import current_rss_bytes
+from ..core.metrics import metrics
+from .model_snapshot import find_snapshot, read_manifest
+from .voice_cloning import VoiceCloningService
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownModelError(ValueError):
+    """Raised when a request names a model that is not configured"""
+
+
+def resolve_model(generation_settings: Optional[dict]) -> Optional[str]:
+    """
+    Model requested by ``settings["model"]`` of a generation request
+
+    Requests may name a configured alias (``TTS_MODEL_ALIASES``) or the full
+    name of a configured model; other names are rejected so clients cannot
+    make the server download arbitrary models.
+
+    Returns:
+        Full model name, or None for the default model (``TTS_MODEL``)
+    """
+    name = generation_settings.get("model") if generation_settings else None
+    if not name:
+        return None
+    aliases = settings.model_aliases
+    model_name = aliases.get(name, name)
+    if model_name == settings.TTS_MODEL:
+        return None
+    if model_name not in aliases.values():
+        raise UnknownModelError(f"Unknown model: {name}")
+    return model_name
+
+
+@dataclass
+class ModelStats:
+    loads: int = 0
+    evictions: int = 0
+    resident_bytes: int = 0  # Measured on the last load
+    last_load_seconds: float = 0.0
+
+
+class ModelRegistry:
+    """
+    Services of the configured models, loaded on demand
+
+    Each model is loaded by the first request that needs it. Loads are
+    serialized: a request for a model that is being loaded waits for that
+    load instead of starting another, and the RSS growth of each load can be
+    attributed to its model. Before a load, idle models are unloaded least
+    recently used first until the expected total fits ``memory_budget_bytes``.
+    Models serving a request are never evicted.
+    """
+
+    def __init__(self, default_model: str, memory_budget_bytes: int = 0):
+        """
+        Initialize the registry
+
+        Args:
+            default_model: Model served when a request names none
+            memory_budget_bytes: Resident memory allowed for all loaded models (0 = no budget)
+        """
+        self.default_model = default_model
+        self.memory_budget_bytes = memory_budget_bytes
+        self._services: Dict[str, VoiceCloningService] = {}
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        metrics.gauge("tts_models_resident_bytes", "Measured memory of all loaded TTS models").set_function(
+            self.resident_bytes
+        )
+
+    def get(self, model_name: Optional[str] = None) -> VoiceCloningService:
+        """Service of a model (the default model when none is given); does not load it"""
+        model_name = model_name or self.default_model
+        with self._lock:
+            service = self._services.get(model_name)
+        return service or self.register(VoiceCloningService(model_name=model_name))
+
+    def register(self, service: VoiceCloningService, replace: bool = False) -> VoiceCloningService:
+        """Add a service under its model name, unless one is already registered"""
+        with self._lock:
+            existing = self._services.get(service.model_name)
+            if existing is not None and not replace:
+                return existing
+            service.registry = self
+            self._services[service.model_name] = service
+            self._stats[service.model_name] = ModelStats()
+
+        labels = {"model": service.model_name}
+        metrics.gauge("tts_model_resident_bytes", "Measured memory of a loaded TTS model", labels=labels).set_function(
+            lambda: self._stats[service.model_name].resident_bytes if service.is_loaded else 0
+        )
+        return service
+
+    def services(self) -> List[VoiceCloningService]:
+        with self._lock:
+            return list(self._services.values())
+
+    def resident_bytes(self) -> int:
+        """Measured memory of the loaded models"""
+        return sum(self._stats[s.model_name].resident_bytes for s in self.services() if s.is_loaded)
+
+    def _expected_bytes(self, service: VoiceCloningService) -> int:
+        """Memory a load is expected to take: the last measurement, else the snapshot size"""
+        measured = self._stats[service.model_name].resident_bytes
+        if measured:
+            return measured
+        snapshot = find_snapshot(settings.MODEL_SNAPSHOT_DIR, service.model_name)
+        manifest = read_manifest(snapshot) if snapshot else None
+        return manifest.get("weights_bytes", 0) if manifest else 0
+
+    def _make_room(self, keep: VoiceCloningService, incoming: int):
+        """Evict idle models, least recently used first, until ``incoming`` more bytes fit"""
+        if self.memory_budget_bytes <= 0:
+            return
+        while self.resident_bytes() + incoming > self.memory_budget_bytes:
+            candidates = [s for s in self.services() if s is not keep and s.is_loaded and not s.is_busy]
+            if not candidates:
+                logger.warning(
+                    f"Model memory budget exceeded ({(self.resident_bytes() + incoming) / 1e6:.0f} MB "
+                    f"of {self.memory_budget_bytes / 1e6:.0f} MB) and no idle model to evict"
+                )
+                return
+            victim = min(candidates, key=lambda s: s.last_used)
+            if victim.unload_if_idle():
+                self._stats[victim.model_name].evictions += 1
+                metrics.counter(
+                    "tts_model_evictions_total", "Models unloaded to stay within the memory budget",
+                    labels={"model": victim.model_name},
+                ).inc()
+                logger.info(f"Evicted TTS model {victim.model_name} to stay within the memory budget")
+
+    def load(self, service: VoiceCloningService):
+        """Load a registered service's model, making room for it first"""
+        with self._load_lock:
+            if service.is_loaded:
+                return
+            stats = self._stats[service.model_name]
+            self._make_room(service, self._expected_bytes(service))
+
+            rss_before = current_rss_bytes()
+            started_at = time.perf_counter()
+            service.load_unmanaged()
+            stats.last_load_seconds = time.perf_counter() - started_at
+            # Mapped snapshot weights are only counted in RSS once touched
+            stats.resident_bytes = max(current_rss_bytes() - rss_before, self._expected_bytes(service), 0)
+            stats.loads += 1
+            metrics.counter(
+                "tts_model_loads_total", "TTS model loads", labels={"model": service.model_name}
+            ).inc()
+            logger.info(
+                f"Loaded TTS model {service.model_name} in {stats.last_load_seconds:.2f}s "
+                f"({stats.resident_bytes / 1e6:.0f} MB)"
+            )
+            # The measurement may exceed the estimate
+            self._make_room(service, 0)
+
+    def stats(self) -> dict:
+        aliases = settings.model_aliases
+        models = {}
+        for service in self.services():
+            stats = self._stats[service.model_name]
+            models[service.model_name] = {
+                "aliases": sorted(alias for alias, name in aliases.items() if name == service.model_name),
+                "loaded": service.is_loaded,
+                "busy": service.is_busy,
+                "loads": stats.loads,
+                "evictions": stats.evictions,
+                "resident_bytes": stats.resident_bytes if service.is_loaded else 0,
+                "last_load_seconds": round(stats.last_load_seconds, 3),
+            }
+        return {
+            "default_model": self.default_model,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "resident_bytes": self.resident_bytes(),
+            "models": models,
+        }
+
+
+# Global instance (singleton pattern)
+_model_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the global model registry instance"""
+    global _model_registry
+    with _registry_lock:
+        if _model_registry is None:
+            _model_registry = ModelRegistry(
+                settings.TTS_MODEL,
+                memory_budget_bytes=settings.MODEL_REGISTRY_BUDGET_MB * 1024 * 1024,
+            )
+    return _model_registry
+
+
+def get_voice_service(model_name: Optional[str] = None) -> VoiceCloningService:
+    """Get the voice cloning service of a model (the default model when none is given)"""
+    return get_model_registry().get(model_name)
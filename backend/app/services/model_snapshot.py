@@ -0,0 +1,321 @@
+"""
+Memory-mapped model weight snapshots
+Converts a Coqui XTTS model once into a layout that loads by mapping the weights instead of unpickling them
+
+Usage:
+    python -m app.services.model_snapshot build [--model NAME] [--output DIR]
+    python -m app.services.model_snapshot bench [--model NAME] [--snapshot-dir DIR] [--runs 3]
+
+A snapshot directory holds the model config, the tokenizer vocabulary, the
+built-in speakers and the weights saved with ``torch.save``. Loading maps the
+weights file (``torch.load(mmap=True)``) and assigns the mapped tensors to the
+model, so no checkpoint copy is made and replicas on one host share the pages
+through the page cache.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.memory import current_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+MANIFEST_FILE = "manifest.json"
+CONFIG_FILE = "config.json"
+VOCAB_FILE = "vocab.json"
+SPEAKERS_FILE = "speakers.pth"
+WEIGHTS_FILE = "weights.pt"
+
+# Rebuilt from the other weights by init_gpt_for_inference
+_DERIVED_PREFIXES = ("gpt.gpt_inference.",)
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def snapshot_path(root: str, model_name: str) -> str:
+    """Directory of a model's snapshot under ``root``"""
+    return os.path.join(root, model_name.replace("/", "--"))
+
+
+def read_manifest(path: str) -> Optional[dict]:
+    """Manifest of a snapshot directory, or None if there is no complete snapshot"""
+    try:
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_snapshot(root: str, model_name: str) -> Optional[str]:
+    """
+    Locate a usable snapshot of a model
+
+    Args:
+        root: Snapshot root (``MODEL_SNAPSHOT_DIR``); empty disables snapshots
+        model_name: Coqui model name
+
+    Returns:
+        Snapshot directory, or None to load the model the regular way
+    """
+    if not root:
+        return None
+    path = snapshot_path(root, model_name)
+    manifest = read_manifest(path)
+    if manifest is None:
+        return None
+    if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("model_name") != model_name:
+        logger.warning(f"Ignoring snapshot {path}: built for {manifest.get('model_name')} (format {manifest.get('format')})")
+        return None
+    return path
+
+
+def build_snapshot(tts, model_name: str, root: str) -> dict:
+    """
+    Write a snapshot of a model loaded by Coqui
+
+    The snapshot is written next to its final location and moved into place,
+    so running services never see a partial one.
+
+    Args:
+        tts: ``TTS`` instance loaded without an inference profile
+        model_name: Coqui model name the snapshot stands for
+        root: Snapshot root directory
+
+    Returns:
+        The snapshot manifest
+    """
+    import torch
+
+    model = tts.synthesizer.tts_model
+    if not (hasattr(model, "init_models") and hasattr(getattr(model, "gpt", None), "init_gpt_for_inference")):
+        raise ValueError(f"Weight snapshots are only supported for XTTS models, not {model_name}")
+
+    path = snapshot_path(root, model_name)
+    staging = f"{path}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    state = {
+        name: tensor for name, tensor in model.state_dict().items()
+        if not name.startswith(_DERIVED_PREFIXES)
+    }
+    torch.save(state, os.path.join(staging, WEIGHTS_FILE))
+    tts.synthesizer.tts_config.save_json(os.path.join(staging, CONFIG_FILE))
+    model.tokenizer.tokenizer.save(os.path.join(staging, VOCAB_FILE))
+
+    speakers = getattr(getattr(model, "speaker_manager", None), "speakers", None)
+    if speakers:
+        torch.save(speakers, os.path.join(staging, SPEAKERS_FILE))
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "model_name": model_name,
+        "tensors": len(state),
+        "parameters": sum(t.numel() for t in state.values()),
+        "weights_bytes": os.path.getsize(os.path.join(staging, WEIGHTS_FILE)),
+        "speakers": len(speakers or {}),
+        "torch_version": torch.__version__,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+    logger.info(f"Wrote snapshot of {model_name} to {path} ({manifest['weights_bytes'] / 1e6:.0f} MB)")
+    return manifest
+
+
+def load_snapshot(path: str, device: str):
+    """
+    Build a ``TTS`` instance from a snapshot
+
+    Mirrors ``Xtts.load_checkpoint``, except that the weights are memory
+    mapped and assigned rather than copied into freshly allocated tensors.
+
+    Args:
+        path: Snapshot directory (see ``find_snapshot``)
+        device: Device to move the model to
+
+    Returns:
+        A ``TTS`` instance equivalent to ``TTS(model_name)``
+    """
+    import torch
+    from TTS.api import TTS
+    from TTS.tts.configs.xtts_config import XttsConfig
+    from TTS.tts.layers.xtts.tokenizer import VoiceBpeTokenizer
+    from TTS.tts.models.xtts import Xtts
+    from TTS.tts.utils.speakers import SpeakerManager
+    from TTS.utils.synthesizer import Synthesizer
+
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot manifest in {path}")
+
+    config = XttsConfig()
+    config.load_json(os.path.join(path, CONFIG_FILE))
+    model = Xtts.init_from_config(config)
+    model.tokenizer = VoiceBpeTokenizer(vocab_file=os.path.join(path, VOCAB_FILE))
+    model.init_models()
+
+    state = torch.load(os.path.join(path, WEIGHTS_FILE), map_location="cpu", mmap=True, weights_only=True)
+    result = model.load_state_dict(state, strict=False, assign=True)
+    missing = [name for name in result.missing_keys if not name.startswith(_DERIVED_PREFIXES)]
+    if missing or result.unexpected_keys:
+        raise ValueError(
+            f"Snapshot does not match the model: {len(missing)} missing, "
+            f"{len(result.unexpected_keys)} unexpected tensors"
+        )
+
+    speakers_path = os.path.join(path, SPEAKERS_FILE)
+    if os.path.exists(speakers_path):
+        model.speaker_manager = SpeakerManager(speakers_path)
+
+    model.hifigan_decoder.eval()
+    model.gpt.init_gpt_for_inference(kv_cache=model.args.kv_cache, use_deepspeed=False)
+    model.gpt.eval()
+
+    synthesizer = Synthesizer(use_cuda=device == "cuda")
+    synthesizer.tts_model = model
+    synthesizer.tts_config = config
+    synthesizer.output_sample_rate = config.audio.output_sample_rate
+
+    tts = TTS()
+    tts.model_name = manifest["model_name"]
+    tts.config = config
+    tts.synthesizer = synthesizer
+    # A no-op on CPU: the mapped weights stay shared
+    return tts.to(device)
+
+
+def _load_child(args) -> int:
+    """One cold load in a fresh process, reported as a JSON line on stdout"""
+    started = time.perf_counter()
+    from .voice_cloning import VoiceCloningService
+    imported = time.perf_counter()
+
+    service = VoiceCloningService(model_name=args.model)
+    if args.source == "snapshot":
+        if not find_snapshot(settings.MODEL_SNAPSHOT_DIR, args.model):
+            print(f"No snapshot of {args.model} in {settings.MODEL_SNAPSHOT_DIR}", file=sys.stderr)
+            return 1
+        service.tts = load_snapshot(snapshot_path(settings.MODEL_SNAPSHOT_DIR, args.model), service.device)
+    else:
+        from TTS.api import TTS
+        service.tts = TTS(args.model).to(service.device)
+    loaded = time.perf_counter()
+
+    # Proves the loaded model works, and times the first call's page faults
+    wav = service.synthesize("This is a quick check of the loaded model.")
+    synthesized = time.perf_counter()
+
+    print(json.dumps({
+        "source": args.source,
+        "import_seconds": round(imported - started, 3),
+        "load_seconds": round(loaded - imported, 3),
+        "first_synthesis_seconds": round(synthesized - loaded, 3),
+        "rss_mb": round(current_rss_bytes() / 1e6, 1),
+        "samples": int(len(wav)),
+    }))
+    return 0
+
+
+def _time_loads(model_name: str, root: str, runs: int) -> Dict[str, List[dict]]:
+    """Alternate cold loads of both sources in subprocesses"""
+    env = dict(os.environ, MODEL_SNAPSHOT_DIR=root)
+    results: Dict[str, List[dict]] = {"coqui": [], "snapshot": []}
+    for _ in range(runs):
+        for source in results:
+            completed = subprocess.run(
+                [sys.executable, "-m", "app.services.model_snapshot", "load-child", "--source", source, "--model", model_name],
+                capture_output=True, text=True, env=env, cwd=_BACKEND_DIR,
+            )
+            if completed.returncode != 0:
+                raise RuntimeError(f"{source} load failed:\n{completed.stderr[-2000:]}")
+            results[source].append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def _summarize(runs: List[dict]) -> dict:
+    return {
+        key: round(statistics.median(run[key] for run in runs), 3)
+        for key in ("import_seconds", "load_seconds", "first_synthesis_seconds", "rss_mb")
+    }
+
+
+def benchmark(model_name: str, root: str, runs: int) -> dict:
+    """
+    Compare cold loads through Coqui and from the snapshot
+
+    Returns:
+        Median timings per source and the load speedup
+    """
+    loads = _time_loads(model_name, root, runs)
+    coqui = _summarize(loads["coqui"])
+    snapshot = _summarize(loads["snapshot"])
+    return {
+        "model_name": model_name,
+        "snapshot_path": snapshot_path(root, model_name),
+        "runs": runs,
+        "coqui": coqui,
+        "snapshot": snapshot,
+        "load_speedup": round(coqui["load_seconds"] / max(snapshot["load_seconds"], 1e-6), 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and benchmark memory-mapped model weight snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="Convert a Coqui model into a snapshot, then benchmark it")
+    build_parser.add_argument("--model", default=DEFAULT_MODEL)
+    build_parser.add_argument("--output", default=settings.MODEL_SNAPSHOT_DIR, help="Snapshot root (default: MODEL_SNAPSHOT_DIR)")
+    build_parser.add_argument("--runs", type=int, default=1, help="Cold loads per source after building, 0 to skip")
+
+    bench_parser = commands.add_parser("bench", help="Compare cold loads of an existing snapshot with Coqui")
+    bench_parser.add_argument("--model", default=DEFAULT_MODEL)
+    bench_parser.add_argument("--snapshot-dir", default=settings.MODEL_SNAPSHOT_DIR)
+    bench_parser.add_argument("--runs", type=int, default=3)
+
+    child_parser = commands.add_parser("load-child")
+    child_parser.add_argument("--source", choices=("coqui", "snapshot"), required=True)
+    child_parser.add_argument("--model", default=DEFAULT_MODEL)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    if args.command == "load-child":
+        return _load_child(args)
+
+    root = args.output if args.command == "build" else args.snapshot_dir
+    if not root:
+        parser.error("Set MODEL_SNAPSHOT_DIR or pass the snapshot root")
+
+    report = {}
+    if args.command == "build":
+        from TTS.api import TTS
+        started = time.perf_counter()
+        tts = TTS(args.model)
+        report["manifest"] = build_snapshot(tts, args.model, root)
+        report["build_seconds"] = round(time.perf_counter() - started, 3)
+        del tts
+    if args.runs > 0:
+        report.update(benchmark(args.model, root, args.runs))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
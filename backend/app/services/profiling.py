@@ -0,0 +1,231 @@
+"""
+On-demand request profiling
+Samples Python stacks and records torch operators for selected synthesis requests
+"""
+import hmac
+import io
+import os
+import sys
+import time
+import random
+import threading
+import uuid
+import logging
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import RequestProfile
+from .storage import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-ID"  # Set on responses of profiled requests
+
+# Artifact name -> (file suffix, media type)
+ARTIFACTS = {
+    "stacks": ("folded", "text/plain"),
+    "torch_trace": ("trace.json", "application/json"),
+    "torch_ops": ("ops.txt", "text/plain"),
+}
+
+# Frames from this file mark a thread as doing model work for someone
+_MODEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "voice_cloning.py")
+
+
+def should_profile(header_value: Optional[str]) -> bool:
+    """
+    Decide whether to profile a request
+
+    Nothing is profiled unless ``PROFILING_ENABLED`` is set. Then a request
+    is profiled when it carries ``X-Profile`` with the admin token, or at
+    random with probability ``PROFILING_SAMPLE_RATE``.
+    """
+    if not settings.PROFILING_ENABLED:
+        return False
+    token = settings.PROFILING_ADMIN_TOKEN
+    if header_value and token and hmac.compare_digest(header_value, token):
+        return True
+    return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+class StackSampler:
+    """
+    Statistical profiler producing folded stacks
+
+    A daemon thread snapshots ``sys._current_frames()`` every ``interval``
+    seconds. It keeps the stacks of the profiled thread and of any other
+    thread currently inside the model service (batch scheduler, long-form
+    workers), so work handed off to pools is attributed too. Model work of
+    concurrent requests on shared threads is included as well.
+
+    The output is the "folded" format read by flamegraph.pl and speedscope:
+    one ``thread;outer;...;inner count`` line per distinct stack.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                in_model = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_model = in_model or code.co_filename == _MODEL_FILE
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if thread_id != self.thread_id and not in_model:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> bytes:
+        lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+        return ("\n".join(lines) + "\n").encode()
+
+
+class ProfileSession:
+    """
+    Profiles a block on the current thread
+
+    Runs the stack sampler and, when ``PROFILING_TORCH`` is set, the torch
+    profiler. The torch profiler records operators of the thread that
+    entered the block; the sampler covers hand-offs to other threads.
+    """
+
+    def __init__(self):
+        self.artifacts: Dict[str, bytes] = {}
+        self.wall_seconds = 0.0
+        self._sampler: Optional[StackSampler] = None
+        self._torch_profiler = None
+        self._started = 0.0
+
+    def __enter__(self):
+        self._sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000.0)
+        if settings.PROFILING_TORCH:
+            import torch
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            self._torch_profiler = torch.profiler.profile(activities=activities)
+            self._torch_profiler.__enter__()
+        self._started = time.perf_counter()
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._sampler.stop()
+        self.wall_seconds = time.perf_counter() - self._started
+        self.artifacts["stacks"] = self._sampler.folded()
+
+        if self._torch_profiler is not None:
+            self._torch_profiler.__exit__(exc_type, exc, tb)
+            self._export_torch()
+        return False
+
+    @property
+    def samples(self) -> int:
+        return self._sampler.samples if self._sampler else 0
+
+    def _export_torch(self):
+        profiler = self._torch_profiler
+        # export_chrome_trace only writes to a path
+        trace_path = os.path.join(settings.UPLOAD_DIR, "tmp", f"trace_{uuid.uuid4().hex}.json")
+        os.makedirs(os.path.dirname(trace_path), exist_ok=True)
+        try:
+            profiler.export_chrome_trace(trace_path)
+            with open(trace_path, "rb") as f:
+                self.artifacts["torch_trace"] = f.read()
+        except Exception as e:
+            logger.warning(f"Could not export torch trace: {str(e)}")
+        finally:
+            if os.path.exists(trace_path):
+                os.remove(trace_path)
+
+        table = io.StringIO()
+        table.write(profiler.key_averages().table(sort_by="self_cpu_time_total", row_limit=40))
+        self.artifacts["torch_ops"] = table.getvalue().encode()
+
+
+def _artifact_prefix(output_key: Optional[str], profile_id: str) -> str:
+    """Profiles sit next to the audio they describe, e.g. ``generated/ab/cd/<sha>.profile-<id>``"""
+    if output_key:
+        return f"{os.path.splitext(output_key)[0]}.profile-{profile_id}"
+    return f"profiles/{profile_id[:2]}/{profile_id}"
+
+
+def write_local_artifacts(session: ProfileSession, output_path: str) -> Dict[str, str]:
+    """Write a session's artifacts next to a local output file; returns name -> path"""
+    base = f"{os.path.splitext(output_path)[0]}.profile-{uuid.uuid4().hex}"
+    paths = {}
+    for name, data in session.artifacts.items():
+        path = f"{base}.{ARTIFACTS[name][0]}"
+        with open(path, "wb") as f:
+            f.write(data)
+        paths[name] = path
+    return paths
+
+
+def save_profile(
+    db: Session,
+    session: ProfileSession,
+    label: str,
+    text: str,
+    output_key: Optional[str] = None,
+    generated_audio_id: Optional[int] = None,
+    request_id: Optional[str] = None,
+) -> RequestProfile:
+    """
+    Store a finished session's artifacts and record them
+
+    Returns:
+        The committed RequestProfile row
+    """
+    profile_id = uuid.uuid4().hex
+    prefix = _artifact_prefix(output_key, profile_id)
+    blob_store = get_blob_store()
+    files = {}
+    for name, data in session.artifacts.items():
+        key = f"{prefix}.{ARTIFACTS[name][0]}"
+        blob_store.put_bytes(key, data)
+        files[name] = key
+
+    profile = RequestProfile(
+        profile_id=profile_id,
+        request_id=request_id,
+        label=label,
+        generated_audio_id=generated_audio_id,
+        text_chars=len(text),
+        wall_seconds=session.wall_seconds,
+        sample_count=session.samples,
+        files=files,
+    )
+    db.add(profile)
+    db.commit()
+    db.refresh(profile)
+    logger.info(f"Stored profile {profile_id} of {label} ({session.wall_seconds:.2f}s, {session.samples} samples)")
+    return profile
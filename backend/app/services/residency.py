@@ -0,0 +1,167 @@
+"""
+Model residency management
+Eager load and warm-up at startup, readiness reporting and idle unloading
+"""
+import time
+import threading
+import logging
+from typing import Optional
+
+from ..core.config import settings
+from ..core.memory import current_rss_bytes
+from ..core.metrics import metrics
+from .model_registry import get_voice_service
+from .voice_cloning import VoiceCloningService
+from .inference_pool import get_inference_pool
+from .latent_cache import get_latent_cache
+
+logger = logging.getLogger(__name__)
+
+model_load_seconds = metrics.histogram(
+    "tts_model_load_seconds",
+    "Time to load the TTS model",
+    buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300),
+)
+model_warmup_seconds = metrics.histogram(
+    "tts_model_warmup_seconds",
+    "Time of the warm-up synthesis after loading",
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60),
+)
+model_unloads = metrics.counter("tts_model_unloads_total", "Idle or memory pressure unloads")
+
+
+class ModelResidencyManager:
+    """
+    Decides when the model is resident
+
+    At startup the model can be loaded and exercised once in the background
+    so the first user request does not pay for it. A watchdog thread unloads
+    the model after ``idle_timeout`` seconds without use, or as soon as it is
+    idle while process RSS exceeds ``memory_budget_bytes``; the next request
+    loads it lazily again.
+    """
+
+    def __init__(
+        self,
+        service: VoiceCloningService,
+        idle_timeout: float = 0,
+        memory_budget_bytes: int = 0,
+        check_interval: float = 10.0,
+    ):
+        """
+        Initialize the manager
+
+        Args:
+            service: Service whose model is managed
+            idle_timeout: Seconds without use before unloading (0 = never)
+            memory_budget_bytes: RSS above which an idle model is unloaded (0 = no budget)
+            check_interval: Seconds between watchdog checks
+        """
+        self.service = service
+        self.idle_timeout = idle_timeout
+        self.memory_budget_bytes = memory_budget_bytes
+        self.check_interval = check_interval
+        self.warmed_up = False
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        metrics.gauge("tts_model_loaded", "Whether the in-process TTS model is loaded (1) or not (0)").set_function(
+            lambda: float(self.service.is_loaded)
+        )
+        metrics.gauge("tts_model_ready", "Whether requests are served without a cold start").set_function(
+            lambda: float(self.ready)
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Whether synthesis requests will be served without a cold start"""
+        if not settings.ENABLE_VOICE_CLONING:
+            return True
+        inference_pool = get_inference_pool()
+        if inference_pool is not None:
+            return inference_pool.ready
+        if settings.MODEL_EAGER_LOAD:
+            # Stays ready after an idle unload: the replica can still serve
+            return self.warmed_up
+        return True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "loaded": self.service.is_loaded,
+            "warmed_up": self.warmed_up,
+            "rss_bytes": current_rss_bytes(),
+        }
+
+    def warm_up(self):
+        """Load the model and run one short synthesis"""
+        started_at = time.perf_counter()
+        self.service.load_model()
+        load_time = time.perf_counter() - started_at
+        model_load_seconds.observe(load_time)
+        logger.info(f"Model loaded in {load_time:.2f}s")
+
+        if settings.MODEL_WARMUP_TEXT:
+            started_at = time.perf_counter()
+            self.service.synthesize(settings.MODEL_WARMUP_TEXT)
+            warmup_time = time.perf_counter() - started_at
+            model_warmup_seconds.observe(warmup_time)
+            logger.info(f"Model warm-up synthesis took {warmup_time:.2f}s")
+
+        self.warmed_up = True
+
+    def start(self):
+        """Warm up in the background (if configured) and start the idle watchdog"""
+        if not settings.ENABLE_VOICE_CLONING or get_inference_pool() is not None:
+            # Nothing to manage in this process
+            return
+        if settings.MODEL_EAGER_LOAD:
+            threading.Thread(target=self._warm_up_safely, name="model-warmup", daemon=True).start()
+        if self.idle_timeout > 0 or self.memory_budget_bytes > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="model-residency", daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    def _warm_up_safely(self):
+        try:
+            self.warm_up()
+        except Exception as e:
+            logger.error(f"Model warm-up failed: {str(e)}")
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval):
+            if not self.service.is_loaded or self.service.is_busy:
+                continue
+
+            idle_for = time.monotonic() - self.service.last_used
+            # Under memory pressure, only wait one check interval of idleness
+            over_budget = (
+                self.memory_budget_bytes > 0
+                and idle_for >= self.check_interval
+                and current_rss_bytes() > self.memory_budget_bytes
+            )
+            if (self.idle_timeout > 0 and idle_for >= self.idle_timeout) or over_budget:
+                if self.service.unload_if_idle():
+                    get_latent_cache().clear()
+                    model_unloads.inc()
+                    reason = "memory budget exceeded" if over_budget else f"idle for {idle_for:.0f}s"
+                    logger.info(f"Unloaded TTS model ({reason})")
+
+
+# Global instance (singleton pattern)
+_residency_manager = None
+
+
+def get_residency_manager() -> ModelResidencyManager:
+    """Get the global model residency manager instance"""
+    global _residency_manager
+    if _residency_manager is None:
+        _residency_manager = ModelResidencyManager(
+            get_voice_service(),
+            idle_timeout=settings.MODEL_IDLE_TIMEOUT_SECONDS,
+            memory_budget_bytes=settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024,
+        )
+    return _residency_manager
@@ -0,0 +1,256 @@
+"""
+Content-addressed cache of synthesized outputs
+Maps a normalized generation request to an already rendered audio file
+"""
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+cache_hits = metrics.counter(
+    "tts_result_cache_lookups_total", "Result cache lookups by outcome", labels={"result": "hit"}
+)
+cache_misses = metrics.counter(
+    "tts_result_cache_lookups_total", "Result cache lookups by outcome", labels={"result": "miss"}
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace and strip the ends"""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def request_key(
+    text: str,
+    voice_profile_id: Optional[int],
+    speaker_wav: Optional[str],
+    language: str,
+    generation_settings: Optional[dict],
+) -> str:
+    """
+    Build the cache key for a generation request
+
+    Args:
+        text: Input text
+        voice_profile_id: Voice profile used, if any
+        speaker_wav: Reference sample of the voice, if any
+        language: Language code
+        generation_settings: Request settings
+
+    Returns:
+        Hex encoded SHA-256 of the canonicalized request
+    """
+    sample_hash = None
+    if speaker_wav and os.path.exists(speaker_wav):
+        sample_hash = file_sha256(speaker_wav)
+
+    canonical = json.dumps(
+        {
+            "text": normalize_text(text),
+            "voice_profile_id": voice_profile_id,
+            "sample": sample_hash,
+            "language": language,
+            "settings": generation_settings or {},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResult:
+    key: str
+    path: str
+    size: int
+    duration_seconds: Optional[float]
+    created_at: float
+
+
+class ResultCache:
+    """
+    Disk-backed cache of generated audio keyed by request hash
+
+    Cached files live in their own directory as links (or copies) of the
+    stored outputs, so eviction never removes a blob a ``GeneratedAudio``
+    row still refers to; a hit restores the blob if it went missing.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, ttl_seconds: int):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding cached outputs
+            max_bytes: Upper bound on the total size of cached files (0 = unbounded)
+            ttl_seconds: Age after which an entry expires (0 = never)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Look up a cached output, counting the hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self._expired(entry) or not os.path.exists(entry.path)):
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                cache_misses.inc()
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            cache_hits.inc()
+            return entry
+
+    def put(self, key: str, source_path: str, duration_seconds: Optional[float]) -> Optional[CachedResult]:
+        """
+        Store a freshly generated output under a request key
+
+        Args:
+            key: Request key from ``request_key``
+            source_path: Generated audio file
+            duration_seconds: Duration of the audio
+
+        Returns:
+            The new cache entry, or None if the file could not be cached
+        """
+        cached_path = os.path.join(self.cache_dir, f"{key}.wav")
+        try:
+            _link_or_copy(source_path, cached_path)
+        except OSError as e:
+            logger.warning(f"Could not cache result {key}: {str(e)}")
+            return None
+
+        entry = CachedResult(
+            key=key,
+            path=cached_path,
+            size=os.path.getsize(cached_path),
+            duration_seconds=duration_seconds,
+            created_at=time.time(),
+        )
+        with open(self._meta_path(key), "w") as f:
+            json.dump(asdict(entry), f)
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries[key].size
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, entry: CachedResult) -> bool:
+        return self.ttl_seconds > 0 and time.time() - entry.created_at > self.ttl_seconds
+
+    def _evict(self):
+        # Expired entries first, then least recently used until under budget
+        for key in [k for k, e in self._entries.items() if self._expired(e)]:
+            self._remove(key)
+            self.evictions += 1
+        while self.max_bytes > 0 and self._total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+        for path in (entry.path, self._meta_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _load_index(self):
+        """Rebuild the index from metadata left by a previous process"""
+        metas = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name)) as f:
+                    entry = CachedResult(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                continue
+            if os.path.exists(entry.path):
+                metas.append(entry)
+
+        for entry in sorted(metas, key=lambda e: e.created_at):
+            self._entries[entry.key] = entry
+            self._total_bytes += entry.size
+        with self._lock:
+            self._evict()
+        logger.info(f"Result cache loaded {len(self._entries)} entries ({self._total_bytes} bytes)")
+
+
+def _link_or_copy(source: str, destination: str):
+    """Hardlink a file into place, falling back to a copy across filesystems"""
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+# Global instance (singleton pattern)
+_result_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the global result cache instance"""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            cache_dir=os.path.join(settings.UPLOAD_DIR, "cache", "results"),
+            max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+            ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+        )
+    return _result_cache
@@ -0,0 +1,113 @@
+"""
+Voice sample ingestion
+Streams uploads to disk and converts them once to a canonical WAV in the blob store
+"""
+import os
+import logging
+from dataclasses import dataclass
+
+import aiofiles
+import numpy as np
+from fastapi import UploadFile
+
+from ..core.config import settings
+from .audio_io import encode_wav
+from .audio_processing import normalize_loudness, trim_silence
+from .storage import bytes_sha256, content_key, get_blob_store
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1024 * 1024
+
+ALLOWED_SAMPLE_EXTENSIONS = {".wav", ".mp3", ".flac", ".m4a", ".ogg"}
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE"""
+
+
+class InvalidSampleError(Exception):
+    """Raised when an uploaded file cannot be decoded as usable audio"""
+
+
+@dataclass
+class SampleInfo:
+    key: str
+    sha256: str
+    duration_seconds: float
+
+
+async def save_upload(upload: UploadFile, destination: str, max_bytes: int) -> int:
+    """
+    Stream an upload to disk without blocking the event loop
+
+    Args:
+        upload: Uploaded file
+        destination: Path to write to
+        max_bytes: Size limit; the partial file is removed when exceeded
+
+    Returns:
+        Number of bytes written
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(upload.size)
+
+    written = 0
+    try:
+        async with aiofiles.open(destination, "wb") as out:
+            while True:
+                chunk = await upload.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLargeError(written)
+                await out.write(chunk)
+    except BaseException:
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+    return written
+
+
+def canonicalize_sample(raw_path: str) -> SampleInfo:
+    """
+    Convert a raw upload to the canonical reference format
+
+    The result is mono 16-bit PCM at ``SAMPLE_RATE`` with leading and
+    trailing silence removed and loudness normalized, so synthesis never
+    has to decode or resample the original again. The sample is stored
+    under its content hash. This is blocking.
+
+    Args:
+        raw_path: Uploaded file in any supported format
+
+    Returns:
+        Storage key, content hash and duration of the canonical sample
+    """
+    import torchaudio
+
+    try:
+        waveform, sample_rate = torchaudio.load(raw_path)
+    except Exception as e:
+        raise InvalidSampleError(f"Could not decode audio: {str(e)}") from e
+
+    waveform = waveform.mean(dim=0, keepdim=True)
+    if sample_rate != settings.SAMPLE_RATE:
+        waveform = torchaudio.functional.resample(waveform, sample_rate, settings.SAMPLE_RATE)
+
+    samples = waveform.squeeze(0).numpy().astype(np.float32)
+
+    samples = trim_silence(samples, settings.SAMPLE_RATE)
+    if samples.size == 0:
+        raise InvalidSampleError("Audio sample is empty")
+    samples = normalize_loudness(samples, target_dbfs=settings.SAMPLE_TARGET_DBFS)
+
+    data = encode_wav(samples, settings.SAMPLE_RATE)
+    digest = bytes_sha256(data)
+    key = content_key("samples", digest, "wav")
+    get_blob_store().put_bytes(key, data)
+
+    duration = len(samples) / settings.SAMPLE_RATE
+    logger.info(f"Canonicalized sample {raw_path} -> {key} ({duration:.2f}s)")
+    return SampleInfo(key=key, sha256=digest, duration_seconds=duration)
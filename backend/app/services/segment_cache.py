@@ -0,0 +1,167 @@
+"""
+Sentence-level cache of synthesized audio
+Lets a regenerated script reuse every sentence that did not change
+"""
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .hashing import file_sha256
+from .result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+segment_hits = metrics.counter(
+    "tts_segment_cache_lookups_total", "Sentence cache lookups by outcome", labels={"result": "hit"}
+)
+segment_misses = metrics.counter(
+    "tts_segment_cache_lookups_total", "Sentence cache lookups by outcome", labels={"result": "miss"}
+)
+
+# Settings that pick the execution path without changing how a sentence sounds
+_PATH_SETTINGS = ("long_form",)
+
+
+def segment_scope(
+    voice_profile_id: Optional[int],
+    speaker_wav: Optional[str],
+    language: str,
+    generation_settings: Optional[dict],
+) -> str:
+    """
+    Hash of everything besides the text that decides how a sentence sounds
+
+    Computed once per request; ``segment_key`` combines it with each sentence.
+
+    Returns:
+        Hex encoded SHA-256 of the voice, sample, language and settings
+    """
+    sample_hash = None
+    if speaker_wav and os.path.exists(speaker_wav):
+        sample_hash = file_sha256(speaker_wav)
+
+    canonical = json.dumps(
+        {
+            "voice_profile_id": voice_profile_id,
+            "sample": sample_hash,
+            "language": language,
+            "settings": {k: v for k, v in (generation_settings or {}).items() if k not in _PATH_SETTINGS},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def segment_key(scope: str, sentence: str) -> str:
+    """Cache key of one sentence rendered within a scope"""
+    return hashlib.sha256(f"{scope}\n{normalize_text(sentence)}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SegmentReuse:
+    """How many segments of a request came from the cache"""
+    total: int = 0
+    reused: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.reused / self.total if self.total else 0.0
+
+
+class SegmentCache:
+    """
+    In-memory LRU cache of rendered sentences
+
+    Entries are the raw float32 samples of one segment, before trimming and
+    loudness normalization, so a cached sentence is assembled exactly like a
+    freshly rendered one. The total size of the samples is kept under
+    ``max_bytes``. Cached arrays are read-only; callers must copy to modify.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Upper bound on the total size of cached samples
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a rendered segment, counting the hit or miss"""
+        with self._lock:
+            samples = self._entries.get(key)
+            if samples is None:
+                self.misses += 1
+                segment_misses.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            segment_hits.inc()
+            return samples
+
+    def put(self, key: str, samples: np.ndarray):
+        """Store a rendered segment, evicting least recently used ones to stay under budget"""
+        samples = np.array(samples, dtype=np.float32)
+        samples.setflags(write=False)
+        if samples.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.nbytes
+            self._entries[key] = samples
+            self._total_bytes += samples.nbytes
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Global instance (singleton pattern)
+_segment_cache = None
+
+
+def get_segment_cache() -> SegmentCache:
+    """Get the global segment cache instance"""
+    global _segment_cache
+    if _segment_cache is None:
+        _segment_cache = SegmentCache(max_bytes=settings.SEGMENT_CACHE_MAX_BYTES)
+    return _segment_cache
@@ -0,0 +1,478 @@
+"""
+Blob storage for voice samples, latents and generated audio
+Keys are relative POSIX paths, stored on local disk or in an S3-compatible bucket
+"""
+import hashlib
+import os
+import posixpath
+import shutil
+import threading
+import time
+import uuid
+import logging
+from typing import Dict, Optional, Tuple
+
+from ..core.config import settings
+from .hashing import forget_file
+
+logger = logging.getLogger(__name__)
+
+
+class StorageError(Exception):
+    """Raised when the blob store cannot complete an operation"""
+
+
+class BlobNotFoundError(StorageError):
+    """Raised when a key does not exist in the store"""
+
+
+class InvalidKeyError(StorageError):
+    """Raised for keys that are absolute or would escape the store"""
+
+
+def content_key(namespace: str, digest: str, extension: str) -> str:
+    """
+    Key of content-addressed data, sharded by hash prefix
+
+    Two levels of prefix directories (``generated/ab/cd/abcd....wav``) keep
+    every directory small however many blobs are stored, and identical
+    content always maps to the same key.
+
+    Args:
+        namespace: Top-level directory, e.g. ``samples`` or ``generated``
+        digest: SHA-256 hex digest of the content
+        extension: File extension without the dot
+
+    Returns:
+        Storage key
+    """
+    return f"{namespace}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+def bytes_sha256(data: bytes) -> str:
+    """Return the SHA-256 hex digest of an in-memory buffer"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def validate_key(key: str) -> str:
+    """Reject keys that are empty, absolute or contain relative segments"""
+    parts = key.split("/") if key else []
+    if not parts or "\\" in key or any(part in ("", ".", "..") for part in parts):
+        raise InvalidKeyError(key)
+    return key
+
+
+def audio_url(key: Optional[str], output_format: Optional[str] = "wav", bitrate: Optional[int] = None) -> Optional[str]:
+    """
+    Public URL of stored audio, served by the ``/audio`` route
+
+    Args:
+        key: Storage key of the WAV master
+        output_format: Delivery format; non-WAV formats are transcoded on first download
+        bitrate: Delivery bitrate in kbps for lossy formats
+
+    Returns:
+        Absolute URL, or None when there is no stored audio
+    """
+    if not key:
+        return None
+    url = f"{settings.BASE_URL}/audio/{key}"
+    if output_format and output_format != "wav":
+        url += f"?format={output_format}"
+        if bitrate:
+            url += f"&bitrate={bitrate}"
+    return url
+
+
+# Cached copies used more recently than this are never evicted: a reader may
+# hold the path returned by local_path without having opened it yet
+_CACHE_EVICT_MIN_AGE_SECONDS = 300
+
+# Least time between two cache scans triggered by writes
+_CACHE_TRIM_INTERVAL_SECONDS = 60
+
+
+def _temp_path(path: str) -> str:
+    return f"{path}.tmp.{uuid.uuid4().hex}"
+
+
+def _atomic_write(path: str, data: bytes):
+    """Write to a temp file beside ``path`` and rename it into place"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _atomic_copy(source: str, path: str):
+    """Hardlink (or copy) a file to a temp name beside ``path`` and rename it into place"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = _temp_path(path)
+    try:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class BlobStore:
+    """
+    Interface of a blob store
+
+    Writes are atomic: a reader sees either the previous blob or the
+    complete new one, never a partial file.
+    """
+
+    def put_bytes(self, key: str, data: bytes):
+        """Store a buffer under a key"""
+        raise NotImplementedError
+
+    def put_file(self, key: str, source_path: str):
+        """Store the contents of a local file under a key"""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> str:
+        """
+        Path of a local copy of a blob, for readers that need a real file
+
+        Raises:
+            BlobNotFoundError: If the key does not exist
+        """
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        """Whether a key exists"""
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        """
+        Size of a blob in bytes
+
+        Raises:
+            BlobNotFoundError: If the key does not exist
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Remove a key; missing keys are ignored"""
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs stored as files under a root directory"""
+
+    def __init__(self, root: str):
+        """
+        Initialize the store
+
+        Args:
+            root: Directory holding the blobs
+        """
+        self.root = os.path.realpath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, *validate_key(key).split("/")))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise InvalidKeyError(key)
+        return path
+
+    def put_bytes(self, key: str, data: bytes):
+        _atomic_write(self._path(key), data)
+
+    def put_file(self, key: str, source_path: str):
+        path = self._path(key)
+        if os.path.exists(path) and os.path.samefile(source_path, path):
+            return
+        _atomic_copy(source_path, path)
+
+    def local_path(self, key: str) -> str:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            raise BlobNotFoundError(key)
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.local_path(key))
+
+    def delete(self, key: str):
+        path = self._path(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        forget_file(path)
+
+
+class S3BlobStore(BlobStore):
+    """
+    Blobs stored in an S3-compatible bucket
+
+    Every blob also lives in a local write-through cache, because the model
+    and the audio route read real files. Keys are never rewritten in place
+    (they are content addressed), so cached copies cannot go stale and
+    replicas sharing the bucket stay consistent.
+
+    The cache is bounded by ``cache_max_bytes``: once a write takes it over
+    the budget, the least recently used copies are evicted. Recency is the
+    file's access time, which ``local_path`` sets explicitly (``noatime``
+    mounts do not matter), leaving the modification time - and so the
+    digest memo - untouched.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        cache_dir: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        cache_max_bytes: int = 0,
+    ):
+        """
+        Initialize the store
+
+        Args:
+            bucket: Bucket name
+            cache_dir: Local directory for cached copies
+            prefix: Key prefix inside the bucket
+            endpoint_url: Endpoint of an S3-compatible service (e.g. MinIO)
+            region: Bucket region
+            access_key_id: Credentials; the default boto3 chain is used when empty
+            secret_access_key: Credentials; the default boto3 chain is used when empty
+            cache_max_bytes: Size bound of the local cache, 0 for unbounded
+        """
+        try:
+            import boto3
+        except ImportError as e:
+            raise StorageError("boto3 is required for the s3 storage backend") from e
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cache = LocalBlobStore(cache_dir)
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+        )
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.cache_max_bytes = cache_max_bytes
+        # Running estimate of the cache size; None until the first scan
+        self._cache_bytes: Optional[int] = None
+        self._trim_lock = threading.Lock()
+        self._trim_requested_at = 0.0
+
+    def _object_key(self, key: str) -> str:
+        key = validate_key(key)
+        return posixpath.join(self.prefix, key) if self.prefix else key
+
+    def put_bytes(self, key: str, data: bytes):
+        # A PUT only becomes visible once the whole object has arrived
+        self._client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+        self.cache.put_bytes(key, data)
+        self._cached(len(data))
+
+    def put_file(self, key: str, source_path: str):
+        self._client.upload_file(source_path, self.bucket, self._object_key(key))
+        self.cache.put_file(key, source_path)
+        self._cached(os.path.getsize(source_path))
+
+    def local_path(self, key: str) -> str:
+        try:
+            path = self.cache.local_path(key)
+        except BlobNotFoundError:
+            pass
+        else:
+            _touch(path)
+            return path
+
+        with self._locks_guard:
+            lock = self._fetch_locks.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                # Another thread may have fetched the blob while we waited
+                if not self.cache.exists(key):
+                    self._download(key)
+        finally:
+            with self._locks_guard:
+                self._fetch_locks.pop(key, None)
+        return self.cache.local_path(key)
+
+    def _download(self, key: str):
+        from botocore.exceptions import ClientError
+
+        path = self.cache._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = _temp_path(path)
+        try:
+            self._client.download_file(self.bucket, self._object_key(key), tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise BlobNotFoundError(key) from e
+            raise StorageError(f"Could not fetch {key}: {str(e)}") from e
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logger.info(f"Fetched blob {key} from bucket {self.bucket}")
+        self._cached(size)
+
+    def exists(self, key: str) -> bool:
+        if self.cache.exists(key):
+            return True
+
+        from botocore.exceptions import ClientError
+
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise StorageError(f"Could not look up {key}: {str(e)}") from e
+        return True
+
+    def size(self, key: str) -> int:
+        try:
+            return self.cache.size(key)
+        except BlobNotFoundError:
+            pass
+
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise BlobNotFoundError(key) from e
+            raise StorageError(f"Could not look up {key}: {str(e)}") from e
+        return response["ContentLength"]
+
+    def delete(self, key: str):
+        self._client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        self.cache.delete(key)
+
+    def _cached(self, nbytes: int):
+        """Account for a file added to the cache and trim it in the background when over budget"""
+        if self.cache_max_bytes <= 0:
+            return
+        now = time.monotonic()
+        with self._locks_guard:
+            if self._cache_bytes is not None:
+                self._cache_bytes += nbytes
+            over_budget = self._cache_bytes is None or self._cache_bytes > self.cache_max_bytes
+            # Copies in use cannot be evicted, so a cache that stays over budget is not rescanned on every write
+            due = now - self._trim_requested_at >= _CACHE_TRIM_INTERVAL_SECONDS
+            if over_budget and due:
+                self._trim_requested_at = now
+        if over_budget and due:
+            threading.Thread(target=self.trim_cache, name="blob-cache-trim", daemon=True).start()
+
+    def trim_cache(self, dry_run: bool = False) -> Tuple[int, int]:
+        """
+        Evict least recently used cached copies until the cache fits its budget
+
+        Only one thread trims at a time; others return immediately. Copies
+        used in the last few minutes are kept even when over budget, and the
+        bucket still holds every evicted blob.
+
+        Args:
+            dry_run: Only report what would be evicted
+
+        Returns:
+            Number of files and bytes evicted
+        """
+        if not self._trim_lock.acquire(blocking=False):
+            return 0, 0
+        try:
+            entries = []
+            total = 0
+            for dirpath, _, names in os.walk(self.cache.root):
+                for name in names:
+                    if ".tmp." in name:
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_atime, stat.st_size, path))
+                    total += stat.st_size
+
+            files = freed = 0
+            if self.cache_max_bytes > 0 and total > self.cache_max_bytes:
+                recent = time.time() - _CACHE_EVICT_MIN_AGE_SECONDS
+                for accessed, size, path in sorted(entries):
+                    if total - freed <= self.cache_max_bytes or accessed >= recent:
+                        break
+                    if not dry_run:
+                        try:
+                            os.remove(path)
+                        except FileNotFoundError:
+                            continue
+                        forget_file(path)
+                    files += 1
+                    freed += size
+
+            if not dry_run:
+                with self._locks_guard:
+                    self._cache_bytes = total - freed
+                if files:
+                    logger.info(f"Evicted {files} cached blobs ({freed / 1e6:.1f} MB) from {self.cache.root}")
+            return files, freed
+        finally:
+            self._trim_lock.release()
+
+
+def _touch(path: str):
+    """Mark a cached copy as used now, keeping its modification time"""
+    try:
+        stat = os.stat(path)
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+    except OSError:
+        pass
+
+
+# Global instance (singleton pattern)
+_blob_store = None
+
+
+def get_blob_store() -> BlobStore:
+    """Get the global blob store instance"""
+    global _blob_store
+    if _blob_store is None:
+        if settings.STORAGE_BACKEND == "s3":
+            _blob_store = S3BlobStore(
+                bucket=settings.S3_BUCKET,
+                cache_dir=os.path.join(settings.UPLOAD_DIR, "cache", "blobs"),
+                prefix=settings.S3_PREFIX,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                region=settings.S3_REGION,
+                access_key_id=settings.S3_ACCESS_KEY_ID,
+                secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+                cache_max_bytes=settings.S3_CACHE_MAX_BYTES,
+            )
+        elif settings.STORAGE_BACKEND == "local":
+            _blob_store = LocalBlobStore(settings.UPLOAD_DIR)
+        else:
+            raise StorageError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+    return _blob_store
@@ -0,0 +1,101 @@
+"""
+Streaming speech generation
+Emits a WAV stream as audio is synthesized and stores the full audio at the end
+"""
+import time
+import logging
+from typing import Iterator, Optional
+
+import numpy as np
+
+from ..core.database import SessionLocal
+from .audio_io import samples_duration, to_pcm16, wav_header
+from .generation import record_generated_audio, store_audio, time_to_first_audio
+from .inference_pool import get_inference_pool
+from .model_registry import get_voice_service
+
+logger = logging.getLogger(__name__)
+
+
+def stream_audio_record(
+    text: str,
+    speaker_wav: Optional[str] = None,
+    language: str = "en",
+    voice_profile_id: Optional[int] = None,
+    generation_settings: Optional[dict] = None,
+    started_at: Optional[float] = None,
+    model: Optional[str] = None,
+) -> Iterator[bytes]:
+    """
+    Synthesize speech as a chunked WAV byte stream
+
+    The header announces an unknown length so playback can start on the
+    first chunk. Once the stream is complete the audio is written to the
+    blob store and a GeneratedAudio row is inserted. With an inference pool
+    the default model streams from a replica, like any other synthesis.
+
+    Args:
+        text: Text to convert to speech
+        speaker_wav: Path to reference audio file for voice cloning (optional)
+        language: Language code
+        voice_profile_id: Voice profile recorded on the row
+        generation_settings: Settings recorded on the row
+        started_at: ``time.perf_counter()`` value when the request arrived
+        model: Model from ``resolve_model``, None for the default model
+
+    Yields:
+        WAV header followed by 16-bit PCM chunks
+    """
+    started_at = started_at or time.perf_counter()
+    inference_pool = get_inference_pool()
+    if inference_pool is not None and model is None:
+        # Stream from a replica rather than loading a model into the API process
+        chunk_source = inference_pool.stream_speech(text, speaker_wav=speaker_wav, language=language)
+        sample_rate = inference_pool.sample_rate
+    else:
+        voice_service = get_voice_service(model)
+        chunk_source = voice_service.stream_speech(text, speaker_wav=speaker_wav, language=language)
+        sample_rate = voice_service.sample_rate
+
+    if sample_rate is not None:
+        yield wav_header(sample_rate)
+
+    chunks = []
+    first_chunk = True
+    try:
+        for chunk in chunk_source:
+            if first_chunk:
+                ttfa = time.perf_counter() - started_at
+                time_to_first_audio.observe(ttfa)
+                logger.info(f"Streaming time to first audio: {ttfa * 1000:.0f} ms")
+                first_chunk = False
+                if sample_rate is None:
+                    # No replica had loaded when the stream started; one has now
+                    sample_rate = inference_pool.sample_rate
+                    yield wav_header(sample_rate)
+            chunks.append(chunk)
+            yield to_pcm16(chunk)
+    except Exception as e:
+        # Headers are already sent, so the client only sees a truncated stream
+        logger.error(f"Error streaming speech: {str(e)}")
+        return
+    if sample_rate is None:
+        return
+
+    samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    audio_key = store_audio(samples, sample_rate)
+
+    db = SessionLocal()
+    try:
+        generated = record_generated_audio(
+            db,
+            text=text,
+            audio_key=audio_key,
+            duration=samples_duration(samples, sample_rate),
+            voice_profile_id=voice_profile_id,
+            generation_settings=generation_settings,
+        )
+        total_ms = (time.perf_counter() - started_at) * 1000
+        logger.info(f"Streamed generation {generated.id} completed in {total_ms:.0f} ms")
+    finally:
+        db.close()
@@ -0,0 +1,158 @@
+"""
+Sentence segmentation for incremental synthesis
+"""
+import re
+from typing import List
+
+# Sentence boundaries by script: terminator, closing quotes/brackets, then the
+# whitespace gap that is dropped between sentences. CJK needs no trailing space.
+_LATIN_BOUNDARY = re.compile(r"[.!?…]+[\"'”’»)\]]*(?P<gap>\s+)")
+_CJK_BOUNDARY = re.compile(r"(?:[。！？]+[」』”’）]*|[.!?]+(?=\s))(?P<gap>\s*)")
+_ARABIC_BOUNDARY = re.compile(r"[.!?؟۔]+(?P<gap>\s+)")
+
+# Clause boundaries used to break up sentences that are too long on their own
+_LATIN_CLAUSE = re.compile(r"[,;:—–]+[\"'”’»)\]]*(?P<gap>\s+)")
+_CJK_CLAUSE = re.compile(r"[，；：、]+(?P<gap>\s*)|[,;:]+(?P<gap2>\s+)")
+
+_CJK_LANGUAGES = {"zh-cn", "ja", "ko"}
+
+# Common abbreviations that end in a period but do not end a sentence
+_ABBREVIATIONS = {
+    "en": {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "inc", "ltd"},
+    "es": {"sr", "sra", "srta", "dr", "dra", "ud", "uds", "etc"},
+    "fr": {"m", "mme", "mlle", "dr", "etc", "p.ex"},
+    "de": {"hr", "fr", "dr", "prof", "bzw", "usw", "z.b", "d.h", "etc"},
+    "it": {"sig", "sigg", "dott", "prof", "ecc"},
+    "pt": {"sr", "sra", "dr", "dra", "etc"},
+    "nl": {"dhr", "mevr", "dr", "prof", "bijv", "enz"},
+    "pl": {"dr", "prof", "np", "itd", "itp"},
+    "ru": {"г", "гг", "т.е", "т.д", "др"},
+}
+
+
+def _boundary_pattern(language: str) -> re.Pattern:
+    if language in _CJK_LANGUAGES:
+        return _CJK_BOUNDARY
+    if language == "ar":
+        return _ARABIC_BOUNDARY
+    return _LATIN_BOUNDARY
+
+
+def _split_on(pattern: re.Pattern, text: str) -> List[str]:
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        gap = "gap" if match.group("gap") is not None else "gap2"
+        pieces.append(text[start:match.start(gap)])
+        start = match.end(gap)
+    pieces.append(text[start:])
+    return pieces
+
+
+def _ends_with_abbreviation(sentence: str, language: str) -> bool:
+    abbreviations = _ABBREVIATIONS.get(language)
+    if not abbreviations or not sentence.endswith("."):
+        return False
+    last_word = sentence.rsplit(None, 1)[-1].rstrip(".").lower()
+    # Single letters are initials ("J. R. R. Tolkien")
+    return last_word in abbreviations or (len(last_word) == 1 and last_word.isalpha())
+
+
+def split_sentences(text: str, language: str = "en") -> List[str]:
+    """
+    Split text into sentences using rules for the given language
+
+    Args:
+        text: Text to split
+        language: Language code as accepted by the TTS model
+
+    Returns:
+        Non-empty sentences in order, with surrounding whitespace removed
+    """
+    pieces = [p.strip() for p in _split_on(_boundary_pattern(language), text.strip())]
+    pieces = [p for p in pieces if p]
+
+    sentences: List[str] = []
+    for piece in pieces:
+        if sentences and _ends_with_abbreviation(sentences[-1], language):
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+def _split_long(sentence: str, language: str, max_chars: int) -> List[str]:
+    """Break a sentence longer than max_chars at clauses, then at word boundaries"""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    clause_pattern = _CJK_CLAUSE if language in _CJK_LANGUAGES else _LATIN_CLAUSE
+    clauses = [c.strip() for c in _split_on(clause_pattern, sentence) if c.strip()]
+    if len(clauses) > 1:
+        return _pack(
+            [part for clause in clauses for part in _split_long(clause, language, max_chars)],
+            language,
+            max_chars,
+        )
+
+    # No clause boundary left: cut at the last space (or hard cut for CJK)
+    pieces = []
+    rest = sentence
+    while len(rest) > max_chars:
+        cut = rest.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(rest[:cut].strip())
+        rest = rest[cut:].strip()
+    if rest:
+        pieces.append(rest)
+    return pieces
+
+
+def _pack(pieces: List[str], language: str, max_chars: int) -> List[str]:
+    """Greedily join consecutive pieces while they fit in max_chars"""
+    joiner = "" if language in _CJK_LANGUAGES else " "
+    segments: List[str] = []
+    for piece in pieces:
+        if segments and len(segments[-1]) + len(joiner) + len(piece) <= max_chars:
+            segments[-1] = f"{segments[-1]}{joiner}{piece}"
+        else:
+            segments.append(piece)
+    return segments
+
+
+def segment_text(text: str, language: str = "en", max_chars: int = 240) -> List[str]:
+    """
+    Split text into synthesis segments of at most max_chars characters
+
+    Sentences are kept whole where possible and short neighbours are packed
+    together; sentences that exceed the limit are split at clause
+    boundaries first and word boundaries last.
+
+    Args:
+        text: Text to split
+        language: Language code as accepted by the TTS model
+        max_chars: Maximum segment length
+
+    Returns:
+        Segments in order
+    """
+    return _pack(sentence_segments(text, language, max_chars), language, max_chars)
+
+
+def sentence_segments(text: str, language: str = "en", max_chars: int = 240) -> List[str]:
+    """
+    Split text into one segment per sentence, without packing neighbours
+
+    Editing one sentence leaves every other segment unchanged, which makes
+    these segments the unit of the sentence cache. Sentences longer than
+    max_chars are split as in ``segment_text``.
+
+    Returns:
+        Segments in order
+    """
+    return [
+        part
+        for sentence in split_sentences(text, language)
+        for part in _split_long(sentence, language, max_chars)
+    ]
@@ -0,0 +1,156 @@
+"""
+Output format transcoding
+Converts stored WAV masters to compressed variants once and caches them on disk
+"""
+import os
+import shutil
+import subprocess
+import threading
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from .hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+
+class TranscodingUnavailableError(Exception):
+    """Raised when ffmpeg is not installed"""
+
+
+class TranscodingError(Exception):
+    """Raised when ffmpeg fails to convert a file"""
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    name: str
+    extension: str
+    media_type: str
+    codec_args: List[str]
+    default_bitrate: Optional[int] = None  # kbps, None for lossless
+
+
+FORMATS: Dict[str, AudioFormat] = {
+    "wav": AudioFormat("wav", "wav", "audio/wav", []),
+    "flac": AudioFormat("flac", "flac", "audio/flac", ["-c:a", "flac"]),
+    "mp3": AudioFormat("mp3", "mp3", "audio/mpeg", ["-c:a", "libmp3lame"], default_bitrate=64),
+    "opus": AudioFormat("opus", "ogg", "audio/ogg", ["-c:a", "libopus", "-application", "voip"], default_bitrate=32),
+}
+
+# Media types a client may list in Accept, mapped to our format names
+MEDIA_TYPE_FORMATS = {
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+    "audio/flac": "flac",
+    "audio/x-flac": "flac",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+}
+
+_variant_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def negotiate_format(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick an output format from an Accept header
+
+    Returns:
+        The preferred supported format, or None when the header names none
+    """
+    if not accept:
+        return None
+
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        media_type = fields[0].lower()
+        quality = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type in MEDIA_TYPE_FORMATS and quality > 0:
+            candidates.append((-quality, position, MEDIA_TYPE_FORMATS[media_type]))
+
+    return min(candidates)[2] if candidates else None
+
+
+def variant_path(source_path: str, fmt: AudioFormat, bitrate: Optional[int]) -> str:
+    """Cache location of a transcoded variant, keyed by the source's content hash"""
+    digest = file_sha256(source_path)
+    suffix = f"_{bitrate}k" if bitrate else ""
+    return os.path.join(
+        settings.UPLOAD_DIR, "cache", "variants", digest[:2],
+        f"{digest}{suffix}.{fmt.extension}",
+    )
+
+
+def get_variant(source_path: str, format_name: str, bitrate: Optional[int] = None) -> str:
+    """
+    Return a path to the source audio in the requested format
+
+    The first request for a variant runs ffmpeg; later requests reuse the
+    cached file. Concurrent requests for the same variant transcode once.
+
+    Args:
+        source_path: Stored WAV master
+        format_name: One of FORMATS
+        bitrate: Target bitrate in kbps for lossy formats
+
+    Returns:
+        Path of the file to serve
+    """
+    fmt = FORMATS[format_name]
+    if fmt.name == "wav":
+        return source_path
+    bitrate = (bitrate or fmt.default_bitrate) if fmt.default_bitrate else None
+
+    path = variant_path(source_path, fmt, bitrate)
+    if os.path.exists(path):
+        return path
+
+    with _locks_guard:
+        lock = _variant_locks.setdefault(path, threading.Lock())
+    try:
+        with lock:
+            if not os.path.exists(path):
+                _transcode(source_path, path, fmt, bitrate)
+    finally:
+        with _locks_guard:
+            _variant_locks.pop(path, None)
+    return path
+
+
+def _transcode(source_path: str, destination: str, fmt: AudioFormat, bitrate: Optional[int]):
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise TranscodingUnavailableError("ffmpeg is not installed")
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    # Unique per call so other worker processes transcoding the same variant never share
+    # it; ffmpeg picks the container from the extension, so that stays last
+    tmp_path = f"{destination}.tmp.{uuid.uuid4().hex}.{fmt.extension}"
+    command = [ffmpeg, "-nostdin", "-loglevel", "error", "-y", "-i", source_path, *fmt.codec_args]
+    if bitrate:
+        command += ["-b:a", f"{bitrate}k"]
+    command.append(tmp_path)
+
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise TranscodingError(result.stderr.strip() or f"ffmpeg exited with {result.returncode}")
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logger.info(f"Transcoded {source_path} -> {destination}")
@@ -3,42 +3,273 @@ Voice Cloning Service using Coqui TTS XTTS-v2
 Handles text-to-speech generation with voice cloning capabilities
 """
 import os
-import torch
-from TTS.api import TTS
-from typing import Optional
+import time
+import functools
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, List, Optional, Tuple
 import logging
 
+import numpy as np
+
+from ..core.config import settings
+from ..core.observability import timed_stage
+from .inference_profiles import apply_inference_profile, configure_threads, inference_context
+from .latent_cache import Latents, get_latent_cache, is_latents_file
+from .model_snapshot import find_snapshot, load_snapshot
+from .profiling import ProfileSession, write_local_artifacts
+from .text_segmentation import split_sentences
+
 logger = logging.getLogger(__name__)
 
+# torch and TTS are imported on first use: importing the API (or a process
+# with ENABLE_VOICE_CLONING off) must not pay for loading them
+
+
+def _uses_model(method):
+    """Load the model for the call and mark it busy until the call returns"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.in_use():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class VoiceCloningService:
     """Service for generating speech with voice cloning"""
 
-    def __init__(self, model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2"):
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        profile: Optional[str] = None,
+        manage_threads: bool = True,
+    ):
         """
         Initialize the voice cloning service
 
         Args:
-            model_name: Name of the TTS model to use
+            model_name: Name of the TTS model to use, defaults to ``TTS_MODEL``
+            profile: Inference profile, defaults to ``INFERENCE_PROFILE``
+            manage_threads: Configure torch thread pools on load (replica
+                processes configure their own)
         """
-        self.model_name = model_name
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model_name = model_name or settings.TTS_MODEL
+        self.profile = profile or settings.INFERENCE_PROFILE
+        self.manage_threads = manage_threads
+        self._device: Optional[str] = None
         self.tts = None
-        logger.info(f"Voice cloning service initialized with device: {self.device}")
+        self.optimizations: List[str] = []
+        self.registry = None  # Set by the ModelRegistry holding this service
+        self._sample_rate: Optional[int] = None
+        self.last_used = time.monotonic()
+        self._active = 0
+        self._lock = threading.RLock()
+        logger.info(f"Voice cloning service initialized for model: {self.model_name}")
+
+    @property
+    def device(self) -> str:
+        """Device the model runs on; probing it imports torch"""
+        if self._device is None:
+            import torch
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        return self._device
+
+    @device.setter
+    def device(self, value: str):
+        self._device = value
+
+    def _load_tts(self):
+        """
+        Build the ``TTS`` instance, from the weight snapshot when there is one
+
+        A snapshot is memory-mapped instead of unpickled, so loading skips the
+        checkpoint copy and processes on one host share the weight pages. Any
+        failure falls back to the regular Coqui loader.
+        """
+        snapshot = find_snapshot(settings.MODEL_SNAPSHOT_DIR, self.model_name)
+        if snapshot:
+            try:
+                return load_snapshot(snapshot, self.device)
+            except Exception as e:
+                logger.warning(f"Could not load model snapshot {snapshot}, using the Coqui loader: {str(e)}")
+
+        from TTS.api import TTS
+        return TTS(self.model_name).to(self.device)
 
     def load_model(self):
         """Load the TTS model (lazy loading to save memory)"""
-        if self.tts is None:
-            logger.info(f"Loading TTS model: {self.model_name}")
-            self.tts = TTS(self.model_name).to(self.device)
-            logger.info("TTS model loaded successfully")
+        if self.registry is not None and self.tts is None:
+            # The registry makes room within its memory budget first
+            self.registry.load(self)
+        else:
+            self.load_unmanaged()
+
+    def load_unmanaged(self):
+        """Load the TTS model without consulting the registry"""
+        with self._lock:
+            if self.tts is None:
+                if self.manage_threads:
+                    configure_threads(self.profile)
+                logger.info(f"Loading TTS model: {self.model_name} ({self.profile} profile, {self.device})")
+                with timed_stage("model_load"):
+                    tts = self._load_tts()
+                    self.optimizations = apply_inference_profile(tts, self.profile, self.device)
+                self.tts = tts
+                self._sample_rate = tts.synthesizer.output_sample_rate
+                logger.info("TTS model loaded successfully")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.tts is not None
+
+    @property
+    def is_busy(self) -> bool:
+        return self._active > 0
+
+    @contextmanager
+    def in_use(self):
+        """Keep the model loaded, and count as busy, for the duration of a block"""
+        with self._lock:
+            self._active += 1
+        try:
+            self.load_model()
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.last_used = time.monotonic()
+
+    def supports_cached_latents(self) -> bool:
+        """Whether the loaded model accepts precomputed conditioning latents"""
+        model = self.tts.synthesizer.tts_model
+        return hasattr(model, "get_conditioning_latents") and hasattr(model, "inference")
+
+    @_uses_model
+    def compute_speaker_latents(self, speaker_wav: str) -> Latents:
+        """
+        Compute XTTS conditioning latents for a reference sample
+
+        Args:
+            speaker_wav: Path to reference audio file
 
+        Returns:
+            Mapping with the GPT conditioning latent and the speaker embedding
+        """
+        import torch
+
+        self.load_model()
+        with timed_stage("conditioning"), torch.inference_mode():
+            gpt_cond_latent, speaker_embedding = self.tts.synthesizer.tts_model.get_conditioning_latents(
+                audio_path=[speaker_wav]
+            )
+        return {
+            "gpt_cond_latent": gpt_cond_latent.cpu().numpy(),
+            "speaker_embedding": speaker_embedding.cpu().numpy(),
+        }
+
+    def get_speaker_latents(self, speaker_wav: str) -> Latents:
+        """
+        Get conditioning latents for a speaker reference, using the cache
+
+        The reference is either an audio sample or a precomputed latents file
+        such as a voice profile's aggregate.
+        """
+        if is_latents_file(speaker_wav):
+            return get_latent_cache().get_precomputed(speaker_wav)
+        return get_latent_cache().get_or_compute(speaker_wav, self.compute_speaker_latents)
+
+    def _tts_arguments(self, speaker_wav: Optional[str], language: str) -> dict:
+        """
+        Speaker and language arguments the loaded model accepts
+
+        Coqui rejects a language for single-language models, and only
+        multi-speaker models can clone a reference; lightweight preview models
+        such as VITS render in their own voice.
+        """
+        arguments = {}
+        if getattr(self.tts, "is_multi_lingual", True):
+            arguments["language"] = language
+        if speaker_wav and getattr(self.tts, "is_multi_speaker", True):
+            arguments["speaker_wav"] = speaker_wav
+        return arguments
+
+    def _synthesize_with_latents(self, text: str, language: str, latents: Latents):
+        """Run XTTS inference with precomputed conditioning latents"""
+        import torch
+
+        gpt_cond_latent = torch.from_numpy(latents["gpt_cond_latent"]).to(self.device)
+        speaker_embedding = torch.from_numpy(latents["speaker_embedding"]).to(self.device)
+        with timed_stage("inference"), torch.inference_mode():
+            out = self.tts.synthesizer.tts_model.inference(
+                text,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+            )
+        return out["wav"]
+
+    @_uses_model
+    def synthesize(
+        self,
+        text: str,
+        speaker_wav: Optional[str] = None,
+        language: str = "en",
+    ) -> np.ndarray:
+        """
+        Generate speech from text into memory
+
+        Args:
+            text: Text to convert to speech
+            speaker_wav: Path to reference audio file for voice cloning (optional)
+            language: Language code (default: "en")
+
+        Returns:
+            Float32 samples at ``sample_rate``
+        """
+        with inference_context(self.profile):
+            if speaker_wav and os.path.exists(speaker_wav):
+                if self.supports_cached_latents():
+                    latents = self.get_speaker_latents(speaker_wav)
+                    wav = self._synthesize_with_latents(text, language, latents)
+                elif is_latents_file(speaker_wav):
+                    raise ValueError(f"Model {self.model_name} does not accept precomputed latents")
+                else:
+                    with timed_stage("inference"):
+                        wav = self.tts.tts(text=text, **self._tts_arguments(speaker_wav, language))
+            else:
+                with timed_stage("inference"):
+                    wav = self.tts.tts(text=text, **self._tts_arguments(None, language))
+
+        if hasattr(wav, "cpu"):
+            # A torch tensor; checked by duck typing so rendering needs no torch import
+            wav = wav.cpu().numpy()
+        return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+    def synthesize_timed(
+        self,
+        text: str,
+        speaker_wav: Optional[str] = None,
+        language: str = "en",
+    ) -> Tuple[np.ndarray, float]:
+        """
+        ``synthesize``, also returning the seconds spent rendering
+
+        The time starts once the model is loaded, so it excludes loading and
+        any queueing in front of this call; it is what the model costs.
+        """
+        with self.in_use():
+            started = time.perf_counter()
+            samples = self.synthesize(text, speaker_wav=speaker_wav, language=language)
+            return samples, time.perf_counter() - started
+
+    @_uses_model
     def generate_speech(
         self,
         text: str,
         output_path: str,
         speaker_wav: Optional[str] = None,
         language: str = "en",
+        profile: bool = False,
         **kwargs
     ) -> str:
         """
@@ -49,42 +280,125 @@ class VoiceCloningService:
             output_path: Path where the audio file will be saved
             speaker_wav: Path to reference audio file for voice cloning (optional)
             language: Language code (default: "en")
+            profile: Profile the call and write the stack samples and torch
+                traces next to ``output_path``
             **kwargs: Additional parameters for generation
 
         Returns:
             Path to the generated audio file
         """
-        # Load model if not loaded
-        self.load_model()
-
         logger.info(f"Generating speech for text length: {len(text)} characters")
 
+        session = ProfileSession() if profile else nullcontext()
         try:
-            if speaker_wav and os.path.exists(speaker_wav):
-                # Voice cloning mode with reference audio
-                logger.info(f"Using voice cloning with reference: {speaker_wav}")
-                self.tts.tts_to_file(
-                    text=text,
-                    file_path=output_path,
-                    speaker_wav=speaker_wav,
-                    language=language
-                )
-            else:
-                # Default voice mode
-                logger.info("Using default voice (no reference audio)")
-                self.tts.tts_to_file(
-                    text=text,
-                    file_path=output_path,
-                    language=language
-                )
+            with session, inference_context(self.profile):
+                if speaker_wav and os.path.exists(speaker_wav):
+                    # Voice cloning mode with reference audio
+                    logger.info(f"Using voice cloning with reference: {speaker_wav}")
+                    if self.supports_cached_latents():
+                        latents = self.get_speaker_latents(speaker_wav)
+                        wav = self._synthesize_with_latents(text, language, latents)
+                        self.tts.synthesizer.save_wav(wav=wav, path=output_path)
+                    elif is_latents_file(speaker_wav):
+                        raise ValueError(f"Model {self.model_name} does not accept precomputed latents")
+                    else:
+                        self.tts.tts_to_file(
+                            text=text,
+                            file_path=output_path,
+                            **self._tts_arguments(speaker_wav, language)
+                        )
+                else:
+                    # Default voice mode
+                    logger.info("Using default voice (no reference audio)")
+                    self.tts.tts_to_file(
+                        text=text,
+                        file_path=output_path,
+                        **self._tts_arguments(None, language)
+                    )
 
             logger.info(f"Speech generated successfully: {output_path}")
+            if profile:
+                paths = write_local_artifacts(session, output_path)
+                logger.info(f"Profile written: {', '.join(paths.values())}")
             return output_path
 
         except Exception as e:
             logger.error(f"Error generating speech: {str(e)}")
             raise
 
+    @property
+    def sample_rate(self) -> int:
+        """Output sample rate of the model; known without a reload once it was loaded"""
+        if self._sample_rate is None:
+            self.load_model()
+        return self._sample_rate
+
+    def stream_speech(
+        self,
+        text: str,
+        speaker_wav: Optional[str] = None,
+        language: str = "en",
+    ) -> Iterator[np.ndarray]:
+        """
+        Generate speech incrementally, sentence by sentence
+
+        Uses XTTS streaming inference when the model supports it, so the first
+        chunk is available long before the whole sentence is rendered. Both
+        paths run under the service's inference profile.
+
+        Args:
+            text: Text to convert to speech
+            speaker_wav: Path to reference audio file for voice cloning (optional)
+            language: Language code (default: "en")
+
+        Yields:
+            Float32 sample chunks at ``sample_rate``
+        """
+        import torch
+
+        with self.in_use():
+            model = self.tts.synthesizer.tts_model
+            latents = None
+            if speaker_wav and os.path.exists(speaker_wav) and self.supports_cached_latents():
+                latents = self.get_speaker_latents(speaker_wav)
+
+            sentences = split_sentences(text, language)
+            logger.info(f"Streaming speech for {len(sentences)} sentences")
+
+            for sentence in sentences:
+                if latents is not None and hasattr(model, "inference_stream"):
+                    gpt_cond_latent = torch.from_numpy(latents["gpt_cond_latent"]).to(self.device)
+                    speaker_embedding = torch.from_numpy(latents["speaker_embedding"]).to(self.device)
+                    chunks = model.inference_stream(
+                        sentence,
+                        language,
+                        gpt_cond_latent,
+                        speaker_embedding,
+                        enable_text_splitting=False,
+                    )
+                    yield from self._advance_in_context(chunks)
+                else:
+                    # synthesize applies the inference profile itself
+                    yield self.synthesize(sentence, speaker_wav=speaker_wav, language=language)
+
+    def _advance_in_context(self, chunks: Iterator) -> Iterator[np.ndarray]:
+        """
+        Step a torch chunk generator under the inference profile
+
+        Grad modes are thread-local and a stream may resume on another worker
+        thread after each chunk, so the context wraps every step rather than
+        staying open across yields.
+        """
+        import torch
+
+        while True:
+            with inference_context(self.profile), torch.inference_mode():
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                chunk = chunk.cpu().numpy().astype(np.float32)
+            yield chunk
+
     def get_supported_languages(self) -> list:
         """Get list of supported languages"""
         if self.tts is None:
@@ -95,21 +409,26 @@ class VoiceCloningService:
 
     def unload_model(self):
         """Unload the model to free up memory"""
-        if self.tts is not None:
-            del self.tts
-            self.tts = None
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            logger.info("TTS model unloaded")
-
+        with self._lock:
+            if self.tts is not None:
+                del self.tts
+                self.tts = None
+                self.optimizations = []
+                import torch
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                logger.info("TTS model unloaded")
 
-# Global instance (singleton pattern)
-_voice_service = None
+    def unload_if_idle(self) -> bool:
+        """
+        Unload the model unless a request is using it
 
+        Returns:
+            True if the model was unloaded
+        """
+        with self._lock:
+            if self.tts is None or self._active > 0:
+                return False
+            self.unload_model()
+            return True
 
-def get_voice_service() -> VoiceCloningService:
-    """Get the global voice cloning service instance"""
-    global _voice_service
-    if _voice_service is None:
-        _voice_service = VoiceCloningService()
-    return _voice_service
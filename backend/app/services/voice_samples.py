@@ -0,0 +1,340 @@
+"""
+Multi-sample voice profiles
+Per-sample conditioning latents and an incrementally maintained profile aggregate
+"""
+import io
+import os
+import posixpath
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import VoiceProfile, VoiceSample
+from .inference_pool import get_inference_pool
+from .latent_cache import (
+    LATENT_NAMES,
+    Latents,
+    get_latent_cache,
+    load_latents_file,
+)
+from .hashing import file_sha256
+from .samples import SampleInfo
+from .storage import BlobNotFoundError, StorageError, bytes_sha256, get_blob_store
+from .model_registry import get_voice_service
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceProfileNotFoundError(Exception):
+    """Raised when a request references a missing voice profile"""
+
+
+class VoiceSampleNotFoundError(Exception):
+    """Raised when a sample does not exist or belongs to another profile"""
+
+
+def compute_sample_latents(sample_path: str) -> Optional[Latents]:
+    """
+    Compute (or fetch cached) conditioning latents for a sample
+
+    Returns:
+        The latents, or None when cloning is disabled or the model does not
+        support precomputed latents
+    """
+    if not settings.ENABLE_VOICE_CLONING:
+        return None
+
+    inference_pool = get_inference_pool()
+    if inference_pool is not None:
+        def compute(path: str) -> Latents:
+            return inference_pool.submit("compute_speaker_latents", speaker_wav=path).result()
+    else:
+        compute = get_voice_service().compute_speaker_latents
+
+    try:
+        return get_latent_cache().get_or_compute(sample_path, compute)
+    except Exception as e:
+        logger.warning(f"Could not compute latents for {sample_path}: {str(e)}")
+        return None
+
+
+def _load_blob_latents(key: Optional[str]) -> Optional[Latents]:
+    if not key:
+        return None
+    try:
+        return load_latents_file(get_blob_store().local_path(key))
+    except BlobNotFoundError:
+        return None
+
+
+def _load_sums(key: Optional[str]) -> Tuple[Dict[str, np.ndarray], int]:
+    if not key:
+        return {}, 0
+    try:
+        path = get_blob_store().local_path(key)
+    except BlobNotFoundError:
+        return {}, 0
+    with np.load(path) as data:
+        return {name: data[f"{name}_sum"] for name in LATENT_NAMES}, int(data["count"])
+
+
+def _write_aggregate(voice: VoiceProfile, sums: Dict[str, np.ndarray], count: int, released: List[str]):
+    """Store a new aggregate blob; the previous one is added to ``released`` for deletion after commit"""
+    blob_store = get_blob_store()
+    previous_key = voice.aggregate_latents_path
+    key = None
+
+    if count > 0:
+        arrays = {name: (sums[name] / count).astype(np.float32) for name in LATENT_NAMES}
+        arrays.update({f"{name}_sum": sums[name] for name in LATENT_NAMES})
+        arrays["count"] = np.array(count)
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        data = buffer.getvalue()
+
+        # A fresh key per version, so cached copies on other replicas never go stale
+        key = f"aggregates/{voice.id}/{bytes_sha256(data)}.npz"
+        blob_store.put_bytes(key, data)
+
+    if previous_key and previous_key != key:
+        released.append(previous_key)
+    voice.aggregate_latents_path = key
+
+
+def _update_aggregate(voice: VoiceProfile, latents: Latents, sign: int, released: List[str]):
+    """Add (sign=1) or remove (sign=-1) one sample's latents from the running sums"""
+    sums, count = _load_sums(voice.aggregate_latents_path)
+    for name in LATENT_NAMES:
+        contribution = latents[name].astype(np.float64) * sign
+        sums[name] = sums[name] + contribution if name in sums else contribution
+    _write_aggregate(voice, sums, count + sign, released)
+
+
+def _rebuild_aggregate(voice: VoiceProfile, samples: List[VoiceSample], released: List[str]):
+    """Recompute the aggregate from scratch (only when a sample's latents are lost)"""
+    sums: Dict[str, np.ndarray] = {}
+    count = 0
+    for sample in samples:
+        latents = _load_blob_latents(sample.latents_path)
+        if latents is None:
+            continue
+        for name in LATENT_NAMES:
+            value = latents[name].astype(np.float64)
+            sums[name] = sums[name] + value if name in sums else value
+        count += 1
+    _write_aggregate(voice, sums, count, released)
+
+
+def _attach_latents(sample: VoiceSample) -> Optional[Latents]:
+    """Compute a sample's latents and store them beside the sample blob"""
+    blob_store = get_blob_store()
+    sample_path = blob_store.local_path(sample.audio_path)
+    latents = compute_sample_latents(sample_path)
+    if latents is None:
+        return None
+
+    disk_path = get_latent_cache().disk_path(sample_path, file_sha256(sample_path))
+    if not os.path.exists(disk_path):
+        return None
+    # The latent cache file already sits at this key's local location
+    latents_key = posixpath.join(posixpath.dirname(sample.audio_path), os.path.basename(disk_path))
+    blob_store.put_file(latents_key, disk_path)
+    sample.latents_path = latents_key
+    return latents
+
+
+def add_sample(db: Session, voice_id: int, info: SampleInfo) -> VoiceSample:
+    """
+    Add a canonical sample to a profile and fold it into the aggregate
+
+    The profile row is locked for the update so concurrent uploads (also
+    from other replicas) apply their increments one after another.
+
+    Args:
+        db: Database session
+        voice_id: Voice profile id
+        info: Canonicalized sample
+
+    Returns:
+        The committed sample row
+
+    Raises:
+        VoiceProfileNotFoundError: If the profile does not exist
+    """
+    voice = db.query(VoiceProfile).filter(VoiceProfile.id == voice_id).with_for_update().first()
+    if not voice:
+        db.rollback()
+        raise VoiceProfileNotFoundError(voice_id)
+
+    original_key = voice.aggregate_latents_path
+    released: List[str] = []
+    sample = VoiceSample(
+        voice_profile_id=voice_id,
+        audio_path=info.key,
+        sha256=info.sha256,
+        duration_seconds=info.duration_seconds,
+    )
+    db.add(sample)
+
+    try:
+        _fold_new_sample(db, voice, sample, released)
+        voice.sample_audio_path = info.key
+        voice.sample_sha256 = info.sha256
+        voice.sample_duration_seconds = info.duration_seconds
+        voice.sample_count = (voice.sample_count or 0) + 1
+        current_key = voice.aggregate_latents_path
+        db.commit()
+    except Exception:
+        _discard_aggregates(db, voice, original_key, released)
+        raise
+
+    # Only once the new aggregate is committed can the ones it replaced go
+    _delete_blobs(set(released) - {current_key})
+    db.refresh(sample)
+    return sample
+
+
+def _fold_new_sample(db: Session, voice: VoiceProfile, sample: VoiceSample, released: List[str]):
+    """Attach latents to a new sample and add it (and any legacy samples) to the aggregate"""
+    latents = _attach_latents(sample)
+    if latents is not None:
+        _update_aggregate(voice, latents, sign=1, released=released)
+
+        # Samples stored before latents were precomputed join the aggregate now
+        pending = (
+            db.query(VoiceSample)
+            .filter(VoiceSample.voice_profile_id == voice.id, VoiceSample.latents_path.is_(None))
+            .all()
+        )
+        for legacy in pending:
+            if legacy is sample or not get_blob_store().exists(legacy.audio_path):
+                continue
+            legacy_latents = _attach_latents(legacy)
+            if legacy_latents is not None:
+                _update_aggregate(voice, legacy_latents, sign=1, released=released)
+
+
+def remove_sample(db: Session, voice_id: int, sample_id: int):
+    """
+    Remove a sample from a profile and subtract it from the aggregate
+
+    Args:
+        db: Database session
+        voice_id: Voice profile id
+        sample_id: Sample to remove
+
+    Raises:
+        VoiceProfileNotFoundError: If the profile does not exist
+        VoiceSampleNotFoundError: If the sample is not part of the profile
+    """
+    voice = db.query(VoiceProfile).filter(VoiceProfile.id == voice_id).with_for_update().first()
+    if not voice:
+        db.rollback()
+        raise VoiceProfileNotFoundError(voice_id)
+    sample = (
+        db.query(VoiceSample)
+        .filter(VoiceSample.id == sample_id, VoiceSample.voice_profile_id == voice_id)
+        .first()
+    )
+    if not sample:
+        db.rollback()
+        raise VoiceSampleNotFoundError(sample_id)
+
+    remaining = (
+        db.query(VoiceSample)
+        .filter(VoiceSample.voice_profile_id == voice_id, VoiceSample.id != sample_id)
+        .order_by(VoiceSample.created_at.desc(), VoiceSample.id.desc())
+        .all()
+    )
+
+    original_key = voice.aggregate_latents_path
+    released: List[str] = []
+
+    try:
+        # Samples without latents never contributed to the aggregate
+        latents = _load_blob_latents(sample.latents_path)
+        if latents is not None:
+            _update_aggregate(voice, latents, sign=-1, released=released)
+        elif sample.latents_path:
+            _rebuild_aggregate(voice, remaining, released)
+    except Exception:
+        _discard_aggregates(db, voice, original_key, released)
+        raise
+
+    if voice.sample_audio_path == sample.audio_path:
+        latest = remaining[0] if remaining else None
+        voice.sample_audio_path = latest.audio_path if latest else None
+        voice.sample_sha256 = latest.sha256 if latest else None
+        voice.sample_duration_seconds = latest.duration_seconds if latest else None
+    voice.sample_count = len(remaining)
+
+    # Samples are content addressed, so another row may share the blob
+    shared = (
+        db.query(VoiceSample)
+        .filter(VoiceSample.audio_path == sample.audio_path, VoiceSample.id != sample_id)
+        .count()
+    )
+    sample_keys = (sample.audio_path, sample.latents_path) if not shared else None
+
+    db.delete(sample)
+    current_key = voice.aggregate_latents_path
+    try:
+        db.commit()
+    except Exception:
+        _discard_aggregates(db, voice, original_key, released)
+        raise
+
+    # Blobs go only after the commit, so a failed one leaves the rows pointing at live files
+    _delete_blobs(set(released) - {current_key})
+    if sample_keys:
+        _delete_sample_blobs(*sample_keys)
+
+
+def _discard_aggregates(db: Session, voice: VoiceProfile, original_key: Optional[str], released: List[str]):
+    """Roll back, then delete the aggregates this transaction wrote - no committed row references them"""
+    written = set(released + [voice.aggregate_latents_path]) - {original_key, None}
+    db.rollback()
+    _delete_blobs(written)
+
+
+def _delete_blobs(keys: Iterable[str]):
+    blob_store = get_blob_store()
+    for key in keys:
+        try:
+            blob_store.delete(key)
+        except StorageError as e:
+            logger.warning(f"Could not delete blob {key}: {str(e)}")
+
+
+def _delete_sample_blobs(audio_key: str, latents_key: Optional[str]):
+    blob_store = get_blob_store()
+    try:
+        get_latent_cache().invalidate(blob_store.local_path(audio_key))
+    except BlobNotFoundError:
+        pass
+    _delete_blobs(key for key in (audio_key, latents_key) if key)
+
+
+def speaker_reference(voice: VoiceProfile) -> Optional[str]:
+    """
+    Local path of the speaker reference used for synthesis
+
+    The aggregate latents file when the profile has one, so conditioning
+    costs the same no matter how many samples were uploaded; otherwise the
+    profile's sample audio.
+
+    Raises:
+        StorageError: If the profile's sample is missing from the store
+    """
+    blob_store = get_blob_store()
+    if voice.aggregate_latents_path:
+        try:
+            return blob_store.local_path(voice.aggregate_latents_path)
+        except StorageError as e:
+            logger.warning(f"Aggregate latents unavailable for voice {voice.id}: {str(e)}")
+    if not voice.sample_audio_path:
+        return None
+    return blob_store.local_path(voice.sample_audio_path)
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the API and inference hot paths
+Run with ``python -m benchmarks run`` from the backend directory
+"""
@@ -0,0 +1,254 @@
+"""
+Benchmark command line
+
+    python -m benchmarks run [--backend fake|xtts] [--database-url URL] [--output FILE] [--baseline FILE]
+    python -m benchmarks compare BASELINE CURRENT [--tolerance 0.1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from . import scenarios
+from .compare import compare_results, format_comparison
+from .environment import BACKENDS, create_schema, install_backend, prepare_environment
+from .stats import current_rss_mb, peak_rss_mb
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _options(args) -> dict:
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "history_rows": args.history_rows,
+        "history_pages": args.history_pages,
+        "page_size": args.page_size,
+        "cold_start_runs": args.cold_start_runs,
+    }
+
+
+async def _dispose_engines():
+    """
+    Close pooled connections once the app has shut down
+
+    aiosqlite connections run on their own threads; left open, they keep the
+    interpreter from exiting. The async engine is disposed on the loop that
+    opened its connections.
+    """
+    from app.core.database import async_engine, engine
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+async def _run_scenarios(args, names) -> dict:
+    import httpx
+
+    from app.main import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            # Untimed setup: one voice with one sample, and one warm request
+            response = await client.post(f"{scenarios.API}/voices/", json={"name": "benchmark"})
+            response.raise_for_status()
+            voice_id = response.json()["id"]
+            if args.speaker_wav:
+                with open(args.speaker_wav, "rb") as f:
+                    sample = f.read()
+            else:
+                sample = scenarios.synthetic_sample()
+            response = await client.post(
+                f"{scenarios.API}/voices/{voice_id}/upload-sample",
+                files={"file": (os.path.basename(args.speaker_wav or "sample.wav"), sample, "audio/wav")},
+            )
+            response.raise_for_status()
+
+            ctx = scenarios.Context(client, voice_id, sample, _options(args))
+            await scenarios._generate(ctx, "Warm up.")
+
+            for name in names:
+                print(f"Running {name}...", file=sys.stderr)
+                rss_before = current_rss_mb()
+                results[name] = await scenarios.SCENARIOS[name](ctx)
+                # What this scenario added; the process-wide peak only belongs to the suite
+                results[name]["rss_growth_mb"] = round(current_rss_mb() - rss_before, 1)
+    await _dispose_engines()
+    return results
+
+
+def run(args) -> int:
+    names = args.scenarios or list(scenarios.ALL_SCENARIOS)
+    unknown = set(names) - set(scenarios.ALL_SCENARIOS)
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    workdir = tempfile.mkdtemp(prefix="voice-cloner-bench-")
+    try:
+        prepare_environment(workdir, args.database_url)
+        results = {}
+        if "cold_start" in names:
+            print("Running cold_start...", file=sys.stderr)
+            child_args = ["--backend", args.backend, "--fake-rtf", str(args.fake_rtf)]
+            if args.database_url:
+                child_args += ["--database-url", args.database_url]
+            results["cold_start"] = scenarios.cold_start(_options(args), child_args)
+
+        in_process = [name for name in names if name in scenarios.SCENARIOS]
+        if in_process:
+            create_schema()
+            install_backend(args.backend, args.fake_rtf)
+            results.update(asyncio.run(_run_scenarios(args, in_process)))
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    from app.core.config import settings
+
+    document = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "backend": args.backend,
+            "fake_rtf": args.fake_rtf if args.backend == "fake" else None,
+            "database": settings.DATABASE_URL.split(":", 1)[0],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "options": _options(args),
+            "settings": {
+                "DB_POOL_SIZE": settings.DB_POOL_SIZE,
+                "BATCHING_ENABLED": settings.BATCHING_ENABLED,
+                "BATCH_WORKERS": settings.BATCH_WORKERS,
+                "INFERENCE_PROFILE": settings.INFERENCE_PROFILE,
+                "LONGFORM_WORKERS": settings.LONGFORM_WORKERS,
+            },
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "scenarios": results,
+    }
+    output = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare_results(json.load(f), document, args.tolerance)
+        print(format_comparison(rows), file=sys.stderr)
+        return 1 if any(row["regressed"] for row in rows) else 0
+    return 0
+
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare_results(baseline, current, args.tolerance)
+    print(format_comparison(rows))
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+def cold_start_child(args) -> int:
+    """One cold start, reported as a JSON line on stdout"""
+    workdir = tempfile.mkdtemp(prefix="voice-cloner-cold-")
+    try:
+        prepare_environment(workdir, args.database_url)
+        started = time.perf_counter()
+        from app.main import app
+        imported = time.perf_counter()
+
+        create_schema()
+        install_backend(args.backend, args.fake_rtf)
+
+        async def boot():
+            import httpx
+
+            began = time.perf_counter()
+            async with app.router.lifespan_context(app):
+                ready = time.perf_counter()
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+                    response = await client.post("/api/v1/voices/generate", json={"text": "Hello there."})
+                    response.raise_for_status()
+                first_request = time.perf_counter() - ready
+            await _dispose_engines()
+            return ready - began, first_request
+
+        startup, first_request = asyncio.run(boot())
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    import_seconds = imported - started
+    print(json.dumps({
+        "import_seconds": round(import_seconds, 3),
+        "startup_seconds": round(startup, 3),
+        "first_request_seconds": round(first_request, 3),
+        "total_seconds": round(import_seconds + startup + first_request, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Voice Cloner benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_backend_options(p):
+        p.add_argument("--backend", choices=BACKENDS, default="fake",
+                       help="fake: deterministic stand-in model (API/DB/IO overhead); xtts: the real model (RTF)")
+        p.add_argument("--fake-rtf", type=float, default=0.0,
+                       help="Simulated model seconds per audio second for the fake backend")
+        p.add_argument("--database-url", help="Sync database URL; a temporary SQLite file by default")
+
+    run_parser = commands.add_parser("run", help="Run scenarios and print a JSON report")
+    add_backend_options(run_parser)
+    run_parser.add_argument("--scenarios", nargs="*", help="Subset to run (default: all)")
+    run_parser.add_argument("--speaker-wav", help="Reference sample for the benchmark voice")
+    run_parser.add_argument("--requests", type=int, default=20, help="Requests per generation scenario")
+    run_parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests in the burst")
+    run_parser.add_argument("--history-rows", type=int, default=20000)
+    run_parser.add_argument("--history-pages", type=int, default=50)
+    run_parser.add_argument("--page-size", type=int, default=50)
+    run_parser.add_argument("--cold-start-runs", type=int, default=3)
+    run_parser.add_argument("--output", help="Also write the report to this file")
+    run_parser.add_argument("--baseline", help="Compare against this saved report; exit 1 on regression")
+    run_parser.add_argument("--tolerance", type=float, default=0.10)
+    run_parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.10)
+    compare_parser.set_defaults(handler=compare)
+
+    child_parser = commands.add_parser("cold-start-child")
+    add_backend_options(child_parser)
+    child_parser.set_defaults(handler=cold_start_child)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
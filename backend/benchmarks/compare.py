@@ -0,0 +1,68 @@
+"""
+Comparison of a benchmark run against a saved baseline
+"""
+from typing import List
+
+# Metric -> True when lower is better
+METRICS = {
+    "p50_ms": True,
+    "p95_ms": True,
+    "p99_ms": True,
+    "throughput_per_second": False,
+    "throughput_ratio": False,
+    "rtf_mean": True,
+    # Only cold_start reports it, as the peak of its own child processes
+    "peak_rss_mb": True,
+}
+
+# Pseudo-scenario for metrics reported once for the whole run
+SUITE = "suite"
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = 0.10) -> List[dict]:
+    """
+    Compare the scenarios two runs have in common
+
+    Args:
+        baseline: Result document of the reference run
+        current: Result document of the run under test
+        tolerance: Relative change allowed before a metric counts as regressed
+
+    Returns:
+        One row per scenario and metric with both values, the relative
+        change (positive = worse) and whether it regressed
+    """
+    rows = []
+    pairs = [(name, base, current.get("scenarios", {}).get(name)) for name, base in baseline.get("scenarios", {}).items()]
+    pairs.append((SUITE, {"peak_rss_mb": baseline.get("peak_rss_mb")}, {"peak_rss_mb": current.get("peak_rss_mb")}))
+    for name, base, cur in pairs:
+        if cur is None:
+            continue
+        for metric, lower_is_better in METRICS.items():
+            before, after = base.get(metric), cur.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if not lower_is_better:
+                change = -change
+            rows.append({
+                "scenario": name,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regressed": change > tolerance,
+            })
+    return rows
+
+
+def format_comparison(rows: List[dict]) -> str:
+    """Render comparison rows as a plain-text table"""
+    lines = [f"{'scenario':<14} {'metric':<22} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        lines.append(
+            f"{row['scenario']:<14} {row['metric']:<22} {row['baseline']:>12} "
+            f"{row['current']:>12} {row['change'] * 100:>+8.1f}%{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,55 @@
+"""
+Benchmark environment setup
+Settings are read when ``app`` is first imported, so everything here runs before that
+"""
+import os
+from typing import Optional
+
+BACKENDS = ("fake", "xtts")
+
+
+def prepare_environment(workdir: str, database_url: Optional[str] = None):
+    """
+    Point the app at a scratch upload directory and a benchmark database
+
+    Background workers, the inference pool and the result cache are turned
+    off so each request is measured end to end in this process. Explicit
+    environment variables (e.g. ``BATCHING_ENABLED``) still win for
+    anything not set here.
+
+    Args:
+        workdir: Scratch directory for uploads and the SQLite database
+        database_url: Sync database URL; a SQLite file in ``workdir`` by default
+    """
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    if database_url.startswith("sqlite"):
+        os.environ["DATABASE_ASYNC_URL"] = database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    else:
+        os.environ.pop("DATABASE_ASYNC_URL", None)
+
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["ENABLE_VOICE_CLONING"] = "true"
+    os.environ["RESULT_CACHE_ENABLED"] = "false"
+    os.environ["SEGMENT_CACHE_ENABLED"] = "false"
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ["INFERENCE_POOL_SIZE"] = "0"
+    os.environ["MODEL_IDLE_TIMEOUT_SECONDS"] = "0"
+
+
+def create_schema():
+    """Create the tables on a fresh benchmark database"""
+    from app.core.database import Base, engine
+    import app.models  # noqa: F401 - registers the tables
+
+    Base.metadata.create_all(engine)
+
+
+def install_backend(backend: str, fake_rtf: float = 0.0):
+    """Swap in the fake model, or leave the real XTTS service in place"""
+    if backend == "fake":
+        from .fake_backend import install_fake_backend
+        install_fake_backend(fake_rtf)
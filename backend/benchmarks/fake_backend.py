@@ -0,0 +1,111 @@
+"""
+Deterministic stand-in for the XTTS model
+Mimics the parts of the Coqui TTS API the service uses, so benchmarks measure API, DB and I/O overhead.
+Latents are numpy arrays, so the generation path runs without torch
+"""
+import hashlib
+import time
+
+import numpy as np
+
+from app.core.observability import timed_stage
+from app.services.voice_cloning import VoiceCloningService
+
+SAMPLE_RATE = 24000
+SECONDS_PER_CHAR = 0.065  # Roughly the pace of XTTS narration
+
+
+def _tone(text: str, seconds: float) -> np.ndarray:
+    """Same text, same samples: a quiet tone whose pitch is derived from the text"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    frequency = 120.0 + digest[0] * 2.0
+    t = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+    return (0.1 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+class _FakeModel:
+    def __init__(self, rtf: float):
+        self.rtf = rtf
+
+    def get_conditioning_latents(self, audio_path):
+        digest = hashlib.sha256(str(audio_path).encode("utf-8")).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:4], "little"))
+        return (
+            rng.standard_normal((1, 32, 1024), dtype=np.float32),
+            rng.standard_normal((1, 512, 1), dtype=np.float32),
+        )
+
+    def inference(self, text, language, gpt_cond_latent, speaker_embedding, **kwargs):
+        seconds = max(0.2, len(text) * SECONDS_PER_CHAR)
+        if self.rtf > 0:
+            # Sleeping releases the GIL, like torch kernels do
+            time.sleep(seconds * self.rtf)
+        return {"wav": _tone(f"{language}:{text}", seconds)}
+
+
+class _FakeSynthesizer:
+    def __init__(self, rtf: float):
+        self.tts_model = _FakeModel(rtf)
+        self.output_sample_rate = SAMPLE_RATE
+
+    def save_wav(self, wav, path):
+        from app.services.audio_io import write_wav
+        write_wav(path, wav, SAMPLE_RATE)
+
+
+class FakeTTS:
+    """The subset of ``TTS.api.TTS`` used by ``VoiceCloningService``"""
+
+    def __init__(self, rtf: float = 0.0):
+        self.synthesizer = _FakeSynthesizer(rtf)
+
+    def tts(self, text, speaker_wav=None, language="en", **kwargs):
+        return self.synthesizer.tts_model.inference(text, language, None, None)["wav"]
+
+    def tts_to_file(self, text, file_path, speaker_wav=None, language="en", **kwargs):
+        self.synthesizer.save_wav(self.tts(text, language=language), file_path)
+        return file_path
+
+
+class FakeVoiceService(VoiceCloningService):
+    """
+    Voice service backed by ``FakeTTS``
+
+    Everything above the model (latent cache, batching, long-form, storage)
+    runs unchanged; only the torch conversions around the model are skipped. ``rtf`` adds a sleep of ``rtf`` seconds per second of
+    audio to simulate model time; 0 measures pure overhead.
+    """
+
+    def __init__(self, rtf: float = 0.0):
+        # Stands in for the default model
+        super().__init__(profile="baseline", manage_threads=False)
+        self.device = "cpu"
+        self.rtf = rtf
+
+    def _load_tts(self):
+        return FakeTTS(self.rtf)
+
+    def compute_speaker_latents(self, speaker_wav: str):
+        self.load_model()
+        with timed_stage("conditioning"):
+            gpt_cond_latent, speaker_embedding = self.tts.synthesizer.tts_model.get_conditioning_latents(
+                audio_path=[speaker_wav]
+            )
+        return {"gpt_cond_latent": gpt_cond_latent, "speaker_embedding": speaker_embedding}
+
+    def _synthesize_with_latents(self, text: str, language: str, latents):
+        with timed_stage("inference"):
+            out = self.tts.synthesizer.tts_model.inference(
+                text,
+                language,
+                latents["gpt_cond_latent"],
+                latents["speaker_embedding"],
+            )
+        return out["wav"]
+
+
+def install_fake_backend(rtf: float = 0.0) -> FakeVoiceService:
+    """Make ``get_voice_service()`` return the fake service"""
+    from app.services.model_registry import get_model_registry
+
+    return get_model_registry().register(FakeVoiceService(rtf), replace=True)
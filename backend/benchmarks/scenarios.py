@@ -0,0 +1,247 @@
+"""
+Benchmark scenarios
+Each scenario drives the in-process app through HTTP and returns a summary from ``stats.summarize``
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from .stats import summarize
+
+API = "/api/v1"
+
+_WORDS = (
+    "morning river signal quiet harbor lantern orchard velvet compass meadow "
+    "thunder copper window garden silver journey market candle winter echo"
+).split()
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    voice_profile_id: Optional[int]
+    sample_wav: bytes
+    options: dict
+
+
+def sentence(index: int, words: int = 12) -> str:
+    """Deterministic, distinct sentence for request ``index``"""
+    rng = np.random.default_rng(index)
+    picked = [_WORDS[i] for i in rng.integers(0, len(_WORDS), size=words)]
+    return f"Request {index}: " + " ".join(picked).capitalize() + "."
+
+
+def synthetic_sample(seconds: float = 6.0, seed: int = 0, sample_rate: int = 22050) -> bytes:
+    """A voiced-sounding WAV to upload as a reference sample"""
+    from app.services.audio_io import encode_wav
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    samples = sum(np.sin(2 * np.pi * h * np.cumsum(pitch) / sample_rate) / h for h in range(1, 6))
+    samples = 0.2 * samples / np.max(np.abs(samples)) + 0.005 * rng.standard_normal(len(t))
+    return encode_wav(samples.astype(np.float32), sample_rate)
+
+
+async def _generate(ctx: Context, text: str) -> Tuple[float, Optional[float]]:
+    """POST one generation; returns (latency, RTF)"""
+    started = time.perf_counter()
+    response = await ctx.client.post(
+        f"{API}/voices/generate",
+        json={"text": text, "voice_profile_id": ctx.voice_profile_id},
+    )
+    latency = time.perf_counter() - started
+    response.raise_for_status()
+    duration = response.json().get("duration")
+    return latency, (latency / duration if duration else None)
+
+
+async def _run_generations(ctx: Context, texts: List[str], concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, rtfs, errors = [], [], 0
+
+    async def one(text: str):
+        nonlocal errors
+        async with semaphore:
+            try:
+                latency, rtf = await _generate(ctx, text)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(latency)
+            if rtf is not None:
+                rtfs.append(rtf)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    return summarize(latencies, time.perf_counter() - started, errors, rtfs)
+
+
+async def single(ctx: Context) -> dict:
+    """Sequential requests: latency of one request on an idle server"""
+    n = ctx.options["requests"]
+    return await _run_generations(ctx, [sentence(i) for i in range(n)], concurrency=1)
+
+
+async def burst(ctx: Context) -> dict:
+    """Many requests at once: queueing, pool and thread contention"""
+    n = ctx.options["requests"] * 2
+    texts = [sentence(10_000 + i) for i in range(n)]
+    return await _run_generations(ctx, texts, concurrency=ctx.options["concurrency"])
+
+
+async def batching(ctx: Context) -> dict:
+    """
+    The burst workload with the batch scheduler off, then on
+
+    Reports the batched run, plus the unbatched throughput and p95 for
+    comparison. Model time dominates real batching gains, so run it with
+    ``--fake-rtf`` or the xtts backend.
+    """
+    from app.core.config import settings
+
+    n = ctx.options["requests"] * 2
+    concurrency = ctx.options["concurrency"]
+    enabled = settings.BATCHING_ENABLED
+    try:
+        # Fresh texts for each run, so neither is answered from the result cache
+        settings.BATCHING_ENABLED = False
+        unbatched = await _run_generations(ctx, [sentence(30_000 + i) for i in range(n)], concurrency)
+        settings.BATCHING_ENABLED = True
+        result = await _run_generations(ctx, [sentence(40_000 + i) for i in range(n)], concurrency)
+    finally:
+        settings.BATCHING_ENABLED = enabled
+
+    result["unbatched_throughput_per_second"] = unbatched.get("throughput_per_second")
+    result["unbatched_p95_ms"] = unbatched.get("p95_ms")
+    if result.get("throughput_per_second") and unbatched.get("throughput_per_second"):
+        result["throughput_ratio"] = round(result["throughput_per_second"] / unbatched["throughput_per_second"], 3)
+    return result
+
+
+async def long_text(ctx: Context) -> dict:
+    """Texts above the long-form threshold: segmentation and stitching"""
+    n = max(1, ctx.options["requests"] // 5)
+    texts = [" ".join(sentence(20_000 + i * 100 + j) for j in range(12)) for i in range(n)]
+    return await _run_generations(ctx, texts, concurrency=1)
+
+
+async def upload(ctx: Context) -> dict:
+    """Sample uploads: transcoding, storage and latent aggregation"""
+    response = await ctx.client.post(f"{API}/voices/", json={"name": "benchmark uploads"})
+    response.raise_for_status()
+    voice_id = response.json()["id"]
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for i in range(ctx.options["requests"]):
+        data = synthetic_sample(seed=i + 1)
+        began = time.perf_counter()
+        response = await ctx.client.post(
+            f"{API}/voices/{voice_id}/upload-sample",
+            files={"file": (f"sample_{i}.wav", data, "audio/wav")},
+        )
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - began)
+        else:
+            errors += 1
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def _seed_history(rows: int):
+    """Insert ``rows`` history rows directly, spread over the last days"""
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal
+    from app.models import GeneratedAudio
+
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        for start in range(0, rows, 5000):
+            db.execute(insert(GeneratedAudio), [
+                {
+                    "text_input": sentence(i, words=8),
+                    "voice_profile_id": None,
+                    "duration": 3.0,
+                    "duration_seconds": 3,
+                    "output_format": "wav",
+                    "settings": {"language": "en"},
+                    "created_at": now - timedelta(seconds=rows - i),
+                }
+                for i in range(start, min(rows, start + 5000))
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def history(ctx: Context) -> dict:
+    """Walk the generation history page by page with keyset cursors"""
+    from app.core.pagination import NEXT_CURSOR_HEADER
+
+    await asyncio.to_thread(_seed_history, ctx.options["history_rows"])
+
+    latencies, errors, cursor = [], 0, None
+    started = time.perf_counter()
+    for _ in range(ctx.options["history_pages"]):
+        params = {"limit": ctx.options["page_size"]}
+        if cursor:
+            params["cursor"] = cursor
+        began = time.perf_counter()
+        response = await ctx.client.get(f"{API}/voices/generated/history", params=params)
+        if response.status_code != 200:
+            errors += 1
+            break
+        latencies.append(time.perf_counter() - began)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def cold_start(options: dict, child_args: List[str]) -> dict:
+    """
+    Import, startup and first request in fresh processes
+
+    Each run is a new interpreter, so module import, model load and the
+    first request's lazy initialization are all included.
+    """
+    runs = []
+    for _ in range(options["cold_start_runs"]):
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks", "cold-start-child", *child_args],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    result = summarize([r["total_seconds"] for r in runs], sum(r["total_seconds"] for r in runs))
+    for phase in ("import_seconds", "startup_seconds", "first_request_seconds"):
+        result[f"{phase}_mean"] = round(float(np.mean([r[phase] for r in runs])), 3)
+    # Peak of the child processes, not of the runner
+    result["peak_rss_mb"] = max(r["peak_rss_mb"] for r in runs)
+    return result
+
+
+# Scenarios that share the runner's app instance, in run order
+SCENARIOS: Dict[str, Callable] = {
+    "single": single,
+    "burst": burst,
+    "batching": batching,
+    "long_text": long_text,
+    "upload": upload,
+    "history": history,
+}
+ALL_SCENARIOS = ("cold_start", *SCENARIOS)
@@ -0,0 +1,71 @@
+"""
+Latency statistics and process memory for benchmark results
+"""
+from typing import List, Optional
+
+import numpy as np
+
+
+def _mb(nbytes: int) -> float:
+    return round(nbytes / (1024 * 1024), 1)
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MiB
+
+    A high-water mark for the whole process, so it is reported once per
+    process (the suite, or one cold start child), never per scenario.
+    """
+    # Imported here: importing app reads settings, which the environment must set up first
+    from app.core.memory import peak_rss_bytes
+
+    return _mb(peak_rss_bytes())
+
+
+def current_rss_mb() -> float:
+    """Current resident set size of this process in MiB"""
+    from app.core.memory import current_rss_bytes
+
+    return _mb(current_rss_bytes())
+
+
+def summarize(
+    latencies: List[float],
+    wall_seconds: float,
+    errors: int = 0,
+    rtfs: Optional[List[float]] = None,
+) -> dict:
+    """
+    Summarize one scenario
+
+    Args:
+        latencies: Seconds per successful operation
+        wall_seconds: Elapsed time of the whole scenario
+        errors: Failed operations
+        rtfs: Real-time factors (synthesis seconds per audio second), if any
+
+    Returns:
+        Count, error count, p50/p95/p99/mean/max latency in milliseconds,
+        throughput in operations per second and the mean RTF
+    """
+    result = {
+        "count": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(len(latencies) / wall_seconds, 3) if wall_seconds > 0 else None,
+    }
+    if latencies:
+        ms = np.asarray(latencies) * 1000.0
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        result.update({
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "mean_ms": round(float(ms.mean()), 2),
+            "max_ms": round(float(ms.max()), 2),
+        })
+    if rtfs:
+        result["rtf_mean"] = round(float(np.mean(rtfs)), 4)
+        result["rtf_p95"] = round(float(np.percentile(rtfs, 95)), 4)
+    return result